@@ -14,6 +14,7 @@ import os
 from dotenv import load_dotenv
 from pathlib import Path
 from django.utils import timezone
+from corsheaders.defaults import default_headers
 
 load_dotenv()
 
@@ -23,6 +24,17 @@ DEBUG = os.getenv("DEBUG", "False") == "True"
 
 # API keys
 WORLDNEWS_API_KEY = os.getenv("WORLDNEWS_API_KEY", "")
+WORLDNEWS_API_URL = os.getenv(
+    "WORLDNEWS_API_URL", "https://api.worldnewsapi.com/top-news"
+)
+
+# Jaccard threshold for collapsing near-duplicate news articles (0 disables)
+NEWS_NEAR_DUP_THRESHOLD = float(os.getenv("NEWS_NEAR_DUP_THRESHOLD", "0.7"))
+
+# "store": serve the feed from the Mongo articles collection filled by
+# `manage.py ingest_news` (live fallback when empty); "proxy": always live
+NEWS_FEED_SOURCE = os.getenv("NEWS_FEED_SOURCE", "store")
+NEWS_INGEST_MARKETS = os.getenv("NEWS_INGEST_MARKETS", "us:en")
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -58,8 +70,11 @@ INSTALLED_APPS = [
 AUTH_USER_MODEL = "newsmind.CustomUser"
 
 MIDDLEWARE = [
+    "newsmind.middleware.TracingMiddleware",
     "django.middleware.security.SecurityMiddleware",
+    "newsmind.middleware.QueryStatsMiddleware",
     "corsheaders.middleware.CorsMiddleware",
+    "newsmind.middleware.CompressionMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -68,9 +83,16 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+# path prefixes CompressionMiddleware compresses; keep responses that carry
+# tokens or other secrets (auth, profile) out of it (BREACH)
+COMPRESS_PATHS = ("/api/auth/news/",)
+
 CORS_ALLOWED_ORIGINS = [os.getenv("CORS_ORIGIN")]
 
 CORS_ALLOW_CREDENTIALS = True
+# the frontend sends one Idempotency-Key per summarize action and reuses it
+# on retries (src/services/summarize.js)
+CORS_ALLOW_HEADERS = (*default_headers, "idempotency-key")
 
 ROOT_URLCONF = "backend.urls"
 
@@ -150,7 +172,11 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "newsmind.authentication.CachedJWTAuthentication",
+    ),
+    "DEFAULT_RENDERER_CLASSES": (
+        "newsmind.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
     ),
 }
 
@@ -164,5 +190,96 @@ SIMPLE_JWT = {
     # other defaults are fine
 }
 
+# per-process cache of JWT-authenticated users (see newsmind/user_cache.py).
+# Saves invalidate only the saving process: other workers can keep serving a
+# deactivated or edited user for up to USER_CACHE_TTL seconds (0 disables).
+USER_CACHE_TTL = int(os.getenv("USER_CACHE_TTL", "60"))
+USER_CACHE_MAX_SIZE = int(os.getenv("USER_CACHE_MAX_SIZE", "1024"))
+
+# per-user Hugging Face budgets (0 = unlimited) and fair-share scheduling
+HF_USAGE_WINDOW_SECONDS = int(os.getenv("HF_USAGE_WINDOW_SECONDS", "3600"))
+HF_USER_CALLS_PER_WINDOW = int(os.getenv("HF_USER_CALLS_PER_WINDOW", "60"))
+HF_USER_TOKENS_PER_WINDOW = int(os.getenv("HF_USER_TOKENS_PER_WINDOW", "60000"))
+# HF calls in flight across the whole deployment; each of the worker
+# processes (same count as gunicorn.conf.py) gets an equal share of it
+HF_MAX_CONCURRENCY = int(os.getenv("HF_MAX_CONCURRENCY", "4"))
+HF_WORKER_PROCESSES = int(os.getenv("GUNICORN_WORKERS", "4"))
+HF_QUEUE_TIMEOUT = float(os.getenv("HF_QUEUE_TIMEOUT", "60"))
+HF_STAFF_WEIGHT = float(os.getenv("HF_STAFF_WEIGHT", "2"))
+
+# summarization backend (see newsmind/inference.py): "remote" Hugging Face
+# inference, or "local" CPU inference of a model stored on disk
+INFERENCE_BACKEND = os.getenv("INFERENCE_BACKEND", "remote")
+INFERENCE_LOCAL_MODEL_PATH = os.getenv("INFERENCE_LOCAL_MODEL_PATH", "")
+INFERENCE_LOCAL_ENGINE = os.getenv("INFERENCE_LOCAL_ENGINE", "torch")  # or "onnx"
+INFERENCE_QUANTIZE = os.getenv("INFERENCE_QUANTIZE", "True") == "True"
+# intra-op threads per process (0 = library default, usually all cores)
+INFERENCE_THREADS = int(os.getenv("INFERENCE_THREADS", "0"))
+INFERENCE_MAX_NEW_TOKENS = int(os.getenv("INFERENCE_MAX_NEW_TOKENS", "128"))
+# generation budget of the final call for ?length=short summaries
+SUMMARY_SHORT_MAX_NEW_TOKENS = int(os.getenv("SUMMARY_SHORT_MAX_NEW_TOKENS", "40"))
+INFERENCE_NUM_BEAMS = int(os.getenv("INFERENCE_NUM_BEAMS", "2"))
+# batches can't exceed the in-flight calls (HF_MAX_CONCURRENCY), so the
+# batcher clamps this to the scheduler's slots; raise both together
+INFERENCE_MAX_BATCH_SIZE = int(os.getenv("INFERENCE_MAX_BATCH_SIZE", "4"))
+# micro-batching of concurrent calls for backends that batch (newsmind/batcher.py)
+INFERENCE_BATCHING = os.getenv("INFERENCE_BATCHING", "True") == "True"
+INFERENCE_BATCH_MAX_WAIT_MS = float(os.getenv("INFERENCE_BATCH_MAX_WAIT_MS", "5"))
+INFERENCE_BATCH_WORKERS = int(os.getenv("INFERENCE_BATCH_WORKERS", "1"))
+
+# load the summarizer tokenizer at startup instead of on the first summarize
+# request (slower boot, every process pays for it, including manage.py)
+SUMMARIZER_WARMUP = os.getenv("SUMMARIZER_WARMUP", "False") == "True"
+
+# "local": tokenizer in each worker (preloaded by gunicorn.conf.py);
+# "sidecar": counts come from `manage.py tokenizer_sidecar` over TOKENIZER_SOCKET
+TOKENIZER_MODE = os.getenv("TOKENIZER_MODE", "local")
+TOKENIZER_SOCKET = os.getenv("TOKENIZER_SOCKET", "/tmp/newsmind-tokenizer.sock")
+
+# /summarize/batch/: articles per request, and how many of them are summarized
+# at once (each still waits for a fair-share inference slot)
+SUMMARIZE_BATCH_MAX_ITEMS = int(os.getenv("SUMMARIZE_BATCH_MAX_ITEMS", "20"))
+SUMMARIZE_BATCH_CONCURRENCY = int(os.getenv("SUMMARIZE_BATCH_CONCURRENCY", "4"))
+
+# threads running /summarize/stream/ jobs per process (see newsmind/sse.py)
+SSE_MAX_JOBS = int(os.getenv("SSE_MAX_JOBS", "8"))
+
+# request tracing (see newsmind/tracing.py); spans go to TRACING_EXPORT_PATH
+# unless TRACING_COLLECTOR_URL is set, which takes an OTLP/HTTP JSON traces
+# endpoint such as http://otel-collector:4318/v1/traces
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "False") == "True"
+TRACING_SAMPLE_RATE = float(os.getenv("TRACING_SAMPLE_RATE", "0.1"))
+TRACING_EXPORT_PATH = os.getenv("TRACING_EXPORT_PATH", str(BASE_DIR / "traces.jsonl"))
+TRACING_COLLECTOR_URL = os.getenv("TRACING_COLLECTOR_URL", "")
+TRACING_SERVICE_NAME = os.getenv("TRACING_SERVICE_NAME", "newsmind")
+
+# related summaries (see newsmind/related.py); needs numpy
+RELATED_INDEX_ENABLED = os.getenv("RELATED_INDEX_ENABLED", "True") == "True"
+RELATED_INDEX_DIM = int(os.getenv("RELATED_INDEX_DIM", "512"))
+RELATED_INDEX_MAX_USERS = int(os.getenv("RELATED_INDEX_MAX_USERS", "32"))
+RELATED_IVF_MIN_ITEMS = int(os.getenv("RELATED_IVF_MIN_ITEMS", "20000"))
+RELATED_MIN_SCORE = float(os.getenv("RELATED_MIN_SCORE", "0.2"))
+
+# strip learned per-source boilerplate and noise lines from article text before
+# summarizing (see newsmind/boilerplate.py; `manage.py learn_boilerplate`)
+BOILERPLATE_STRIPPING = os.getenv("BOILERPLATE_STRIPPING", "True") == "True"
+BOILERPLATE_CACHE_SECONDS = int(os.getenv("BOILERPLATE_CACHE_SECONDS", "600"))
+
+# delta sync of the saved-summaries list (see newsmind/summary_sync.py): how
+# long deletions are remembered (older sync tokens must resync from scratch)
+# and how far the handed-out token trails the clock
+SYNC_TOMBSTONE_TTL_SECONDS = int(os.getenv("SYNC_TOMBSTONE_TTL_SECONDS", "2592000"))
+SYNC_SKEW_SECONDS = int(os.getenv("SYNC_SKEW_SECONDS", "5"))
+
+# Idempotency-Key on /summarize/ (see newsmind/idempotency.py): how long a key
+# is remembered, how long a retry waits on the in-flight original, and when a
+# pending key is considered abandoned by a crashed worker
+IDEMPOTENCY_TTL_SECONDS = int(os.getenv("IDEMPOTENCY_TTL_SECONDS", "86400"))
+IDEMPOTENCY_WAIT_SECONDS = float(os.getenv("IDEMPOTENCY_WAIT_SECONDS", "120"))
+IDEMPOTENCY_STALE_SECONDS = float(os.getenv("IDEMPOTENCY_STALE_SECONDS", "600"))
+
 MEDIA_URL = "/media/"
 MEDIA_ROOT = os.path.join(BASE_DIR, "media")
+# a profile read re-queues missing avatar variants at most this often, so an
+# image that keeps failing isn't reprocessed on every page view
+AVATAR_RETRY_SECONDS = int(os.getenv("AVATAR_RETRY_SECONDS", "3600"))
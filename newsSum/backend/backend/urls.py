@@ -16,9 +16,12 @@ Including another URLconf
 """
 
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
+from django.conf import settings
+from newsmind.views_media import serve_media
 from newsmind.views_summarize import (
     UserSummaryListAPIView,
+    UserSummaryChangesAPIView,
     UserSummaryDeleteAPIView,
     UserSummaryDownloadAPIView,
 )
@@ -28,8 +31,19 @@ urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/auth/", include("newsmind.urls")),
     path("api/summaries/", UserSummaryListAPIView.as_view()),
+    path("api/summaries/changes/", UserSummaryChangesAPIView.as_view()),
     path("api/summaries/<str:summary_id>/", UserSummaryDeleteAPIView.as_view()),
     path(
         "api/summaries/<str:summary_id>/download/", UserSummaryDownloadAPIView.as_view()
     ),
 ]
+
+if settings.DEBUG:
+    # production serves /media/ from the front server (see serve_media)
+    urlpatterns += [
+        re_path(
+            r"^%s(?P<path>.*)$" % settings.MEDIA_URL.lstrip("/"),
+            serve_media,
+            name="media",
+        ),
+    ]
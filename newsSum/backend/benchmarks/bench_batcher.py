@@ -0,0 +1,164 @@
+"""
+Throughput/latency curves for the inference micro-batcher.
+
+C closed-loop clients each send one text at a time for --duration seconds,
+either straight to the model (no batching) or through a MicroBatcher for
+every max_batch_size x max_wait_ms combination. Prints texts/s, mean batch
+size and p50/p95/p99 latency per row.
+
+By default the "model" is simulated: a call serialized on one lock that
+takes base + per_token * longest_input * (1 + extra_row * (batch - 1))
+milliseconds, i.e. fixed overhead, padding to the longest input and
+sub-linear cost for extra rows, the way a CPU seq2seq model behaves. Pass
+--model-path to measure the real local backend instead.
+
+    python benchmarks/bench_batcher.py --clients 1 4 16 32
+    python benchmarks/bench_batcher.py --batch-sizes 4 8 16 --waits 2 5 10
+    python benchmarks/bench_batcher.py --model-path models/pegasus-xsum \\
+        --clients 8 --duration 60
+"""
+
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from newsmind.batcher import MicroBatcher  # noqa: E402
+
+
+class SimulatedModel:
+    def __init__(self, base_ms, per_token_ms, extra_row):
+        self.base = base_ms / 1000
+        self.per_token = per_token_ms / 1000
+        self.extra_row = extra_row
+        self.lock = threading.Lock()
+        self.calls = 0
+        self.rows = 0
+
+    def summarize_batch(self, texts):
+        longest = max(len(t) for t in texts) / 4  # ~4 chars per token
+        cost = self.base + self.per_token * longest * (
+            1 + self.extra_row * (len(texts) - 1)
+        )
+        with self.lock:
+            time.sleep(cost)
+            self.calls += 1
+            self.rows += len(texts)
+        return [t[:80] for t in texts]
+
+
+class CountingBackend:
+    """Wraps a real backend to count calls and rows like SimulatedModel."""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.lock = threading.Lock()
+        self.calls = 0
+        self.rows = 0
+
+    def summarize_batch(self, texts):
+        out = self.backend.summarize_batch(texts)
+        with self.lock:
+            self.calls += 1
+            self.rows += len(texts)
+        return out
+
+
+def make_texts(n, seed=11):
+    rng = random.Random(seed)
+    words = "the council storm market court report energy minister city".split()
+    # 100-510 tokens, like chunks from views_summarize
+    return [
+        " ".join(rng.choices(words, k=rng.randint(75, 400))) + "."
+        for _ in range(n)
+    ]
+
+
+def drive(call, texts, clients, duration):
+    latencies = []
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def client(seed):
+        rng = random.Random(seed)
+        while time.perf_counter() < deadline:
+            text = rng.choice(texts)
+            start = time.perf_counter()
+            call(text)
+            with lock:
+                latencies.append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return latencies, time.perf_counter() - start
+
+
+def pct(samples, p):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(p / 100 * len(samples)))] * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[4, 8, 16])
+    parser.add_argument("--waits", type=float, nargs="+", default=[2, 5, 10])
+    parser.add_argument("--duration", type=float, default=5)
+    parser.add_argument("--base-ms", type=float, default=60)
+    parser.add_argument("--per-token-ms", type=float, default=0.3)
+    parser.add_argument("--extra-row", type=float, default=0.3)
+    parser.add_argument("--model-path", help="use the local backend on this model")
+    args = parser.parse_args()
+
+    texts = make_texts(200)
+    real = None
+    if args.model_path:
+        from newsmind.inference import LocalSeq2SeqBackend
+
+        real = LocalSeq2SeqBackend(
+            args.model_path, max_batch_size=max(args.batch_sizes)
+        )
+        real.warm_up()
+
+    def new_model():
+        if real is not None:
+            return CountingBackend(real)
+        return SimulatedModel(args.base_ms, args.per_token_ms, args.extra_row)
+
+    print(
+        f"{'clients':>7} {'batch':>5} {'wait ms':>7} {'texts/s':>8} "
+        f"{'avg batch':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}"
+    )
+    for clients in args.clients:
+        configs = [(1, 0)] + [(b, w) for b in args.batch_sizes for w in args.waits]
+        for batch_size, wait in configs:
+            model = new_model()
+            if batch_size == 1:
+                def call(text, model=model):
+                    return model.summarize_batch([text])[0]
+                label = ("-", "-")
+            else:
+                batcher = MicroBatcher(model.summarize_batch, batch_size, wait)
+                call = batcher.submit
+                label = (batch_size, f"{wait:g}")
+            latencies, elapsed = drive(call, texts, clients, args.duration)
+            print(
+                f"{clients:>7} {label[0]:>5} {label[1]:>7} "
+                f"{len(latencies) / elapsed:>8.1f} "
+                f"{model.rows / max(1, model.calls):>9.2f} "
+                f"{pct(latencies, 50):>8.1f} {pct(latencies, 95):>8.1f} "
+                f"{pct(latencies, 99):>8.1f}"
+            )
+        print()
+
+
+if __name__ == "__main__":
+    main()
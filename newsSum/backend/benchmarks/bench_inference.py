@@ -0,0 +1,131 @@
+"""
+Throughput and latency of the summarization inference backends.
+
+Runs the same synthetic articles through a backend for each combination of
+intra-op threads and batch size, from --concurrency client threads, and
+reports texts/s plus p50/p95 latency per call.
+
+    # local CPU model, PyTorch with dynamic int8 quantization
+    python benchmarks/bench_inference.py --backend local \\
+        --model-path models/pegasus-xsum --threads 1 2 4 --batch-sizes 1 4 8
+
+    # ONNX Runtime on a model from `manage.py export_onnx_model`
+    python benchmarks/bench_inference.py --backend local --engine onnx \\
+        --model-path models/pegasus-xsum-onnx --threads 4
+
+    # remote (or loadtest/fake_hf.py as a stand-in)
+    python benchmarks/bench_inference.py --backend remote \\
+        --endpoint http://127.0.0.1:8901/ --api-key x --concurrency 4
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from newsmind.inference import (  # noqa: E402
+    HF_MODEL,
+    LocalSeq2SeqBackend,
+    RemoteHFBackend,
+)
+
+SENTENCES = [
+    "The city council approved the new budget after weeks of debate.",
+    "Officials said the measure would take effect at the start of next year.",
+    "Opposition members criticised the plan as too costly for taxpayers.",
+    "Analysts expect the decision to affect public transport fares.",
+    "The storm knocked out power to thousands of homes along the coast.",
+    "Emergency crews worked through the night to clear fallen trees.",
+    "Shares rose sharply after the company reported record quarterly profits.",
+    "The minister announced an inquiry into the handling of the contract.",
+]
+
+
+def make_articles(n, seed=5):
+    rng = random.Random(seed)
+    return [
+        " ".join(rng.choice(SENTENCES) for _ in range(rng.randint(15, 30)))
+        for _ in range(n)
+    ]
+
+
+def percentile(samples, pct):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(pct / 100 * len(samples)))]
+
+
+def run(backend, texts, batch_size, concurrency):
+    batches = [texts[i : i + batch_size] for i in range(0, len(texts), batch_size)]
+    latencies = []
+
+    def call(batch):
+        start = time.perf_counter()
+        backend.summarize_batch(batch)
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(call, batches))
+    elapsed = time.perf_counter() - start
+    return len(texts) / elapsed, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--backend", choices=["remote", "local"], default="local")
+    parser.add_argument("--model-path", default=os.getenv("INFERENCE_LOCAL_MODEL_PATH"))
+    parser.add_argument("--engine", choices=["torch", "onnx"], default="torch")
+    parser.add_argument("--no-quantize", action="store_true")
+    parser.add_argument("--threads", type=int, nargs="+", default=[0])
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1])
+    parser.add_argument("--texts", type=int, default=32)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--num-beams", type=int, default=2)
+    parser.add_argument("--max-new-tokens", type=int, default=64)
+    parser.add_argument("--model", default=HF_MODEL)
+    parser.add_argument("--endpoint", default=os.getenv("HF_ENDPOINT_URL", ""))
+    parser.add_argument("--api-key", default=os.getenv("HF_API_KEY", ""))
+    args = parser.parse_args()
+
+    texts = make_articles(args.texts)
+    print(
+        f"{'backend':<14} {'threads':>7} {'batch':>5} {'texts/s':>8} "
+        f"{'p50 ms':>9} {'p95 ms':>9}"
+    )
+    for threads in args.threads:
+        for batch_size in args.batch_sizes:
+            if args.backend == "remote":
+                backend = RemoteHFBackend(
+                    args.api_key, args.model, args.endpoint, call_delay=0
+                )
+                label = "remote"
+            else:
+                backend = LocalSeq2SeqBackend(
+                    args.model_path,
+                    engine=args.engine,
+                    quantize=not args.no_quantize,
+                    threads=threads,
+                    num_beams=args.num_beams,
+                    max_new_tokens=args.max_new_tokens,
+                    max_batch_size=batch_size,
+                )
+                quant = "" if args.no_quantize or args.engine == "onnx" else "+int8"
+                label = f"{args.engine}{quant}"
+            backend.warm_up()
+            backend.summarize_batch(texts[:batch_size])  # first-call overheads
+
+            rate, latencies = run(backend, texts, batch_size, args.concurrency)
+            print(
+                f"{label:<14} {threads or 'auto':>7} {batch_size:>5} {rate:>8.2f} "
+                f"{statistics.median(latencies) * 1000:>9.0f} "
+                f"{percentile(latencies, 95) * 1000:>9.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Login lookup latency: email__iexact vs. exact match on email_normalized.
+
+Seeds the configured database with synthetic users (skipped when enough
+bench users already exist), then times both lookups for random existing
+addresses and prints the MySQL query plans.
+
+    DJANGO_SETTINGS_MODULE=backend.settings \\
+        python benchmarks/bench_login_lookup.py --users 1000000 --lookups 2000
+
+Use a scratch database: seeded rows are only removed with --cleanup.
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "backend.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.contrib.auth.hashers import make_password  # noqa: E402
+from django.db import connection  # noqa: E402
+
+User = get_user_model()
+PREFIX = "bench_login_"
+
+
+def seed(total, batch_size=10000):
+    existing = User.objects.filter(username__startswith=PREFIX).count()
+    # one shared hash: hashing a million passwords isn't what we measure
+    password = make_password("bench-password")
+    start = time.perf_counter()
+    for first in range(existing, total, batch_size):
+        last = min(first + batch_size, total)
+        User.objects.bulk_create(
+            [
+                User(
+                    username=f"{PREFIX}{i}",
+                    username_normalized=f"{PREFIX}{i}",
+                    email=f"{PREFIX}{i}@Example.com",
+                    email_normalized=f"{PREFIX}{i}@example.com",
+                    password=password,
+                )
+                for i in range(first, last)
+            ],
+            batch_size=batch_size,
+        )
+        print(f"\rseeded {last}/{total}", end="", flush=True)
+    if total > existing:
+        print(f"  ({time.perf_counter() - start:.0f}s)")
+
+
+def timed_lookups(label, lookup, emails):
+    samples = []
+    for email in emails:
+        start = time.perf_counter()
+        lookup(email)
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    p95 = samples[int(len(samples) * 0.95) - 1]
+    print(
+        f"{label:<24} mean={statistics.mean(samples):7.3f} ms  "
+        f"p50={samples[len(samples) // 2]:7.3f} ms  p95={p95:7.3f} ms"
+    )
+
+
+def explain(qs):
+    with connection.cursor() as cursor:
+        sql, params = qs.query.sql_with_params()
+        cursor.execute("EXPLAIN " + sql, params)
+        return cursor.fetchall()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--lookups", type=int, default=2000)
+    parser.add_argument("--cleanup", action="store_true")
+    args = parser.parse_args()
+
+    seed(args.users)
+    rng = random.Random(11)
+    emails = [
+        f"{PREFIX}{rng.randrange(args.users)}@EXAMPLE.com" for _ in range(args.lookups)
+    ]
+
+    def before(email):
+        return User.objects.get(email__iexact=email)
+
+    def after(email):
+        return User.objects.get(email_normalized=email.strip().lower())
+
+    # warm buffer pool / query cache equally for both
+    for email in emails[:50]:
+        before(email)
+        after(email)
+
+    timed_lookups("before: email__iexact", before, emails)
+    timed_lookups("after: email_normalized", after, emails)
+
+    if connection.vendor == "mysql":
+        print("plan before:", explain(User.objects.filter(email__iexact=emails[0])))
+        print(
+            "plan after: ",
+            explain(User.objects.filter(email_normalized=emails[0].lower())),
+        )
+
+    if args.cleanup:
+        User.objects.filter(username__startswith=PREFIX).delete()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Benchmark for newsmind.near_dup on synthetic feeds.
+
+Builds N articles made of distinct stories plus syndicated copies (reworded
+headline, trimmed/perturbed body, different outlet URL) and reports runtime
+and how many copies were folded back into their original story.
+
+    python benchmarks/bench_near_dup.py --sizes 1000 2000 5000 --threshold 0.7
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from newsmind.near_dup import collapse_near_duplicates, find_clusters  # noqa: E402
+
+VOCAB = [f"w{i}" for i in range(5000)]
+OUTLETS = ["reuters.com", "apnews.com", "bbc.co.uk", "cnn.com", "nytimes.com"]
+
+
+def make_story(rng, story_id):
+    title = " ".join(rng.choices(VOCAB, k=10))
+    body = " ".join(rng.choices(VOCAB, k=300))
+    return {
+        "id": f"s{story_id}",
+        "title": title,
+        "content": body,
+        "url": f"https://{rng.choice(OUTLETS)}/story/{story_id}",
+        "story": story_id,
+    }
+
+
+def make_copy(rng, art, copy_id):
+    title = art["title"].split()
+    title[rng.randrange(len(title))] = rng.choice(VOCAB)
+    body = art["content"].split()
+    for _ in range(5):
+        body[rng.randrange(len(body))] = rng.choice(VOCAB)
+    return {
+        "id": f"{art['id']}-c{copy_id}",
+        "title": " ".join(title),
+        "content": " ".join(body[: len(body) - rng.randrange(50)]),
+        "url": f"https://{rng.choice(OUTLETS)}/syndicated/{art['story']}/{copy_id}",
+        "story": art["story"],
+    }
+
+
+def make_feed(n, dup_ratio, seed):
+    rng = random.Random(seed)
+    n_stories = max(1, int(n * (1 - dup_ratio)))
+    stories = [make_story(rng, i) for i in range(n_stories)]
+    feed = list(stories)
+    while len(feed) < n:
+        feed.append(make_copy(rng, rng.choice(stories), len(feed)))
+    rng.shuffle(feed)
+    return feed, n_stories
+
+
+def run(n, threshold, dup_ratio, seed):
+    feed, n_stories = make_feed(n, dup_ratio, seed)
+
+    start = time.perf_counter()
+    clusters = find_clusters(feed, threshold)
+    elapsed = time.perf_counter() - start
+
+    # a cluster is pure when all members come from the same story
+    pure = sum(1 for c in clusters if len({feed[i]["story"] for i in c}) == 1)
+    collapsed = collapse_near_duplicates(feed, threshold)
+    print(
+        f"n={n:>6}  stories={n_stories:>6}  clusters={len(clusters):>6}  "
+        f"pure={pure / len(clusters):6.1%}  kept={len(collapsed):>6}  "
+        f"time={elapsed * 1000:8.1f} ms  per-article={elapsed / n * 1e6:6.1f} us"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 2000, 5000])
+    parser.add_argument("--threshold", type=float, default=0.7)
+    parser.add_argument("--dup-ratio", type=float, default=0.3)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    for n in args.sizes:
+        run(n, args.threshold, args.dup_ratio, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Payload size and serialization time for the news feed response.
+
+Compares the previous response shape (every article carrying the provider
+item under `raw`, serialized with json.dumps) against the lean default
+(`raw` dropped, orjson) and shows what gzip/brotli add on top.
+
+    python benchmarks/bench_news_payload.py --articles 100
+    python benchmarks/bench_news_payload.py --fixture top-news.json
+"""
+
+import argparse
+import gzip
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from newsmind.news_normalize import (  # noqa: E402
+    ARTICLE_FIELDS,
+    DEFAULT_FIELDS,
+    dedupe_articles,
+    normalize_top_news,
+    select_fields,
+)
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+WORDS = (
+    "government market election storm court report city police health school "
+    "energy price week company official minister percent world team season"
+).split()
+
+
+def synthetic_top_news(n, seed=3):
+    rng = random.Random(seed)
+    news = []
+    for i in range(n):
+        text = " ".join(rng.choices(WORDS, k=rng.randint(400, 900))) + "."
+        news.append(
+            {
+                "id": 1000 + i,
+                "title": " ".join(rng.choices(WORDS, k=9)).capitalize(),
+                "text": text,
+                "summary": text[:280],
+                "url": f"https://example-{i % 13}.com/news/{i}",
+                "image": f"https://cdn.example.com/img/{i}.jpg",
+                "publish_date": "2026-10-19 08:00:00",
+                "author": "Staff",
+                "authors": ["Staff"],
+                "language": "en",
+                "source_country": "us",
+                "sentiment": 0.1,
+            }
+        )
+    return {"top_news": [{"news": news}], "language": "en", "country": "us"}
+
+
+def timed(fn, repeat):
+    best = float("inf")
+    out = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - start)
+    return out, best
+
+
+def report(label, payload, dumps, repeat):
+    body, seconds = timed(lambda: dumps(payload), repeat)
+    gz = len(gzip.compress(body, compresslevel=6))
+    br = len(brotli.compress(body, quality=5)) if brotli else None
+    print(
+        f"{label:<28} raw={len(body) / 1024:9.1f} KiB  gzip={gz / 1024:8.1f} KiB  "
+        f"br={'n/a' if br is None else f'{br / 1024:8.1f} KiB':>12}  "
+        f"serialize={seconds * 1000:7.2f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--articles", type=int, default=100)
+    parser.add_argument("--fixture", help="recorded WorldNewsAPI top-news JSON")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    if args.fixture:
+        with open(args.fixture, encoding="utf-8") as fh:
+            data = json.load(fh)
+    else:
+        data = synthetic_top_news(args.articles)
+    articles = dedupe_articles(normalize_top_news(data))
+
+    def stdlib(obj):
+        return json.dumps(obj).encode("utf-8")
+
+    full = {"total": len(articles), "articles": select_fields(articles, ARTICLE_FIELDS)}
+    lean = {"total": len(articles), "articles": select_fields(articles, DEFAULT_FIELDS)}
+
+    print(f"{len(articles)} articles")
+    report("before: full + json", full, stdlib, args.repeat)
+    report("lean + json", lean, stdlib, args.repeat)
+    if orjson:
+        report("after: lean + orjson", lean, orjson.dumps, args.repeat)
+    else:
+        print("orjson not installed; skipping orjson rows")
+
+
+if __name__ == "__main__":
+    main()
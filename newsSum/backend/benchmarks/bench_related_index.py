@@ -0,0 +1,122 @@
+"""
+Query latency of the related-summaries index at realistic history sizes.
+
+Builds a synthetic history of N saved summaries spread over topics (each
+topic has its own vocabulary on top of shared filler words), then times
+top-k queries for new articles:
+
+* exact: every row scored (one matrix-vector product)
+* ivf: spherical k-means partitions, only `nprobe` of them scored; recall
+  is measured against the exact top-k
+
+    python benchmarks/bench_related_index.py --sizes 10000 100000 --k 5
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from newsmind.vector_index import DEFAULT_DIM, VectorIndex, embed  # noqa: E402
+
+FILLER = [f"f{i}" for i in range(3000)]
+
+
+def make_text(rng, topic, words=60):
+    vocab = [f"t{topic}w{i}" for i in range(40)]
+    return " ".join(
+        rng.choice(vocab) if rng.random() < 0.5 else rng.choice(FILLER)
+        for _ in range(words)
+    )
+
+
+def percentiles(samples):
+    samples = sorted(samples)
+    return (
+        statistics.median(samples) * 1000,
+        samples[int(0.95 * (len(samples) - 1))] * 1000,
+    )
+
+
+def run(size, topics, queries, k, dim, nprobe, seed):
+    rng = random.Random(seed)
+    start = time.perf_counter()
+    vectors = [
+        embed(make_text(rng, rng.randrange(topics)), dim) for _ in range(size)
+    ]
+    embed_s = time.perf_counter() - start
+
+    exact = VectorIndex(dim=dim, ivf_min_items=2**62)
+    ivf = VectorIndex(dim=dim, ivf_min_items=1, nprobe=nprobe)
+    start = time.perf_counter()
+    for i, vec in enumerate(vectors):
+        exact.add(str(i), vec)
+    add_s = time.perf_counter() - start
+    for i, vec in enumerate(vectors):
+        ivf.add(str(i), vec)
+
+    qvecs = [
+        embed(make_text(rng, rng.randrange(topics)), dim) for _ in range(queries)
+    ]
+    exact.search(qvecs[0], k)  # caches row norms, as a warm worker would have
+    start = time.perf_counter()
+    ivf.search(qvecs[0], k)  # builds the partitions
+    build_s = time.perf_counter() - start
+
+    exact_t, ivf_t, recall = [], [], []
+    for q in qvecs:
+        t0 = time.perf_counter()
+        truth = exact.search(q, k)
+        t1 = time.perf_counter()
+        got = ivf.search(q, k)
+        t2 = time.perf_counter()
+        exact_t.append(t1 - t0)
+        ivf_t.append(t2 - t1)
+        truth_ids = {i for i, _ in truth}
+        recall.append(len(truth_ids & {i for i, _ in got}) / max(1, len(truth_ids)))
+
+    # first query after an insert pays for recomputing the row norms
+    exact.add("fresh", qvecs[0])
+    t0 = time.perf_counter()
+    exact.search(qvecs[1], k)
+    cold_ms = (time.perf_counter() - t0) * 1000
+
+    mib = size * dim * 4 / 2**20
+    print(
+        f"\n{size} items, dim {dim} ({mib:.1f} MiB float32): "
+        f"embed {embed_s:.1f}s, add {add_s * 1e6 / size:.1f} us/item, "
+        f"IVF build {build_s:.2f}s"
+    )
+    p50, p95 = percentiles(exact_t)
+    print(
+        f"  exact  p50 {p50:7.2f} ms  p95 {p95:7.2f} ms"
+        f"  (first query after an insert {cold_ms:.2f} ms)"
+    )
+    p50, p95 = percentiles(ivf_t)
+    print(
+        f"  ivf    p50 {p50:7.2f} ms  p95 {p95:7.2f} ms"
+        f"  recall@{k} {statistics.mean(recall):.3f} (nprobe {nprobe})"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--topics", type=int, default=500)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--dim", type=int, default=DEFAULT_DIM)
+    parser.add_argument("--nprobe", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        run(size, args.topics, args.queries, args.k, args.dim, args.nprobe, args.seed)
+
+
+if __name__ == "__main__":
+    main()
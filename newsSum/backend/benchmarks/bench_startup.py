@@ -0,0 +1,179 @@
+"""
+Process startup cost: import time and time-to-first-request.
+
+Each measurement runs in a fresh interpreter:
+
+* import: `python -X importtime` over django.setup() + backend.urls, reporting
+  the total and the slowest top-level packages by cumulative time
+* first request: wall time from interpreter start to the first response of
+  the Django test client (login with bad credentials, so no fixtures needed)
+
+Pass --ref to also measure another commit (checked out into a temporary git
+worktree) for a before/after comparison:
+
+    python benchmarks/bench_startup.py --runs 5
+    python benchmarks/bench_startup.py --runs 5 --ref HEAD~1
+
+The database must be reachable for the first-request run (the login view
+queries it); use DJANGO_SETTINGS_MODULE=loadtest.settings for SQLite.
+"""
+
+import argparse
+import os
+import re
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+from collections import defaultdict
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_SNIPPET = """
+import django
+django.setup()
+import backend.urls
+"""
+
+FIRST_REQUEST_SNIPPET = """
+import time
+start = time.perf_counter()
+import django
+django.setup()
+from django.test import Client
+from django.test.utils import setup_test_environment
+setup_test_environment()
+res = Client().post(
+    "/api/auth/login/",
+    {"email": "nobody@example.com", "password": "x"},
+    content_type="application/json",
+)
+print("ELAPSED", time.perf_counter() - start, res.status_code)
+"""
+
+IMPORTTIME_RE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def run_python(cwd, code, extra_args=()):
+    env = dict(os.environ)
+    env.setdefault("DJANGO_SETTINGS_MODULE", "backend.settings")
+    env["PYTHONPATH"] = cwd
+    return subprocess.run(
+        [sys.executable, *extra_args, "-c", code],
+        cwd=cwd,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+
+
+def measure_imports(cwd):
+    """Return (total_seconds, {top_level_package: cumulative_seconds})."""
+    proc = run_python(cwd, IMPORT_SNIPPET, ("-X", "importtime"))
+    if proc.returncode != 0:
+        raise SystemExit(f"import failed in {cwd}:\n{proc.stderr[-2000:]}")
+    packages = defaultdict(int)
+    for line in proc.stderr.splitlines():
+        match = IMPORTTIME_RE.match(line)
+        if not match:
+            continue
+        _, cumulative, indent, name = match.groups()
+        # depth 0 entries are what this process asked for; their cumulative
+        # time already includes everything they pulled in
+        if len(indent) == 1:
+            packages[name.split(".")[0]] += int(cumulative)
+    total = sum(packages.values())
+    return total / 1e6, {k: v / 1e6 for k, v in packages.items()}
+
+
+def measure_first_request(cwd):
+    proc = run_python(cwd, FIRST_REQUEST_SNIPPET)
+    for line in proc.stdout.splitlines():
+        if line.startswith("ELAPSED"):
+            return float(line.split()[1])
+    raise SystemExit(f"first request failed in {cwd}:\n{proc.stderr[-2000:]}")
+
+
+def measure(cwd, runs, skip_request):
+    totals, requests = [], []
+    packages = defaultdict(list)
+    for _ in range(runs):
+        total, per_package = measure_imports(cwd)
+        totals.append(total)
+        for name, seconds in per_package.items():
+            packages[name].append(seconds)
+        if not skip_request:
+            requests.append(measure_first_request(cwd))
+    return {
+        "import_s": statistics.median(totals),
+        "first_request_s": statistics.median(requests) if requests else None,
+        "packages": {k: statistics.median(v) for k, v in packages.items()},
+    }
+
+
+def report(label, result, top):
+    print(f"\n{label}")
+    print(f"  imports (django.setup + urls): {result['import_s'] * 1000:8.1f} ms")
+    if result["first_request_s"] is not None:
+        seconds = result["first_request_s"]
+        print(f"  time to first request:         {seconds * 1000:8.1f} ms")
+    slowest = sorted(result["packages"].items(), key=lambda kv: -kv[1])[:top]
+    for name, seconds in slowest:
+        print(f"    {name:<28} {seconds * 1000:8.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=3, help="median of N runs")
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--ref", help="git ref to compare against")
+    parser.add_argument(
+        "--imports-only", action="store_true", help="skip the first-request run"
+    )
+    args = parser.parse_args()
+
+    results = [("working tree", measure(BACKEND_DIR, args.runs, args.imports_only))]
+
+    if args.ref:
+        repo_root = subprocess.run(
+            ["git", "rev-parse", "--show-toplevel"],
+            cwd=BACKEND_DIR, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+        tmp = tempfile.mkdtemp(prefix="newsmind-startup-")
+        worktree = os.path.join(tmp, "tree")
+        subprocess.run(
+            ["git", "worktree", "add", "--detach", worktree, args.ref],
+            cwd=repo_root, check=True, capture_output=True,
+        )
+        try:
+            ref_backend = os.path.join(
+                worktree, os.path.relpath(BACKEND_DIR, repo_root)
+            )
+            before = measure(ref_backend, args.runs, args.imports_only)
+            results.insert(0, (args.ref, before))
+        finally:
+            subprocess.run(
+                ["git", "worktree", "remove", "--force", worktree],
+                cwd=repo_root, capture_output=True,
+            )
+            shutil.rmtree(tmp, ignore_errors=True)
+
+    for label, result in results:
+        report(label, result, args.top)
+
+    if len(results) == 2:
+        before, after = results[0][1], results[1][1]
+        print(
+            f"\nimports: {before['import_s'] * 1000:.1f} -> "
+            f"{after['import_s'] * 1000:.1f} ms"
+        )
+        if before["first_request_s"] is not None:
+            print(
+                f"first request: {before['first_request_s'] * 1000:.1f} -> "
+                f"{after['first_request_s'] * 1000:.1f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""
+Memory per worker and first-call latency for the three tokenizer setups.
+
+Forks N workers the way gunicorn does and has each one count tokens:
+
+* lazy: nothing loaded before fork, each worker loads its own tokenizer
+* preload: tokenization.preload() in the parent, workers share it
+  copy-on-write
+* sidecar: workers hold no tokenizer and ask one sidecar process over a
+  Unix socket
+
+Per worker it reports RSS, PSS (shared pages split between the processes
+sharing them) and USS (private pages) from /proc/self/smaps_rollup, so
+Linux only. Needs transformers and the tokenizer files (HF_MODEL or the
+fallback model) available locally or downloadable.
+
+    python benchmarks/bench_tokenizer_memory.py --workers 4
+"""
+
+import argparse
+import multiprocessing
+import os
+import statistics
+import sys
+import tempfile
+import time
+from importlib.util import find_spec
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from newsmind import tokenization  # noqa: E402
+
+TEXT = " ".join(tokenization.SAMPLE_TEXTS) * 20
+
+
+def memory_kib():
+    values = {}
+    with open("/proc/self/smaps_rollup") as fh:
+        for line in fh:
+            parts = line.split()
+            if len(parts) >= 3 and parts[2] == "kB":
+                values[parts[0].rstrip(":")] = int(parts[1])
+    uss = values.get("Private_Clean", 0) + values.get("Private_Dirty", 0)
+    return {"rss": values.get("Rss", 0), "pss": values.get("Pss", 0), "uss": uss}
+
+
+def worker(mode, socket_path, barrier, results):
+    if mode == "sidecar":
+        client = tokenization.SidecarClient(socket_path)
+
+        def count(text):
+            return client.count([text])[0]
+    else:
+        count = tokenization._count_local
+
+    started = time.perf_counter()
+    first = count(TEXT)
+    first_ms = (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    for _ in range(50):
+        count(TEXT)
+    warm_ms = (time.perf_counter() - started) * 1000 / 50
+
+    # measure while every worker is alive so PSS reflects the real sharing
+    barrier.wait()
+    mem = memory_kib()
+    barrier.wait()
+    results.put({"tokens": first, "first_ms": first_ms, "warm_ms": warm_ms, **mem})
+
+
+def run_mode(mode, workers):
+    ctx = multiprocessing.get_context("fork")
+    sidecar = None
+    socket_path = os.path.join(tempfile.mkdtemp(), "tokenizer.sock")
+    if mode == "sidecar":
+        sidecar = ctx.Process(target=tokenization.serve, args=(socket_path,))
+        sidecar.start()
+        deadline = time.time() + 120
+        while not os.path.exists(socket_path):
+            if time.time() > deadline or not sidecar.is_alive():
+                raise SystemExit("tokenizer sidecar did not start")
+            time.sleep(0.1)
+
+    barrier = ctx.Barrier(workers)
+    results = ctx.Queue()
+    procs = [
+        ctx.Process(target=worker, args=(mode, socket_path, barrier, results))
+        for _ in range(workers)
+    ]
+    for p in procs:
+        p.start()
+    rows = [results.get(timeout=300) for _ in procs]
+    for p in procs:
+        p.join()
+
+    sidecar_mem = None
+    if sidecar is not None:
+        with open(f"/proc/{sidecar.pid}/smaps_rollup") as fh:
+            for line in fh:
+                if line.startswith("Pss:"):
+                    sidecar_mem = int(line.split()[1])
+        sidecar.terminate()
+        sidecar.join()
+    return rows, sidecar_mem
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument(
+        "--modes", default="lazy,preload,sidecar", help="comma separated subset"
+    )
+    args = parser.parse_args()
+
+    if not os.path.exists("/proc/self/smaps_rollup"):
+        raise SystemExit("needs Linux /proc/self/smaps_rollup")
+    if find_spec("transformers") is None:
+        raise SystemExit("transformers is not installed")
+
+    # nothing tokenizer related may be loaded in this process before the lazy
+    # run, or its workers would inherit it
+    os.environ["TOKENIZERS_PARALLELISM"] = "false"
+    print(
+        f"{'mode':<8} {'RSS MiB':>9} {'PSS MiB':>9} {'USS MiB':>9} "
+        f"{'first ms':>9} {'warm ms':>8}"
+    )
+    requested = args.modes.split(",")
+    # preload last: from then on the parent keeps the tokenizer loaded
+    for mode in [m for m in ("lazy", "sidecar", "preload") if m in requested]:
+        if mode == "preload":
+            tokenization.preload()
+        rows, sidecar_pss = run_mode(mode, args.workers)
+
+        def med(key):
+            return statistics.median(r[key] for r in rows)
+
+        print(
+            f"{mode:<8} {med('rss') / 1024:>9.1f} {med('pss') / 1024:>9.1f} "
+            f"{med('uss') / 1024:>9.1f} {med('first_ms'):>9.1f} "
+            f"{med('warm_ms'):>8.2f}"
+        )
+        if sidecar_pss is not None:
+            print(f"{'':<8} + sidecar PSS {sidecar_pss / 1024:.1f} MiB, shared by all")
+
+    tokenizer = tokenization.get_tokenizer()
+    if tokenizer is None:
+        raise SystemExit("no tokenizer could be loaded")
+    safe = tokenization.check_thread_safety(tokenizer)
+    verdict = "ok" if safe else "FAILED (preload() serializes encode())"
+    print(f"\nthread-safety check ({type(tokenizer).__name__}): {verdict}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,26 @@
+"""
+gunicorn settings for the backend: `gunicorn -c gunicorn.conf.py backend.wsgi`.
+
+The tokenizer is loaded once here, in the master, so every forked worker
+shares it copy-on-write (see newsmind/tokenization.py). With
+TOKENIZER_MODE=sidecar the workers ask `manage.py tokenizer_sidecar` instead
+and nothing is preloaded.
+"""
+
+import os
+
+bind = os.getenv("GUNICORN_BIND", "127.0.0.1:8000")
+workers = int(os.getenv("GUNICORN_WORKERS", "4"))
+threads = int(os.getenv("GUNICORN_THREADS", "4"))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))
+
+
+def on_starting(server):
+    if os.getenv("TOKENIZER_MODE", "local") != "local":
+        return
+    from newsmind.tokenization import preload
+
+    if preload():
+        server.log.info("Tokenizer preloaded in master; workers share it")
+    else:
+        server.log.warning("No tokenizer available; token counts use the heuristic")
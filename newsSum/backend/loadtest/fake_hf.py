@@ -0,0 +1,74 @@
+"""
+Stand-in for the Hugging Face summarization endpoint.
+
+Accepts the InferenceClient payload ({"inputs": "...", ...}) on any path and
+answers [{"summary_text": ...}] after a configurable delay.
+
+    python loadtest/fake_hf.py --port 8901 --latency-ms 400 --jitter-ms 150
+"""
+
+import argparse
+import json
+import random
+import re
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+_sentence_re = re.compile(r"(?<=[.!?])\s+")
+
+
+class Handler(BaseHTTPRequestHandler):
+    latency = 0.4
+    jitter = 0.15
+    error_rate = 0.0
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, code, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            payload = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            return self._reply(400, {"error": "invalid json"})
+
+        delay = max(0.0, random.gauss(self.latency, self.jitter))
+        time.sleep(delay)
+        if random.random() < self.error_rate:
+            return self._reply(503, {"error": "model overloaded (simulated)"})
+
+        inputs = payload.get("inputs") or ""
+        if isinstance(inputs, list):
+            inputs = inputs[0] if inputs else ""
+        # first two sentences make a plausible, length-bounded "summary"
+        summary = " ".join(_sentence_re.split(inputs.strip())[:2])[:400]
+        self._reply(200, [{"summary_text": summary}])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--port", type=int, default=8901)
+    parser.add_argument("--latency-ms", type=float, default=400)
+    parser.add_argument("--jitter-ms", type=float, default=150)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    Handler.latency = args.latency_ms / 1000
+    Handler.jitter = args.jitter_ms / 1000
+    Handler.error_rate = args.error_rate
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), Handler)
+    server.daemon_threads = True
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
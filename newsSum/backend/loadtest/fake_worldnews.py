@@ -0,0 +1,109 @@
+"""
+Stand-in for WorldNewsAPI's /top-news.
+
+Serves recorded responses from --fixtures (files named
+<country>-<language>.json, falling back to any file in the directory) or,
+without fixtures, a synthetic response of --articles articles per market.
+
+    python loadtest/fake_worldnews.py --port 8902 --fixtures loadtest/fixtures
+"""
+
+import argparse
+import json
+import os
+import random
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+WORDS = (
+    "government market election storm court report city police health school "
+    "energy price week company official minister percent world team season "
+    "council budget trade talks weather rescue vote league record study"
+).split()
+
+
+def synthetic_top_news(country, language, n, seed):
+    rng = random.Random(f"{seed}-{country}-{language}")
+    news = []
+    for i in range(n):
+        sentences = [
+            " ".join(rng.choices(WORDS, k=rng.randint(10, 25))).capitalize() + "."
+            for _ in range(rng.randint(15, 120))
+        ]
+        text = " ".join(sentences)
+        news.append(
+            {
+                "id": rng.randrange(10**9),
+                "title": " ".join(rng.choices(WORDS, k=8)).capitalize(),
+                "text": text,
+                "summary": text[:280],
+                "url": f"https://{country}.example-news.com/{language}/{i}",
+                "image": f"https://img.example-news.com/{country}/{i}.jpg",
+                "publish_date": f"2026-10-19 {i % 24:02d}:{i % 60:02d}:00",
+                "author": "Staff",
+                "language": language,
+                "source_country": country,
+            }
+        )
+    return {"top_news": [{"news": news}], "language": language, "country": country}
+
+
+class Handler(BaseHTTPRequestHandler):
+    latency = 0.15
+    fixtures = {}
+    articles = 40
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        country = (query.get("source-country") or ["us"])[0]
+        language = (query.get("language") or ["en"])[0]
+
+        time.sleep(self.latency)
+        data = self.fixtures.get(f"{country}-{language}")
+        if data is None and self.fixtures:
+            data = next(iter(self.fixtures.values()))
+        if data is None:
+            data = synthetic_top_news(country, language, self.articles, seed=1)
+
+        body = json.dumps(data).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def load_fixtures(directory):
+    fixtures = {}
+    if directory and os.path.isdir(directory):
+        for name in sorted(os.listdir(directory)):
+            if name.endswith(".json"):
+                with open(os.path.join(directory, name), encoding="utf-8") as fh:
+                    fixtures[name[: -len(".json")]] = json.load(fh)
+    return fixtures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--port", type=int, default=8902)
+    parser.add_argument("--latency-ms", type=float, default=150)
+    parser.add_argument("--fixtures")
+    parser.add_argument("--articles", type=int, default=40)
+    args = parser.parse_args()
+
+    Handler.latency = args.latency_ms / 1000
+    Handler.fixtures = load_fixtures(args.fixtures)
+    Handler.articles = args.articles
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), Handler)
+    server.daemon_threads = True
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,347 @@
+"""
+End-to-end load test against local stand-ins.
+
+Starts the fake HF and WorldNewsAPI servers, migrates a scratch database,
+boots the Django app under gunicorn (WSGI) or uvicorn (ASGI) and drives a
+weighted mix of login / news / summarize / list / download / delete from
+concurrent virtual users. Prints throughput and p50/p95/p99 per endpoint.
+
+Mongo must be reachable at --mongo-uri (a throwaway local mongod; pass
+--start-mongod to spawn one in a temp dir if `mongod` is on PATH).
+
+    python loadtest/run.py --server wsgi --workers 4 --users 20 --duration 60
+    python loadtest/run.py --server asgi --workers 4 --users 20 --duration 60 \\
+        --mix news=40,summarize=10,list=25,download=10,delete=5,login=10
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+
+import requests
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HERE = os.path.join(BACKEND_DIR, "loadtest")
+
+DEFAULT_MIX = "news=35,summarize=10,list=25,download=10,delete=5,login=15"
+PASSWORD = "loadtest-pass-123"
+
+
+# --- Process management ---
+class Processes:
+    def __init__(self):
+        self.procs = []
+
+    def start(self, args, env=None, **kwargs):
+        proc = subprocess.Popen(
+            args,
+            cwd=BACKEND_DIR,
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=kwargs.pop("stderr", subprocess.DEVNULL),
+            **kwargs,
+        )
+        self.procs.append(proc)
+        return proc
+
+    def stop(self):
+        for proc in reversed(self.procs):
+            proc.terminate()
+        for proc in reversed(self.procs):
+            try:
+                proc.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+
+
+def wait_for(url, timeout=60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            requests.get(url, timeout=2)
+            return
+        except requests.RequestException:
+            time.sleep(0.3)
+    raise RuntimeError(f"{url} did not come up within {timeout}s")
+
+
+def server_command(kind, workers, threads, port):
+    bind = f"127.0.0.1:{port}"
+    if kind == "wsgi":
+        return [
+            sys.executable, "-m", "gunicorn", "backend.wsgi:application",
+            "--workers", str(workers), "--threads", str(threads),
+            "--bind", bind, "--timeout", "120",
+        ]
+    return [
+        sys.executable, "-m", "uvicorn", "backend.asgi:application",
+        "--workers", str(workers), "--host", "127.0.0.1", "--port", str(port),
+        "--no-access-log",
+    ]
+
+
+# --- Virtual users ---
+class Recorder:
+    def __init__(self):
+        self.samples = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.lock = threading.Lock()
+
+    def record(self, endpoint, seconds, ok):
+        with self.lock:
+            self.samples[endpoint].append(seconds)
+            if not ok:
+                self.errors[endpoint] += 1
+
+
+class VirtualUser:
+    def __init__(self, base, index, recorder, rng):
+        self.base = base
+        self.email = f"lt{index}@loadtest.local"
+        self.username = f"lt{index}"
+        self.recorder = recorder
+        self.rng = rng
+        self.session = requests.Session()
+        self.articles = []
+        self.saved_ids = []
+
+    def call(self, endpoint, method, path, expected=(200,), **kwargs):
+        start = time.perf_counter()
+        try:
+            res = self.session.request(method, self.base + path, timeout=120, **kwargs)
+            ok = res.status_code in expected
+        except requests.RequestException:
+            res, ok = None, False
+        self.recorder.record(endpoint, time.perf_counter() - start, ok)
+        return res if ok else None
+
+    def setup(self):
+        self.session.post(
+            self.base + "/api/auth/signup/",
+            json={
+                "username": self.username,
+                "email": self.email,
+                "password": PASSWORD,
+                "password2": PASSWORD,
+            },
+            timeout=60,
+        )
+        if not self.login():
+            raise RuntimeError(f"login failed for {self.email}")
+
+    def login(self):
+        res = self.call(
+            "login",
+            "POST",
+            "/api/auth/login/",
+            json={"email": self.email, "password": PASSWORD},
+        )
+        if res is None:
+            return False
+        self.session.headers["Authorization"] = f"Bearer {res.json()['access']}"
+        return True
+
+    def news(self):
+        res = self.call("news", "GET", "/api/auth/news/")
+        if res is not None:
+            self.articles = res.json().get("articles") or self.articles
+
+    def summarize(self):
+        if not self.articles:
+            return self.news()
+        article = self.rng.choice(self.articles)
+        res = self.call(
+            "summarize", "POST", "/api/auth/summarize/", expected=(201,), json=article
+        )
+        if res is not None:
+            self.saved_ids.append(res.json()["saved_id"])
+
+    def list(self):
+        self.call("list", "GET", "/api/summaries/")
+
+    def download(self):
+        if not self.saved_ids:
+            return self.summarize()
+        sid = self.rng.choice(self.saved_ids)
+        self.call("download", "GET", f"/api/summaries/{sid}/download/")
+
+    def delete(self):
+        if not self.saved_ids:
+            return self.summarize()
+        sid = self.saved_ids.pop(self.rng.randrange(len(self.saved_ids)))
+        self.call("delete", "DELETE", f"/api/summaries/{sid}/", expected=(204,))
+
+    def run(self, mix, deadline):
+        actions, weights = zip(*mix.items())
+        while time.time() < deadline:
+            getattr(self, self.rng.choices(actions, weights)[0])()
+
+
+def parse_mix(value):
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in ("login", "news", "summarize", "list", "download", "delete"):
+            raise SystemExit(f"unknown action in --mix: {name}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def percentile(sorted_samples, pct):
+    if not sorted_samples:
+        return 0.0
+    rank = int(round(pct / 100 * len(sorted_samples))) - 1
+    return sorted_samples[min(len(sorted_samples) - 1, max(0, rank))]
+
+
+def report(recorder, elapsed, label):
+    rows = []
+    print(f"\n{label}: {elapsed:.1f}s")
+    print(
+        f"{'endpoint':<10} {'reqs':>7} {'err':>5} {'req/s':>8} "
+        f"{'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}"
+    )
+    total = 0
+    for endpoint in sorted(recorder.samples):
+        samples = sorted(recorder.samples[endpoint])
+        total += len(samples)
+        row = {
+            "endpoint": endpoint,
+            "requests": len(samples),
+            "errors": recorder.errors[endpoint],
+            "rps": len(samples) / elapsed,
+            "p50_ms": percentile(samples, 50) * 1000,
+            "p95_ms": percentile(samples, 95) * 1000,
+            "p99_ms": percentile(samples, 99) * 1000,
+        }
+        rows.append(row)
+        print(
+            f"{endpoint:<10} {row['requests']:>7} {row['errors']:>5} {row['rps']:>8.1f} "
+            f"{row['p50_ms']:>9.1f} {row['p95_ms']:>9.1f} {row['p99_ms']:>9.1f}"
+        )
+    print(f"{'total':<10} {total:>7} {'':>5} {total / elapsed:>8.1f}")
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--server", choices=["wsgi", "asgi"], default="wsgi")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument(
+        "--threads", type=int, default=4, help="gunicorn threads per worker"
+    )
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=60)
+    parser.add_argument("--mix", default=DEFAULT_MIX)
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--hf-latency-ms", type=float, default=400)
+    parser.add_argument("--news-latency-ms", type=float, default=150)
+    parser.add_argument("--fixtures", help="directory of recorded top-news JSON")
+    parser.add_argument("--mongo-uri", default="mongodb://127.0.0.1:27017/")
+    parser.add_argument("--start-mongod", action="store_true")
+    parser.add_argument("--json", help="also write results to this file")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    mix = parse_mix(args.mix)
+    procs = Processes()
+    tmpdir = tempfile.mkdtemp(prefix="newsmind-loadtest-")
+    try:
+        mongo_uri = args.mongo_uri
+        if args.start_mongod:
+            if not shutil.which("mongod"):
+                raise SystemExit("--start-mongod given but mongod is not on PATH")
+            os.makedirs(os.path.join(tmpdir, "mongo"))
+            procs.start(
+                ["mongod", "--dbpath", os.path.join(tmpdir, "mongo"),
+                 "--port", str(args.port + 17), "--bind_ip", "127.0.0.1"]
+            )
+            mongo_uri = f"mongodb://127.0.0.1:{args.port + 17}/"
+
+        hf_port, news_port = args.port + 1, args.port + 2
+        procs.start(
+            [sys.executable, os.path.join(HERE, "fake_hf.py"), "--port", str(hf_port),
+             "--latency-ms", str(args.hf_latency_ms)]
+        )
+        news_cmd = [
+            sys.executable, os.path.join(HERE, "fake_worldnews.py"),
+            "--port", str(news_port), "--latency-ms", str(args.news_latency_ms),
+        ]
+        if args.fixtures:
+            news_cmd += ["--fixtures", args.fixtures]
+        procs.start(news_cmd)
+
+        env = dict(
+            os.environ,
+            DJANGO_SETTINGS_MODULE="loadtest.settings",
+            LOADTEST_SQLITE_PATH=os.path.join(tmpdir, "db.sqlite3"),
+            MONGO_URI=mongo_uri,
+            HF_API_KEY="loadtest",
+            HF_ENDPOINT_URL=f"http://127.0.0.1:{hf_port}/",
+            HF_CALL_SLEEP="0",
+            # no hub downloads: token counting falls back to the heuristic
+            HF_HUB_OFFLINE="1",
+            TRANSFORMERS_OFFLINE="1",
+            WORLDNEWS_API_KEY="loadtest",
+            WORLDNEWS_API_URL=f"http://127.0.0.1:{news_port}/top-news",
+        )
+        subprocess.run(
+            [sys.executable, "manage.py", "migrate", "--noinput"],
+            cwd=BACKEND_DIR, env=env, check=True, stdout=subprocess.DEVNULL,
+        )
+        procs.start(
+            server_command(args.server, args.workers, args.threads, args.port), env=env
+        )
+        base = f"http://127.0.0.1:{args.port}"
+        wait_for(base + "/api/auth/login/")
+
+        recorder = Recorder()
+        users = [
+            VirtualUser(base, i, recorder, random.Random(args.seed + i))
+            for i in range(args.users)
+        ]
+        for user in users:
+            user.setup()
+        recorder.samples.clear()
+        recorder.errors.clear()
+
+        start = time.time()
+        deadline = start + args.duration
+        threads = [
+            threading.Thread(target=u.run, args=(mix, deadline), daemon=True)
+            for u in users
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.time() - start
+
+        label = (
+            f"{args.server.upper()} workers={args.workers} users={args.users} "
+            f"hf={args.hf_latency_ms:.0f}ms news={args.news_latency_ms:.0f}ms"
+        )
+        rows = report(recorder, elapsed, label)
+        if args.json:
+            with open(args.json, "w", encoding="utf-8") as fh:
+                json.dump(
+                    {"config": vars(args), "elapsed": elapsed, "endpoints": rows},
+                    fh,
+                    indent=2,
+                )
+    finally:
+        procs.stop()
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
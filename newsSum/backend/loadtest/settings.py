@@ -0,0 +1,29 @@
+"""
+Settings for load tests: the real project settings pointed at local
+stand-ins (see loadtest/run.py, which sets the environment).
+"""
+
+import os
+
+from backend.settings import *  # noqa: F401,F403
+
+DEBUG = False
+ALLOWED_HOSTS = ["127.0.0.1", "localhost"]
+
+# SQLite by default so a run needs no MySQL; LOADTEST_DB=mysql keeps the
+# project database settings
+if os.getenv("LOADTEST_DB", "sqlite") == "sqlite":
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": os.getenv("LOADTEST_SQLITE_PATH", "/tmp/newsmind-loadtest.sqlite3"),
+            "OPTIONS": {"timeout": 30},
+        }
+    }
+
+# the harness measures the service, not the quota policy
+HF_USER_CALLS_PER_WINDOW = 0
+HF_USER_TOKENS_PER_WINDOW = 0
+
+NEWS_FEED_SOURCE = os.getenv("NEWS_FEED_SOURCE", "proxy")
+TRACING_ENABLED = False
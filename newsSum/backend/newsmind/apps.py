@@ -7,3 +7,10 @@ class NewsmindConfig(AppConfig):
     def ready(self):
         # import signals so they get registered
         import newsmind.signals  # noqa
+
+        from django.conf import settings
+
+        if getattr(settings, "SUMMARIZER_WARMUP", False):
+            from .views_summarize import warm_up
+
+            warm_up()
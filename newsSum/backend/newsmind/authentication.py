@@ -0,0 +1,32 @@
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from .user_cache import user_cache
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that resolves the token's user through `user_cache`
+    instead of hitting MySQL on every request. Misses go through the stock
+    lookup and populate the cache; hits are re-checked for is_active like
+    the stock lookup does, so a cached user can't outlive its deactivation
+    in this process.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken("Token contained no recognizable user identification")
+
+        user = user_cache.get(user_id)
+        if user is not None:
+            if not user.is_active:
+                user_cache.invalidate(user_id)
+                raise AuthenticationFailed("User is inactive", code="user_inactive")
+            return user
+
+        user = super().get_user(validated_token)
+        user_cache.set(user_id, user)
+        return user
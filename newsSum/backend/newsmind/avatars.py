@@ -0,0 +1,166 @@
+"""
+Avatar processing pipeline.
+
+An upload is decoded once, EXIF-rotated and re-encoded without metadata
+during the request (store_stripped_avatar), so the raw file, with whatever
+EXIF/GPS data it carries, never reaches storage. The smaller WebP variants
+are then made in a background worker from that same decoded image; only a
+retry (see ProfileDetail.get) decodes the stored copy again. All files get
+content-hashed names, so they can be served with immutable cache headers
+(see views_media.py).
+
+CustomUser.avatar_queued_at records when variants were last queued, so a
+profile read retries a lost or failed job at most every AVATAR_RETRY_SECONDS.
+"""
+
+import hashlib
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+AVATAR_DIR = "avatars/"
+# square edge lengths in px; "full" is the stripped original, capped in size
+VARIANT_SIZES = (64, 128, 256)
+FULL_MAX_SIZE = 1024
+WEBP_QUALITY = 80
+
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="avatar")
+
+
+def _encode_webp(img: Image.Image) -> bytes:
+    buf = BytesIO()
+    # no exif/icc passed in, so nothing but pixels is written out
+    img.save(buf, format="WEBP", quality=WEBP_QUALITY, method=4)
+    return buf.getvalue()
+
+
+def _save_hashed(data: bytes, user_id: int, suffix: str) -> str:
+    digest = hashlib.sha256(data).hexdigest()[:16]
+    # per-user directory: identical images from two users never share a file
+    name = f"{AVATAR_DIR}{user_id}/{digest}{suffix}.webp"
+    if not default_storage.exists(name):
+        name = default_storage.save(name, ContentFile(data))
+    return name
+
+
+def _decode(source) -> Image.Image:
+    with Image.open(source) as img:
+        img = ImageOps.exif_transpose(img)
+        return img.convert("RGBA" if img.mode in ("RGBA", "LA", "P") else "RGB")
+
+
+def store_stripped_avatar(upload, user_id: int) -> tuple:
+    """
+    Decode an uploaded image and store it re-encoded without metadata,
+    capped in size. Returns (stored name, decoded image) so the variants can
+    be built without decoding again. Raises if it can't be decoded.
+    """
+    full = _decode(upload)
+    full.thumbnail((FULL_MAX_SIZE, FULL_MAX_SIZE), Image.LANCZOS)
+    return _save_hashed(_encode_webp(full), user_id, ""), full
+
+
+def build_variants(full: Image.Image, user_id: int) -> dict:
+    """{size: name} of square variants of `full`, the decoded stripped avatar."""
+    # centre-crop to a square once, then scale down largest -> smallest so each
+    # resize starts from the previous (already smaller) image
+    square = ImageOps.fit(full, (max(VARIANT_SIZES),) * 2, Image.LANCZOS)
+    variants = {}
+    for size in sorted(VARIANT_SIZES, reverse=True):
+        square = square.resize((size, size), Image.LANCZOS)
+        variants[str(size)] = _save_hashed(
+            _encode_webp(square), user_id, f"_{size}"
+        )
+    return variants
+
+
+def delete_files(names):
+    for name in names:
+        try:
+            if name and default_storage.exists(name):
+                default_storage.delete(name)
+        except Exception:
+            logger.exception("Failed to delete avatar file %s", name)
+
+
+def process_avatar(user_id: int, full_name: str, image=None):
+    """
+    Store the variants of the user's (already stripped) avatar, from `image`
+    when the upload's decoded image is at hand, else from the stored copy.
+    Skipped if the avatar changed again in the meantime.
+    """
+    from .models import CustomUser
+
+    try:
+        user = CustomUser.objects.get(pk=user_id)
+        if not user.avatar or user.avatar.name != full_name:
+            return
+        if image is None:
+            with default_storage.open(full_name, "rb") as fh:
+                image = _decode(fh)
+        variants = build_variants(image, user_id)
+    except Exception:
+        # the stripped full image stays; variants are retried by a profile
+        # read once AVATAR_RETRY_SECONDS have passed (see ProfileDetail.get)
+        logger.exception("Avatar processing failed for user %s", user_id)
+        return
+
+    with transaction.atomic():
+        user = CustomUser.objects.select_for_update().get(pk=user_id)
+        if not user.avatar or user.avatar.name != full_name:
+            # a newer upload won; drop what we just wrote unless it is in use
+            in_use = {user.avatar.name, *(user.avatar_variants or {}).values()}
+            delete_files(set(variants.values()) - in_use)
+            return
+        old_variants = list((user.avatar_variants or {}).values())
+        user.avatar_variants = variants
+        # save() (not .update()) so post_save invalidates the user cache
+        user.save(update_fields=["avatar_variants"])
+
+    delete_files(set(old_variants) - set(variants.values()))
+
+
+def needs_retry(user) -> bool:
+    """Variants missing and the last attempt (if any) is old enough to retry."""
+    if not user.avatar or user.avatar_variants:
+        return False
+    if user.avatar_queued_at is None:
+        return True
+    retry_after = getattr(settings, "AVATAR_RETRY_SECONDS", 3600)
+    return (timezone.now() - user.avatar_queued_at).total_seconds() > retry_after
+
+
+def schedule_avatar_processing(user, image=None):
+    """
+    Queue building `user`'s avatar variants after commit, from `image` (the
+    decoded upload) if given. Records the attempt on the user.
+    """
+    if not user.avatar:
+        return
+    user.avatar_queued_at = timezone.now()
+    # save() (not .update()) so post_save invalidates the user cache
+    user.save(update_fields=["avatar_queued_at"])
+    user_id, name = user.pk, user.avatar.name
+    transaction.on_commit(
+        lambda: _executor.submit(process_avatar, user_id, name, image)
+    )
+
+
+def remove_avatar(user, save=True):
+    """Delete the avatar and all its variants."""
+    variants = list((user.avatar_variants or {}).values())
+    user.avatar_variants = {}
+    if user.avatar:
+        user.avatar.delete(save=False)
+    if save:
+        user.save(update_fields=["avatar", "avatar_variants"])
+    delete_files(variants)
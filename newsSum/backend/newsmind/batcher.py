@@ -0,0 +1,165 @@
+"""
+Dynamic micro-batching of summarization calls.
+
+Callers block in `submit(text)` while a dispatcher thread collects pending
+inputs for up to `max_wait_ms` (or until `max_batch_size` are waiting),
+makes one `summarize_batch` call and hands each caller its own result.
+The model pads every input of a call to the longest one, so when more
+inputs are waiting than fit in a batch, the oldest one is batched with the
+waiting inputs closest to it in length rather than with the next in line.
+
+Only worth it for backends that really batch (the local seq2seq backend);
+get_batcher() returns None for the remote one, whose API takes one input
+per request. Concurrent requests and the chunks of one long article (see
+views_summarize._summarize_level) both feed the same batches.
+"""
+
+import itertools
+import logging
+import threading
+import time
+from collections import deque
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class _Pending:
+    __slots__ = ("text", "enqueued", "done", "result", "error")
+
+    def __init__(self, text):
+        self.text = text
+        self.enqueued = time.monotonic()
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class MicroBatcher:
+    def __init__(
+        self,
+        summarize_batch,
+        max_batch_size: int = 8,
+        max_wait_ms: float = 5.0,
+        workers: int = 1,
+    ):
+        self.summarize_batch = summarize_batch
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+        self.workers = max(1, workers)
+        self._queue = deque()
+        self._cond = threading.Condition()
+        self._threads = []
+
+    def _start(self):
+        # threads start on first use, i.e. in the worker process after fork
+        for i in range(self.workers):
+            thread = threading.Thread(
+                target=self._run, name=f"micro-batcher-{i}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def submit(self, text: str) -> str:
+        """Summarize `text` as part of the next batch; blocks until done."""
+        item = _Pending(text)
+        with self._cond:
+            if not self._threads:
+                self._start()
+            self._queue.append(item)
+            self._cond.notify()
+        item.done.wait()
+        if item.error is not None:
+            raise item.error
+        return item.result
+
+    def _next_batch(self):
+        with self._cond:
+            while not self._queue:
+                self._cond.wait()
+            deadline = self._queue[0].enqueued + self.max_wait
+            while len(self._queue) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+                if not self._queue:  # another worker took them
+                    return []
+            if len(self._queue) <= self.max_batch_size:
+                batch = list(self._queue)
+                self._queue.clear()
+                return batch
+            return self._take_similar()
+
+    def _take_similar(self):
+        # the oldest always goes (no starvation); the rest are picked by
+        # length, which is what decides the padding of the model call
+        anchor = self._queue[0]
+        target = len(anchor.text)
+        rest = sorted(
+            itertools.islice(self._queue, 1, None),
+            key=lambda item: abs(len(item.text) - target),
+        )
+        batch = [anchor] + rest[: self.max_batch_size - 1]
+        chosen = {id(item) for item in batch}
+        self._queue = deque(item for item in self._queue if id(item) not in chosen)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if batch:
+                self._dispatch(batch)
+
+    def _dispatch(self, batch):
+        now = time.monotonic()
+        metrics.observe("batcher.batch_size", len(batch))
+        metrics.observe("batcher.wait_ms", (now - batch[0].enqueued) * 1000)
+        try:
+            results = self.summarize_batch([item.text for item in batch])
+            for item, result in zip(batch, results):
+                item.result = result
+        except Exception as e:
+            for item in batch:
+                item.error = e
+        finally:
+            for item in batch:
+                item.done.set()
+
+
+_batcher = None
+_batcher_lock = threading.Lock()
+
+
+def get_batcher(backend):
+    """
+    The process-wide batcher for `backend`, or None if batching is off.
+    Callers hold a scheduler slot while they wait in a batch, so a batch can
+    never be larger than the slot count; the size is clamped to it.
+    """
+    global _batcher
+    from django.conf import settings
+
+    from .scheduler import scheduler
+
+    size = min(backend.max_batch_size, scheduler.slots)
+    if size <= 1 or not getattr(settings, "INFERENCE_BATCHING", True):
+        return None
+    if _batcher is None:
+        with _batcher_lock:
+            if _batcher is None:
+                if size < backend.max_batch_size:
+                    logger.warning(
+                        "Batch size %d clamped to the %d scheduler slots; raise "
+                        "HF_MAX_CONCURRENCY to allow larger batches",
+                        backend.max_batch_size,
+                        size,
+                    )
+                _batcher = MicroBatcher(
+                    backend.summarize_batch,
+                    max_batch_size=size,
+                    max_wait_ms=getattr(settings, "INFERENCE_BATCH_MAX_WAIT_MS", 5),
+                    workers=getattr(settings, "INFERENCE_BATCH_WORKERS", 1),
+                )
+    return _batcher
@@ -0,0 +1,251 @@
+"""
+Boilerplate and noise stripping for article text before summarization.
+
+Two passes over the body, line by line:
+
+- lines that recur across many articles from the same source host
+  (newsletter prompts, bylines, footers) are learned from the ingested
+  `articles` store into a hashed line-frequency table and dropped;
+- rule-based NOISE_PATTERNS drop well-known noise sentences anywhere
+  ("Read more", photo credits, cookie notices, provider truncation markers).
+  Patterns that could also start a real sentence ("Share ...", "Images
+  ...") are anchored to the whole short widget or credit line.
+
+The table only keeps hashes, never text, and is rebuilt from the corpus by
+`manage.py learn_boilerplate`. The core (LineFrequencyTable, strip_noise) is
+free of Django imports so the benchmarks can use it.
+"""
+
+import hashlib
+import re
+import threading
+import time
+from collections import Counter
+from urllib.parse import urlparse
+
+COLLECTION = "boilerplate_lines"
+
+# a line is boilerplate for a host once it shows up in this share of the
+# host's articles, and in at least MIN_LINE_DOCS of them
+MIN_FRACTION = 0.3
+MIN_LINE_DOCS = 3
+# hosts with fewer sampled articles than this get the rules only
+MIN_HOST_DOCS = 20
+
+# picture agencies, for credit lines ("Photo: Jane Doe/Reuters")
+_AGENCY = (
+    r"(getty( images)?|reuters|ap|afp|epa|pa|shutterstock|alamy|bloomberg"
+    r"|xinhua|anadolu)"
+)
+_SHARE_TARGET = r"(facebook|twitter|x|whatsapp|linkedin|e-?mail|reddit|telegram)"
+
+NOISE_PATTERNS = [
+    re.compile(p, re.IGNORECASE)
+    for p in (
+        r"^(read|see) (more|also|next)\b.*",
+        r"^(continue|keep) reading\b.*",
+        r"^(click|tap) here\b.*",
+        r"^(sign up|subscribe)\b.*\b(newsletter|updates|inbox|email)s?\b.*",
+        r"^get (our|the) .*\bnewsletter\b.*",
+        r"^(follow|like) us on\b.*",
+        # share widgets only: "Share this article", "Share on Facebook, X"
+        r"^share (this (article|story|post|page|video)|on|via)\b"
+        rf"(\s*(on|via|,|/|\||&|and|or)?\s*{_SHARE_TARGET}\b)*[\s:.]*$",
+        # credit lines: short, with a "credit" label or an agency at the end
+        r"^\(?(photo|image|picture|video)s? credit\s*[:|][^.!?]{1,80}\)?\.?$",
+        rf"^\(?(file )?(photo|image|picture|video)s?\s*[:|][^.!?]{{0,60}}"
+        rf"\b{_AGENCY}\)?\.?$",
+        rf"^[\w.' -]{{1,40}}/\s*{_AGENCY}( via getty images)?\.?$",
+        r"^.*\bwe use cookies\b.*",
+        r"^.*\b(accept|manage) (all )?cookies\b.*",
+        r"^advertisement\.?$",
+        # footers: "© 2025 Example Media", "Copyright (c) 2025 ...", "... All
+        # rights reserved."
+        r"^(©|copyright)\s*(\(c\)\s*|©\s*)?\d{4}\b[^.!?]{0,80}\.?$",
+        r"^.{0,80}\ball rights reserved\.?$",
+        r"^this (article|story) (was|has been|is) (originally )?"
+        r"(published|updated|produced)\b.*",
+        r"^\[\+\d+ chars\]$",
+    )
+]
+# provider truncation marker glued to the end of a sentence
+_truncation_re = re.compile(r"\s*(\.\.\.|…)?\s*\[\+\d+ chars\]\s*$")
+_sentence_split_re = re.compile(r"(?<=[\.\!\?])\s+")
+_digits_re = re.compile(r"\d+")
+_space_re = re.compile(r"\s+")
+
+
+def normalize_line(line: str) -> str:
+    """Case, digits and whitespace folded so dated variants of a line match."""
+    line = _digits_re.sub("0", line.lower())
+    return _space_re.sub(" ", line).strip(" \t-–—|•*")
+
+
+def line_hash(line: str) -> str:
+    return hashlib.blake2b(
+        normalize_line(line).encode("utf-8"), digest_size=8
+    ).hexdigest()
+
+
+def source_host(article: dict) -> str:
+    """Host the article came from, without "www."; "" if unknown."""
+    host = ""
+    if article.get("url"):
+        try:
+            host = urlparse(article["url"]).hostname or ""
+        except ValueError:
+            host = ""
+    if not host and isinstance(article.get("source"), str):
+        host = article["source"]
+    host = host.lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+def _lines(text: str) -> list:
+    return [line for line in text.splitlines() if line.strip()]
+
+
+class LineFrequencyTable:
+    """Per-host counts of how many articles contain each (hashed) line."""
+
+    def __init__(
+        self,
+        min_fraction: float = MIN_FRACTION,
+        min_line_docs: int = MIN_LINE_DOCS,
+        min_host_docs: int = MIN_HOST_DOCS,
+    ):
+        self.min_fraction = min_fraction
+        self.min_line_docs = min_line_docs
+        self.min_host_docs = min_host_docs
+        self.docs = Counter()
+        self.lines = {}
+
+    def learn(self, host: str, text: str):
+        if not host or not text:
+            return
+        self.docs[host] += 1
+        counts = self.lines.setdefault(host, Counter())
+        # once per article: a line repeated inside one article isn't boilerplate
+        counts.update({line_hash(line) for line in _lines(text)})
+
+    def boilerplate(self, host: str) -> frozenset:
+        docs = self.docs.get(host, 0)
+        if docs < self.min_host_docs:
+            return frozenset()
+        threshold = max(self.min_line_docs, self.min_fraction * docs)
+        return frozenset(
+            h for h, count in self.lines[host].items() if count >= threshold
+        )
+
+    def hosts(self):
+        return list(self.docs)
+
+
+def strip_noise(text: str, boilerplate_hashes=frozenset()) -> tuple:
+    """
+    Remove learned boilerplate lines and rule-based noise sentences.
+    Returns (cleaned_text, removed) where `removed` counts dropped lines and
+    sentences.
+    """
+    if not text:
+        return text, 0
+    kept_lines = []
+    removed = 0
+    for line in text.splitlines():
+        stripped = line.strip()
+        if not stripped:
+            continue
+        if boilerplate_hashes and line_hash(stripped) in boilerplate_hashes:
+            removed += 1
+            continue
+        kept = []
+        for sentence in _sentence_split_re.split(stripped):
+            sentence = _truncation_re.sub("", sentence)
+            if not sentence or any(p.match(sentence) for p in NOISE_PATTERNS):
+                removed += 1
+                continue
+            kept.append(sentence)
+        if kept:
+            kept_lines.append(" ".join(kept))
+    return "\n".join(kept_lines), removed
+
+
+# --- Stored table (Mongo) ---
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def _setting(name, default):
+    from django.conf import settings
+
+    return getattr(settings, name, default)
+
+
+def _collection():
+    from .mongo_client import db
+
+    return db[COLLECTION]
+
+
+def boilerplate_for(host: str) -> frozenset:
+    """Learned boilerplate hashes for `host`, cached per process for a while."""
+    if not host:
+        return frozenset()
+    now = time.monotonic()
+    with _cache_lock:
+        entry = _cache.get(host)
+    if entry is not None and entry[0] > now:
+        return entry[1]
+    try:
+        doc = _collection().find_one({"_id": host}, {"hashes": 1})
+        hashes = frozenset(doc["hashes"]) if doc else frozenset()
+    except Exception:
+        # rules still apply; try the store again after the cache expires
+        hashes = frozenset()
+    with _cache_lock:
+        _cache[host] = (now + _setting("BOILERPLATE_CACHE_SECONDS", 600), hashes)
+    return hashes
+
+
+def learn_from_store(per_host: int = 500, min_host_docs: int = MIN_HOST_DOCS):
+    """
+    Rebuild the stored table from the newest `per_host` articles of every
+    source host in the `articles` collection. Returns {host: boilerplate lines}.
+    """
+    from datetime import datetime
+
+    from pymongo import DESCENDING, ReplaceOne
+
+    from .news_store import articles_collection
+
+    table = LineFrequencyTable(min_host_docs=min_host_docs)
+    cursor = (
+        articles_collection()
+        .find({}, {"url": 1, "source": 1, "content": 1})
+        .sort("publishedAt", DESCENDING)
+    )
+    for article in cursor:
+        host = source_host(article)
+        if host and table.docs[host] < per_host:
+            table.learn(host, article.get("content") or "")
+
+    now = datetime.utcnow()
+    result = {}
+    ops = []
+    for host in table.hosts():
+        hashes = sorted(table.boilerplate(host))
+        result[host] = len(hashes)
+        ops.append(
+            ReplaceOne(
+                {"_id": host},
+                {"hashes": hashes, "docs": table.docs[host], "updated_at": now},
+                upsert=True,
+            )
+        )
+    col = _collection()
+    if ops:
+        col.bulk_write(ops, ordered=False)
+    col.delete_many({"_id": {"$nin": table.hosts()}})
+    with _cache_lock:
+        _cache.clear()
+    return result
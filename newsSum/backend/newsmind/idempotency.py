@@ -0,0 +1,220 @@
+"""
+Idempotency-Key support for POST endpoints.
+
+The first request with a given (user, key) claims it with a "pending" record
+in Mongo and runs; a 2xx response is stored on the record and replayed to
+every later request with the same key, without running the view again.
+A retry that arrives while the first request is still running waits for it
+(woken directly when both are in the same worker, polling Mongo otherwise).
+Failed runs release the key so the client can retry for real.
+
+Records expire through a TTL index after IDEMPOTENCY_TTL_SECONDS. Reusing a
+key with a different request body is rejected with 422.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from pymongo import ASCENDING, ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from rest_framework import status
+from rest_framework.response import Response
+
+from . import metrics
+from .mongo_client import db
+
+COLLECTION = "idempotency_keys"
+HEADER = "Idempotency-Key"
+MAX_KEY_LENGTH = 255
+
+_owner = f"{os.getpid()}-{os.urandom(4).hex()}"
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+_indexes_ready = False
+
+
+def _collection():
+    global _indexes_ready
+    col = db[COLLECTION]
+    if not _indexes_ready:
+        col.create_index(
+            [("created_at", ASCENDING)],
+            expireAfterSeconds=_setting("IDEMPOTENCY_TTL_SECONDS", 86400),
+        )
+        _indexes_ready = True
+    return col
+
+
+def fingerprint(payload) -> str:
+    data = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+# in-flight keys owned by this process, so local retries wake up immediately
+_inflight = {}
+_inflight_lock = threading.Lock()
+
+
+def _error(detail, code, retry_after=None):
+    response = Response({"detail": detail}, status=code)
+    if retry_after is not None:
+        response["Retry-After"] = str(retry_after)
+    return response
+
+
+def _replay(record):
+    response = Response(record["body"], status=record["status_code"])
+    response["Idempotent-Replayed"] = "true"
+    return response
+
+
+# _claim() result when our pending record went in
+_CLAIMED = object()
+
+
+def _claim(col, record_id, user_id, key, digest):
+    """
+    Insert our pending record. Returns _CLAIMED on success, else the existing
+    record, or None when it was released or expired before we could read it.
+    """
+    now = datetime.now(dt_timezone.utc)
+    try:
+        col.insert_one(
+            {
+                "_id": record_id,
+                "user_id": user_id,
+                "key": key,
+                "fingerprint": digest,
+                "state": "pending",
+                "owner": _owner,
+                "created_at": now,
+                "updated_at": now,
+            }
+        )
+        return _CLAIMED
+    except DuplicateKeyError:
+        return col.find_one({"_id": record_id})
+
+
+def _take_over(col, record):
+    """Claim a pending record whose owner seems to have died."""
+    now = datetime.now(dt_timezone.utc)
+    return col.find_one_and_update(
+        {"_id": record["_id"], "state": "pending", "owner": record["owner"]},
+        {"$set": {"owner": _owner, "updated_at": now}},
+        return_document=ReturnDocument.AFTER,
+    )
+
+
+def _wait_for(col, record_id):
+    """Wait for another request to finish the key; returns its record or None."""
+    deadline = time.monotonic() + _setting("IDEMPOTENCY_WAIT_SECONDS", 120)
+    with _inflight_lock:
+        event = _inflight.get(record_id)
+    delay = 0.1
+    while time.monotonic() < deadline:
+        if event is not None:
+            event.wait(max(0.0, deadline - time.monotonic()))
+        else:
+            time.sleep(delay)
+            delay = min(delay * 2, 1.0)
+        record = col.find_one({"_id": record_id})
+        if record is None or record["state"] == "done":
+            return record
+        if event is not None and event.is_set():
+            return record
+    return False
+
+
+def run_once(user_id, key: str, payload, compute) -> Response:
+    """
+    Run `compute()` (returning a DRF Response) at most once per (user, key)
+    and request body, replaying the stored response for repeats.
+    """
+    if not key or len(key) > MAX_KEY_LENGTH or not key.isprintable():
+        return _error(
+            f"{HEADER} must be 1-{MAX_KEY_LENGTH} printable characters.",
+            status.HTTP_400_BAD_REQUEST,
+        )
+    col = _collection()
+    record_id = f"{user_id}:{key}"
+    digest = fingerprint(payload)
+
+    for _ in range(3):
+        existing = _claim(col, record_id, user_id, key, digest)
+        if existing is _CLAIMED:
+            break
+        if existing is None:
+            # gone between our insert and the read: try to claim it again
+            continue
+        if existing["fingerprint"] != digest:
+            metrics.incr("idempotency.mismatch")
+            return _error(
+                f"{HEADER} was already used with a different request body.",
+                status.HTTP_422_UNPROCESSABLE_ENTITY,
+            )
+        if existing["state"] == "done":
+            metrics.incr("idempotency.replayed")
+            return _replay(existing)
+
+        stale_after = _setting("IDEMPOTENCY_STALE_SECONDS", 600)
+        updated = existing["updated_at"].replace(tzinfo=dt_timezone.utc)
+        age = (datetime.now(dt_timezone.utc) - updated).total_seconds()
+        if age > stale_after and _take_over(col, existing) is not None:
+            metrics.incr("idempotency.taken_over")
+            break
+
+        metrics.incr("idempotency.attached")
+        record = _wait_for(col, record_id)
+        if record is False:
+            return _error(
+                f"A request with this {HEADER} is still in progress.",
+                status.HTTP_409_CONFLICT,
+                retry_after=5,
+            )
+        if record is not None and record["state"] == "done":
+            return _replay(record)
+        # the first attempt failed and released the key: try to claim it
+    else:
+        return _error(
+            f"A request with this {HEADER} is still in progress.",
+            status.HTTP_409_CONFLICT,
+            retry_after=5,
+        )
+
+    event = threading.Event()
+    with _inflight_lock:
+        _inflight[record_id] = event
+    stored = False
+    try:
+        response = compute()
+        if 200 <= response.status_code < 300:
+            col.update_one(
+                {"_id": record_id, "owner": _owner},
+                {
+                    "$set": {
+                        "state": "done",
+                        "status_code": response.status_code,
+                        "body": response.data,
+                        "updated_at": datetime.now(dt_timezone.utc),
+                    }
+                },
+            )
+            stored = True
+        return response
+    finally:
+        if not stored:
+            # errors aren't replayed: let the client's next retry run again
+            col.delete_one({"_id": record_id, "owner": _owner, "state": "pending"})
+        with _inflight_lock:
+            _inflight.pop(record_id, None)
+        event.set()
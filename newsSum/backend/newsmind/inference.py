@@ -0,0 +1,288 @@
+"""
+Summarization inference backends.
+
+INFERENCE_BACKEND picks the implementation for the process:
+
+* "remote" (default): the Hugging Face hf-inference provider, or the
+  dedicated endpoint in HF_ENDPOINT_URL.
+* "local": a seq2seq model stored at INFERENCE_LOCAL_MODEL_PATH, run on the
+  CPU by PyTorch (optionally with dynamic int8 quantization of the Linear
+  layers) or by ONNX Runtime (INFERENCE_LOCAL_ENGINE="onnx", on a model
+  exported and quantized by `manage.py export_onnx_model`).
+
+Every backend implements summarize_batch(texts) -> summaries, in input order,
+with "" for blank inputs, and raises InferenceError (a RuntimeError) when
+inference fails. `max_new_tokens` overrides the generation budget for one
+call (short summaries). The contract tests in tests.py run against each of them.
+"""
+
+import os
+import threading
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+HF_API_KEY = os.getenv("HF_API_KEY", "")
+HF_MODEL = os.getenv("HF_MODEL", "google/pegasus-xsum")
+# optional URL of a dedicated endpoint (or a local stand-in) that serves HF_MODEL
+HF_ENDPOINT_URL = os.getenv("HF_ENDPOINT_URL", "")
+# sleep between sequential HF calls (seconds)
+HF_CALL_SLEEP = float(os.getenv("HF_CALL_SLEEP", "0.35"))
+
+
+class InferenceError(RuntimeError):
+    pass
+
+
+def summary_from_result(result) -> str:
+    # normalize result
+    if isinstance(result, list) and len(result) > 0:
+        first = result[0]
+        if isinstance(first, dict):
+            if "summary_text" in first:
+                return first["summary_text"]
+            if "generated_text" in first:
+                return first["generated_text"]
+            # fallback: stringify value fields
+            return str(first)
+        return str(first)
+
+    if isinstance(result, dict):
+        return result.get("summary_text") or result.get("generated_text") or str(result)
+
+    # huggingface_hub returns a SummarizationOutput dataclass
+    summary_text = getattr(result, "summary_text", None)
+    if isinstance(summary_text, str):
+        return summary_text
+
+    return str(result)
+
+
+class InferenceBackend:
+    name = "base"
+    model = ""
+    # pause between sequential calls (provider politeness); 0 for local models
+    call_delay = 0.0
+    # largest batch summarize_batch handles in one model call
+    max_batch_size = 1
+
+    def summarize_batch(self, texts, max_new_tokens=None):
+        raise NotImplementedError
+
+    def summarize(self, text: str, max_new_tokens=None) -> str:
+        return self.summarize_batch([text], max_new_tokens=max_new_tokens)[0]
+
+    def warm_up(self):
+        """Load whatever the first call would otherwise load."""
+
+
+# --- Remote: Hugging Face ---
+class RemoteHFBackend(InferenceBackend):
+    name = "remote"
+
+    def __init__(self, api_key, model, endpoint_url="", call_delay=HF_CALL_SLEEP):
+        self.api_key = api_key
+        self.model = model
+        self.endpoint_url = endpoint_url
+        self.call_delay = call_delay
+        self._client = None
+        self._lock = threading.Lock()
+
+    @property
+    def client(self):
+        if self._client is None:
+            if not self.api_key:
+                raise InferenceError(
+                    "Hugging Face Inference client not configured "
+                    "(HF_API_KEY missing)."
+                )
+            with self._lock:
+                if self._client is None:
+                    from huggingface_hub import InferenceClient
+
+                    self._client = InferenceClient(
+                        provider="hf-inference", api_key=self.api_key
+                    )
+        return self._client
+
+    def summarize_batch(self, texts, max_new_tokens=None):
+        # the provider API takes one input per request
+        client = self.client
+        extra = {}
+        if max_new_tokens:
+            extra["generate_parameters"] = {"max_new_tokens": max_new_tokens}
+        summaries = []
+        for text in texts:
+            if not text or not text.strip():
+                summaries.append("")
+                continue
+            try:
+                result = client.summarization(
+                    text, model=self.endpoint_url or self.model, **extra
+                )
+            except Exception as e:
+                raise InferenceError(f"Hugging Face inference error: {e}")
+            summaries.append(summary_from_result(result))
+        return summaries
+
+    def warm_up(self):
+        if self.api_key:
+            self.client
+
+
+# --- Local: PyTorch / ONNX Runtime on CPU ---
+class LocalSeq2SeqBackend(InferenceBackend):
+    name = "local"
+
+    def __init__(
+        self,
+        model_path,
+        engine="torch",
+        quantize=True,
+        threads=0,
+        max_input_tokens=1024,
+        max_new_tokens=128,
+        num_beams=2,
+        max_batch_size=8,
+    ):
+        if engine not in ("torch", "onnx"):
+            raise ImproperlyConfigured(f"Unknown local inference engine {engine!r}")
+        self.model = self.model_path = model_path
+        self.engine = engine
+        self.quantize = quantize
+        self.threads = threads
+        self.max_input_tokens = max_input_tokens
+        self.max_new_tokens = max_new_tokens
+        self.num_beams = num_beams
+        self.max_batch_size = max_batch_size
+        self._tokenizer = None
+        self._model = None
+        self._load_lock = threading.Lock()
+        # one generate() at a time: concurrent calls would only fight over the
+        # same intra-op threads; larger batches are how to go wider
+        self._run_lock = threading.Lock()
+
+    def _load(self):
+        if self._model is not None:
+            return
+        with self._load_lock:
+            if self._model is not None:
+                return
+            if not self.model_path or not os.path.isdir(self.model_path):
+                raise InferenceError(
+                    f"Local model directory not found: {self.model_path!r}"
+                )
+            try:
+                from transformers import AutoTokenizer
+
+                tokenizer = AutoTokenizer.from_pretrained(self.model_path)
+                if self.engine == "onnx":
+                    model = self._load_onnx()
+                else:
+                    model = self._load_torch()
+            except ImportError as e:
+                raise InferenceError(f"Local inference dependencies missing: {e}")
+            self._tokenizer = tokenizer
+            self._model = model
+
+    def _load_torch(self):
+        import torch
+        from transformers import AutoModelForSeq2SeqLM
+
+        if self.threads:
+            torch.set_num_threads(self.threads)
+        model = AutoModelForSeq2SeqLM.from_pretrained(self.model_path)
+        model.eval()
+        if self.quantize:
+            model = torch.ao.quantization.quantize_dynamic(
+                model, {torch.nn.Linear}, dtype=torch.qint8
+            )
+        return model
+
+    def _load_onnx(self):
+        import onnxruntime
+        from optimum.onnxruntime import ORTModelForSeq2SeqLM
+
+        options = onnxruntime.SessionOptions()
+        if self.threads:
+            options.intra_op_num_threads = self.threads
+        options.inter_op_num_threads = 1
+        # quantization happens at export time (export_onnx_model)
+        return ORTModelForSeq2SeqLM.from_pretrained(
+            self.model_path,
+            session_options=options,
+            provider="CPUExecutionProvider",
+        )
+
+    def _generate(self, texts, max_new_tokens=None):
+        inputs = self._tokenizer(
+            texts,
+            truncation=True,
+            max_length=self.max_input_tokens,
+            padding=True,
+            return_tensors="pt",
+        )
+        kwargs = {
+            "max_new_tokens": max_new_tokens or self.max_new_tokens,
+            "num_beams": self.num_beams,
+        }
+        if self.engine == "torch":
+            import torch
+
+            with torch.inference_mode():
+                output = self._model.generate(**inputs, **kwargs)
+        else:
+            output = self._model.generate(**inputs, **kwargs)
+        return self._tokenizer.batch_decode(output, skip_special_tokens=True)
+
+    def summarize_batch(self, texts, max_new_tokens=None):
+        self._load()
+        summaries = [""] * len(texts)
+        todo = [i for i, t in enumerate(texts) if t and t.strip()]
+        for start in range(0, len(todo), self.max_batch_size):
+            part = todo[start : start + self.max_batch_size]
+            try:
+                with self._run_lock:
+                    outputs = self._generate([texts[i] for i in part], max_new_tokens)
+            except Exception as e:
+                raise InferenceError(f"Local inference error: {e}")
+            for i, summary in zip(part, outputs):
+                summaries[i] = summary.strip()
+        return summaries
+
+    def warm_up(self):
+        self._load()
+
+
+# --- Selection ---
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def build_backend(kind: str) -> InferenceBackend:
+    if kind == "remote":
+        return RemoteHFBackend(HF_API_KEY, HF_MODEL, HF_ENDPOINT_URL)
+    if kind == "local":
+        return LocalSeq2SeqBackend(
+            _setting("INFERENCE_LOCAL_MODEL_PATH", ""),
+            engine=_setting("INFERENCE_LOCAL_ENGINE", "torch"),
+            quantize=_setting("INFERENCE_QUANTIZE", True),
+            threads=_setting("INFERENCE_THREADS", 0),
+            max_new_tokens=_setting("INFERENCE_MAX_NEW_TOKENS", 128),
+            num_beams=_setting("INFERENCE_NUM_BEAMS", 2),
+            max_batch_size=_setting("INFERENCE_MAX_BATCH_SIZE", 4),
+        )
+    raise ImproperlyConfigured(f"Unknown INFERENCE_BACKEND {kind!r}")
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend() -> InferenceBackend:
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = build_backend(_setting("INFERENCE_BACKEND", "remote"))
+    return _backend
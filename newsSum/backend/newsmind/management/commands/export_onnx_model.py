@@ -0,0 +1,61 @@
+import os
+import shutil
+import tempfile
+
+from django.core.management.base import BaseCommand, CommandError
+
+from newsmind.inference import HF_MODEL
+
+
+class Command(BaseCommand):
+    help = (
+        "Export a seq2seq summarization model to ONNX, int8-quantized by "
+        "default, for INFERENCE_BACKEND=local with INFERENCE_LOCAL_ENGINE=onnx."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("output", help="Directory to write the model to")
+        parser.add_argument(
+            "--model", default=HF_MODEL, help="Hub id or local path of the model"
+        )
+        parser.add_argument(
+            "--no-quantize",
+            action="store_true",
+            help="Keep float32 weights (larger and slower, slightly more accurate)",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            from optimum.onnxruntime import ORTModelForSeq2SeqLM
+            from transformers import AutoTokenizer
+        except ImportError as e:
+            raise CommandError(f"optimum[onnxruntime] is required: {e}")
+
+        output = options["output"]
+        self.stdout.write(f"Exporting {options['model']} to {output} ...")
+        model = ORTModelForSeq2SeqLM.from_pretrained(options["model"], export=True)
+        model.save_pretrained(output)
+        AutoTokenizer.from_pretrained(options["model"]).save_pretrained(output)
+
+        if not options["no_quantize"]:
+            self._quantize(output)
+        self.stdout.write(self.style.SUCCESS(f"Model written to {output}"))
+
+    def _quantize(self, directory):
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        for name in sorted(os.listdir(directory)):
+            if not name.endswith(".onnx"):
+                continue
+            path = os.path.join(directory, name)
+            before = os.path.getsize(path)
+            # quantize to a temp file, then replace: the loader expects the
+            # exported file names
+            fd, tmp = tempfile.mkstemp(suffix=".onnx", dir=directory)
+            os.close(fd)
+            quantize_dynamic(path, tmp, weight_type=QuantType.QInt8)
+            shutil.move(tmp, path)
+            self.stdout.write(
+                f"  {name}: {before / 2**20:.0f} MiB -> "
+                f"{os.path.getsize(path) / 2**20:.0f} MiB (int8)"
+            )
@@ -0,0 +1,194 @@
+import csv
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import CharField, Value
+from django.db.models.functions import Cast, Concat
+from pymongo.errors import CollectionInvalid
+
+from newsmind.models import normalize_email_key, normalize_username_key
+from newsmind.mongo_client import db
+from newsmind.signals import USER_COLLECTION_PREFIX
+
+User = get_user_model()
+
+
+def read_rows(path, fmt):
+    """Yield dicts from a CSV (with header) or JSONL file."""
+    with open(path, encoding="utf-8", newline="") as fh:
+        if fmt == "csv":
+            yield from csv.DictReader(fh)
+        else:
+            for line in fh:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+
+
+def hash_password(raw):
+    # an empty password yields an unusable hash, like createsuperuser --noinput
+    return make_password(raw or None)
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk-create users from a CSV or JSONL file with columns username, email "
+        "and password (plaintext) or password_hash (Django hash format); "
+        "first_name/last_name are optional. Existing usernames/emails are skipped. "
+        "Users get their summaries collection in MySQL and Mongo in one pass."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument("--format", choices=["csv", "jsonl"])
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--hash-workers",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Processes used to hash plaintext passwords.",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        if not os.path.exists(path):
+            raise CommandError(f"{path} does not exist.")
+        fmt = options["format"] or ("csv" if path.endswith(".csv") else "jsonl")
+
+        started = time.perf_counter()
+        rows = self.clean_rows(read_rows(path, fmt))
+        if not rows:
+            self.stdout.write("Nothing to import.")
+            return
+
+        # password hashing dominates; spread it over processes
+        plain = [r for r in rows if not r["password_hash"]]
+        if plain:
+            with ProcessPoolExecutor(max_workers=options["hash_workers"]) as pool:
+                hashes = pool.map(
+                    hash_password, [r["password"] for r in plain], chunksize=32
+                )
+                for row, hashed in zip(plain, hashes):
+                    row["password_hash"] = hashed
+
+        created = 0
+        batch_size = options["batch_size"]
+        collection_names = []
+        for i in range(0, len(rows), batch_size):
+            batch = rows[i : i + batch_size]
+            collection_names += self.create_batch(batch)
+            created += len(batch)
+
+        provisioned = self.provision_mongo(collection_names)
+        self.stdout.write(
+            f"Created {created} users, provisioned {provisioned} Mongo collections "
+            f"in {time.perf_counter() - started:.1f}s."
+        )
+
+    def clean_rows(self, raw_rows):
+        """Validate rows and drop duplicates within the file and against the DB."""
+        rows = []
+        seen_usernames, seen_emails = set(), set()
+        for n, raw in enumerate(raw_rows, start=1):
+            username = (raw.get("username") or "").strip()
+            email = normalize_email_key(raw.get("email"))
+            if not username or not email:
+                self.stderr.write(f"row {n}: username and email are required")
+                continue
+            username_key = normalize_username_key(username)
+            if username_key in seen_usernames or email in seen_emails:
+                self.stderr.write(f"row {n}: duplicate of an earlier row")
+                continue
+            seen_usernames.add(username_key)
+            seen_emails.add(email)
+            rows.append(
+                {
+                    "username": username,
+                    "username_key": username_key,
+                    "email": email,
+                    "password": raw.get("password") or "",
+                    "password_hash": raw.get("password_hash") or "",
+                    "first_name": raw.get("first_name") or "",
+                    "last_name": raw.get("last_name") or "",
+                }
+            )
+
+        existing_usernames, existing_emails = set(), set()
+        for i in range(0, len(rows), 1000):
+            chunk = rows[i : i + 1000]
+            existing_usernames.update(
+                User.objects.filter(
+                    username_normalized__in=[r["username_key"] for r in chunk]
+                ).values_list("username_normalized", flat=True)
+            )
+            existing_emails.update(
+                User.objects.filter(
+                    email_normalized__in=[r["email"] for r in chunk]
+                ).values_list("email_normalized", flat=True)
+            )
+
+        kept = []
+        for r in rows:
+            if r["username_key"] in existing_usernames or r["email"] in existing_emails:
+                self.stderr.write(f"skipping {r['username']}: already registered")
+                continue
+            kept.append(r)
+        return kept
+
+    @transaction.atomic
+    def create_batch(self, batch):
+        """
+        bulk_create one batch and set mongo_collection_name for all of it with
+        a single UPDATE (MySQL doesn't return ids from bulk inserts, so the name
+        is derived from the id in SQL). Returns the collection names.
+        """
+        usernames = [r["username"] for r in batch]
+        # bulk_create skips save(), so the lookup keys are set explicitly
+        User.objects.bulk_create(
+            [
+                User(
+                    username=r["username"],
+                    username_normalized=r["username_key"],
+                    email=r["email"],
+                    email_normalized=r["email"],
+                    password=r["password_hash"],
+                    first_name=r["first_name"],
+                    last_name=r["last_name"],
+                )
+                for r in batch
+            ]
+        )
+        User.objects.filter(username__in=usernames).update(
+            mongo_collection_name=Concat(
+                Value(USER_COLLECTION_PREFIX), Cast("id", output_field=CharField())
+            )
+        )
+        return list(
+            User.objects.filter(username__in=usernames).values_list(
+                "mongo_collection_name", flat=True
+            )
+        )
+
+    def provision_mongo(self, collection_names):
+        """Create missing collections, listing existing ones once up front."""
+        existing = set(
+            db.list_collection_names(
+                filter={"name": {"$regex": f"^{USER_COLLECTION_PREFIX}"}}
+            )
+        )
+        provisioned = 0
+        for name in collection_names:
+            if name in existing:
+                continue
+            try:
+                db.create_collection(name)
+            except CollectionInvalid:
+                pass
+            provisioned += 1
+        return provisioned
@@ -0,0 +1,68 @@
+import time
+
+import requests
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from newsmind.news_normalize import normalize_top_news, dedupe_articles
+from newsmind.news_store import ensure_indexes, upsert_articles
+from newsmind.views_news import fetch_top_news, parse_markets
+
+
+class Command(BaseCommand):
+    help = (
+        "Pull top news from WorldNewsAPI into the Mongo `articles` collection. "
+        "Run it from cron, or with --interval to keep polling."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--markets",
+            default=getattr(settings, "NEWS_INGEST_MARKETS", "us:en"),
+            help="Comma separated country:language pairs, e.g. us:en,gb:en",
+        )
+        parser.add_argument(
+            "--date", help="YYYY-MM-DD to ingest (default: today, server time)"
+        )
+        parser.add_argument(
+            "--interval",
+            type=int,
+            default=0,
+            help="Seconds between runs; 0 ingests once and exits.",
+        )
+
+    def handle(self, *args, **options):
+        api_key = getattr(settings, "WORLDNEWS_API_KEY", "")
+        if not api_key:
+            raise CommandError("WorldNews API key not configured.")
+
+        markets = parse_markets(options["markets"])
+        if not markets:
+            raise CommandError("No markets given.")
+
+        ensure_indexes()
+        while True:
+            self.ingest_once(api_key, markets, options["date"])
+            if options["interval"] <= 0:
+                break
+            time.sleep(options["interval"])
+
+    def ingest_once(self, api_key, markets, date):
+        date = date or timezone.localtime(timezone.now()).date().isoformat()
+        for country, language in markets:
+            started = time.perf_counter()
+            try:
+                data = fetch_top_news(api_key, country, language, date)
+            except requests.RequestException as e:
+                self.stderr.write(f"{country}:{language} fetch failed: {e}")
+                continue
+
+            articles = dedupe_articles(normalize_top_news(data))
+            counts = upsert_articles(articles, country, language)
+            self.stdout.write(
+                f"{country}:{language} {date}: {len(articles)} articles, "
+                f"{counts['upserted']} new, {counts['modified']} updated, "
+                f"{counts['skipped']} without url "
+                f"({time.perf_counter() - started:.2f}s)"
+            )
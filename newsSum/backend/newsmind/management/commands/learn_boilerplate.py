@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+
+from newsmind.boilerplate import MIN_HOST_DOCS, learn_from_store
+
+
+class Command(BaseCommand):
+    help = (
+        "Learn per-source boilerplate lines from the ingested `articles` "
+        "collection. Run it from cron after ingest_news."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--per-host",
+            type=int,
+            default=500,
+            help="Newest articles sampled per source host",
+        )
+        parser.add_argument(
+            "--min-host-docs",
+            type=int,
+            default=MIN_HOST_DOCS,
+            help="Hosts with fewer sampled articles get no learned lines",
+        )
+
+    def handle(self, *args, **options):
+        learned = learn_from_store(options["per_host"], options["min_host_docs"])
+        for host, lines in sorted(learned.items()):
+            if lines:
+                self.stdout.write(f"{host}: {lines} boilerplate lines")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{len(learned)} hosts, "
+                f"{sum(1 for n in learned.values() if n)} with boilerplate"
+            )
+        )
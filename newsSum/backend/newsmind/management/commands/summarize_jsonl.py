@@ -0,0 +1,261 @@
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+class RateLimiter:
+    """Spaces out `acquire()` calls to at most `rate` per second across threads."""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+
+class Checkpoint:
+    """
+    Append-only log of finished input line numbers, so an interrupted run
+    skips them when restarted with the same --checkpoint file.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.done = set()
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self.done = {int(line) for line in f if line.strip().isdigit()}
+        self._file = open(path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+
+    def mark(self, line_no: int):
+        with self._lock:
+            self._file.write(f"{line_no}\n")
+            self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class Command(BaseCommand):
+    help = (
+        "Summarize articles from a JSONL/NDJSON file (one article object per "
+        "line, same shape as /summarize/) into a JSONL file or a Mongo "
+        "collection. Progress is checkpointed: rerun the same command to "
+        "resume an interrupted run. Failed articles are retried on resume; "
+        "articles already in the output are not written again."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("input", help="JSONL file of articles")
+        out = parser.add_mutually_exclusive_group(required=True)
+        out.add_argument("--output", help="JSONL file to append results to")
+        out.add_argument(
+            "--mongo-collection", help="Mongo collection to upsert results into"
+        )
+        parser.add_argument(
+            "--checkpoint",
+            help="Checkpoint file (default: <input>.checkpoint)",
+        )
+        parser.add_argument(
+            "--workers", type=int, default=4, help="Articles summarized at once"
+        )
+        parser.add_argument(
+            "--rate",
+            type=float,
+            default=0,
+            help="Max articles started per second (0 = no limit)",
+        )
+        parser.add_argument(
+            "--progress-every",
+            type=float,
+            default=10,
+            help="Seconds between progress lines",
+        )
+
+    def handle(self, *args, **options):
+        # the summarization stack (and its heavy imports) only when needed
+        from newsmind.views_summarize import (
+            MAX_TOKENS,
+            prepare_input_text,
+            summarize_recursive,
+        )
+
+        if not os.path.exists(options["input"]):
+            raise CommandError(f"No such file: {options['input']}")
+        workers = max(1, options["workers"])
+        checkpoint = Checkpoint(
+            options["checkpoint"] or f"{options['input']}.checkpoint"
+        )
+        write = self._writer(options)
+        # results written just before a crash, whose line was never checkpointed
+        checkpoint.done |= write.done
+        limiter = RateLimiter(options["rate"])
+        stats = {"done": 0, "failed": 0, "invalid": 0, "calls": 0}
+        stats_lock = threading.Lock()
+
+        def count(key, n=1):
+            with stats_lock:
+                stats[key] += n
+
+        def process(line_no, article, text):
+            limiter.acquire()
+            calls = [0]
+
+            def progress(event, data):
+                if event == "chunk":
+                    calls[0] += 1
+
+            try:
+                summary = summarize_recursive(
+                    text, max_tokens=MAX_TOKENS, progress=progress
+                )
+                write(
+                    line_no,
+                    {
+                        "line": line_no,
+                        "id": article.get("id"),
+                        "url": article.get("url"),
+                        "title": article.get("title"),
+                        "summary": summary,
+                        "created_at": datetime.utcnow().isoformat(),
+                    },
+                )
+            except Exception as e:
+                # not checkpointed: retried when the command is run again
+                count("failed")
+                self.stderr.write(f"line {line_no}: {type(e).__name__}: {e}")
+            else:
+                checkpoint.mark(line_no)
+                count("done")
+            finally:
+                count("calls", calls[0])
+
+        skipped = len(checkpoint.done)
+        self.stdout.write(
+            f"Summarizing {options['input']} with {workers} workers"
+            + (f", resuming after {skipped} finished articles" if skipped else "")
+        )
+        started = time.monotonic()
+        last_report = started
+        # bounded in-flight work: the file is streamed, never loaded whole
+        slots = threading.BoundedSemaphore(workers * 2)
+        pool = ThreadPoolExecutor(max_workers=workers)
+        try:
+            with open(options["input"], encoding="utf-8") as f:
+                for line_no, line in enumerate(f, start=1):
+                    if line_no in checkpoint.done or not line.strip():
+                        continue
+                    try:
+                        article = json.loads(line)
+                    except ValueError:
+                        article = None
+                    text = (
+                        prepare_input_text(article)
+                        if isinstance(article, dict)
+                        else ""
+                    )
+                    if not text:
+                        self.stderr.write(f"line {line_no}: no article text, skipped")
+                        checkpoint.mark(line_no)
+                        count("invalid")
+                        continue
+
+                    slots.acquire()
+                    future = pool.submit(process, line_no, article, text)
+                    future.add_done_callback(lambda _: slots.release())
+
+                    now = time.monotonic()
+                    if now - last_report >= options["progress_every"]:
+                        last_report = now
+                        self._report(stats, now - started)
+            pool.shutdown(wait=True)
+        except KeyboardInterrupt:
+            self.stderr.write("Interrupted; waiting for running articles ...")
+            pool.shutdown(wait=True, cancel_futures=True)
+        finally:
+            checkpoint.close()
+            write.close()
+
+        self._report(stats, time.monotonic() - started, final=True)
+
+    def _report(self, stats, elapsed, final=False):
+        elapsed = max(elapsed, 1e-9)
+        line = (
+            f"{stats['done']} summarized, {stats['failed']} failed, "
+            f"{stats['invalid']} invalid in {elapsed:.0f}s: "
+            f"{stats['done'] / elapsed:.2f} articles/s, "
+            f"{stats['calls'] / elapsed:.2f} model calls/s"
+        )
+        self.stdout.write(self.style.SUCCESS(line) if final else line)
+
+    def _writer(self, options):
+        """
+        Callable `write(line_no, record)` with a `close()` for the chosen sink,
+        and `done`: input lines the sink already holds a result for.
+        """
+        lock = threading.Lock()
+        if options["output"]:
+            done = self._written_lines(options["output"])
+            out = open(options["output"], "a", encoding="utf-8")
+
+            def write(line_no, record):
+                data = json.dumps(record, ensure_ascii=False)
+                with lock:
+                    out.write(data + "\n")
+                    out.flush()
+
+            write.close = out.close
+            write.done = done
+            return write
+
+        from newsmind.mongo_client import db
+
+        col = db[options["mongo_collection"]]
+        source = os.path.basename(options["input"])
+
+        def write(line_no, record):
+            # keyed on file and line: a result written just before a crash
+            # is overwritten, not duplicated, on resume
+            record = dict(record, source_file=source)
+            col.replace_one({"_id": f"{source}:{line_no}"}, record, upsert=True)
+
+        write.close = lambda: None
+        write.done = set()
+        return write
+
+    def _written_lines(self, path):
+        """
+        Input line numbers already in the output file, so a result written
+        but not yet checkpointed when the run died isn't appended twice.
+        A torn last record is cut off.
+        """
+        done = set()
+        if not os.path.exists(path):
+            return done
+        with open(path, "rb+") as f:
+            end = 0
+            for raw in f:
+                if not raw.endswith(b"\n"):
+                    break
+                end += len(raw)
+                try:
+                    done.add(int(json.loads(raw)["line"]))
+                except (ValueError, KeyError, TypeError):
+                    pass
+            f.truncate(end)
+        return done
@@ -0,0 +1,27 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from newsmind.tokenization import DEFAULT_SOCKET, serve
+
+
+class Command(BaseCommand):
+    help = (
+        "Serve token counts to the web workers over a Unix socket, so only this "
+        "process holds the tokenizer. Use with TOKENIZER_MODE=sidecar."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--socket",
+            default=getattr(settings, "TOKENIZER_SOCKET", DEFAULT_SOCKET),
+            help="Path of the Unix socket to listen on",
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"Tokenizer sidecar listening on {options['socket']}")
+        try:
+            serve(options["socket"])
+        except RuntimeError as e:
+            raise CommandError(str(e))
+        except KeyboardInterrupt:
+            pass
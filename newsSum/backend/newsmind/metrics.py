@@ -0,0 +1,51 @@
+"""
+In-process metrics registry.
+
+Counters and simple summaries (count/sum/max) kept per worker process and
+exposed through the admin-only metrics endpoint. Cheap enough to call on
+every request.
+"""
+
+import threading
+
+_lock = threading.Lock()
+_counters = {}
+_summaries = {}
+
+
+def incr(name: str, value: int = 1):
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + value
+
+
+def observe(name: str, value: float):
+    with _lock:
+        s = _summaries.get(name)
+        if s is None:
+            _summaries[name] = {"count": 1, "sum": value, "max": value}
+        else:
+            s["count"] += 1
+            s["sum"] += value
+            if value > s["max"]:
+                s["max"] = value
+
+
+def ratio(numerator: str, denominator_names: tuple) -> float:
+    """Return counter[numerator] / sum(counters[denominator_names]) (0 when empty)."""
+    with _lock:
+        total = sum(_counters.get(n, 0) for n in denominator_names)
+        return _counters.get(numerator, 0) / total if total else 0.0
+
+
+def snapshot() -> dict:
+    with _lock:
+        return {
+            "counters": dict(_counters),
+            "summaries": {k: dict(v) for k, v in _summaries.items()},
+        }
+
+
+def reset():
+    with _lock:
+        _counters.clear()
+        _summaries.clear()
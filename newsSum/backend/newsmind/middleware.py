@@ -0,0 +1,171 @@
+import gzip
+import re
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+from . import metrics
+from .query_stats import track_queries
+from .tracing import end_trace, parse_trace_id, parse_traceparent, span, start_trace
+
+try:
+    import brotli
+
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+# responses smaller than this aren't worth compressing
+MIN_COMPRESS_SIZE = 200
+
+# only public, secret-free payloads are compressed: a response that mixes a
+# secret (a JWT, a CSRF token) with attacker-influenced text would leak it
+# through its compressed size (BREACH)
+DEFAULT_COMPRESS_PATHS = ("/api/auth/news/",)
+
+# already-compressed payloads (PDF downloads, images) are passed through
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript")
+
+_encoding_re = re.compile(r"^\s*([\w*-]+)\s*(?:;\s*q\s*=\s*([0-9.]+))?\s*$")
+
+
+def _accepted_encodings(header: str) -> dict:
+    """Parse Accept-Encoding into {coding: qvalue}."""
+    accepted = {}
+    for part in (header or "").split(","):
+        match = _encoding_re.match(part)
+        if not match:
+            continue
+        try:
+            q = float(match.group(2)) if match.group(2) else 1.0
+        except ValueError:
+            continue
+        accepted[match.group(1).lower()] = q
+    return accepted
+
+
+def _choose_encoding(header: str):
+    accepted = _accepted_encodings(header)
+    candidates = ["br", "gzip"] if BROTLI_AVAILABLE else ["gzip"]
+    best, best_q = None, 0.0
+    for coding in candidates:
+        q = accepted.get(coding, accepted.get("*", 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+class CompressionMiddleware:
+    """
+    Compress text/JSON responses under COMPRESS_PATHS (the news feed by
+    default) with brotli (when installed) or gzip, negotiated from
+    Accept-Encoding. Everything else, including the login and token refresh
+    responses, goes out uncompressed. Streaming responses are left alone so
+    server-sent events are flushed as they are produced.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.paths = tuple(getattr(settings, "COMPRESS_PATHS", DEFAULT_COMPRESS_PATHS))
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        return self.process_response(request, response)
+
+    def process_response(self, request, response):
+        if not request.path.startswith(self.paths):
+            return response
+        patch_vary_headers(response, ("Accept-Encoding",))
+
+        if response.streaming or response.has_header("Content-Encoding"):
+            return response
+        if len(response.content) < MIN_COMPRESS_SIZE:
+            return response
+        content_type = response.get("Content-Type", "")
+        if not content_type.startswith(COMPRESSIBLE_TYPES):
+            return response
+
+        encoding = _choose_encoding(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+        if encoding is None:
+            return response
+
+        if encoding == "br":
+            compressed = brotli.compress(response.content, quality=5)
+        else:
+            compressed = gzip.compress(response.content, compresslevel=6, mtime=0)
+        if len(compressed) >= len(response.content):
+            return response
+
+        response.content = compressed
+        response["Content-Length"] = str(len(compressed))
+        response["Content-Encoding"] = encoding
+
+        # the body changed, so a strong ETag no longer matches it byte-for-byte
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response["ETag"] = "W/" + etag
+        return response
+
+
+class QueryStatsMiddleware:
+    """
+    Count SQL queries and Mongo commands (and their time) per request.
+    With DEBUG on, the numbers are sent back in an X-Query-Stats header;
+    they are always recorded as per-endpoint metrics.
+    """
+
+    header = "X-Query-Stats"
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with track_queries() as stats:
+            response = self.get_response(request)
+
+        match = getattr(request, "resolver_match", None)
+        endpoint = (match.route or match.view_name) if match else "unresolved"
+        prefix = f"endpoint.{request.method} {endpoint}"
+        metrics.observe(f"{prefix}.sql_queries", stats.sql_count)
+        metrics.observe(f"{prefix}.sql_ms", stats.sql_time * 1000)
+        metrics.observe(f"{prefix}.mongo_commands", stats.mongo_count)
+        metrics.observe(f"{prefix}.mongo_ms", stats.mongo_time * 1000)
+
+        if getattr(settings, "DEBUG", False):
+            response[self.header] = stats.as_header()
+        return response
+
+
+class TracingMiddleware:
+    """
+    Start a trace per request (continuing an incoming traceparent /
+    X-Trace-Id) with a root span around the whole middleware chain and view.
+    The trace id is echoed back in X-Trace-Id.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        parent = parse_traceparent(request.META.get("HTTP_TRACEPARENT", ""))
+        if parent:
+            handle = start_trace(*parent)
+        else:
+            # ids that aren't valid trace ids start a fresh trace instead
+            handle = start_trace(
+                trace_id=parse_trace_id(request.META.get("HTTP_X_TRACE_ID", ""))
+            )
+        if handle is None:
+            return self.get_response(request)
+
+        try:
+            with span("http.request", method=request.method, path=request.path) as rec:
+                response = self.get_response(request)
+                match = getattr(request, "resolver_match", None)
+                if match:
+                    rec["attributes"]["route"] = match.route
+                rec["attributes"]["status_code"] = response.status_code
+            response["X-Trace-Id"] = handle[0].trace_id
+            return response
+        finally:
+            end_trace(handle)
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.8 on 2026-10-19 11:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('newsmind', '0008_customuser_avatar_variants'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customuser',
+            name='email_normalized',
+            field=models.CharField(editable=False, max_length=254, null=True),
+        ),
+        migrations.AddField(
+            model_name='customuser',
+            name='username_normalized',
+            field=models.CharField(editable=False, max_length=150, null=True),
+        ),
+    ]
@@ -0,0 +1,73 @@
+from django.db import migrations
+from django.db.models import Count
+
+BATCH_SIZE = 2000
+
+
+def find_collisions(CustomUser) -> dict:
+    """
+    {(field, normalized value): [pk, ...]} for accounts that differ only by
+    case or surrounding spaces; 0011's unique constraints would reject them.
+    """
+    collisions = {}
+    for field in ("email_normalized", "username_normalized"):
+        values = (
+            CustomUser.objects.exclude(**{f"{field}__isnull": True})
+            .values(field)
+            .annotate(n=Count("pk"))
+            .filter(n__gt=1)
+            .values_list(field, flat=True)
+        )
+        for value in values:
+            pks = CustomUser.objects.filter(**{field: value}).order_by("pk")
+            collisions[(field, value)] = list(pks.values_list("pk", flat=True))
+    return collisions
+
+
+def backfill(apps, schema_editor):
+    """Fill email_normalized/username_normalized in pk-ordered batches."""
+    CustomUser = apps.get_model("newsmind", "CustomUser")
+    last_pk = 0
+    while True:
+        batch = list(
+            CustomUser.objects.filter(pk__gt=last_pk)
+            .order_by("pk")
+            .only("pk", "email", "username")[:BATCH_SIZE]
+        )
+        if not batch:
+            break
+        for user in batch:
+            # historical models don't have save()/helpers; mirror models.py
+            user.email_normalized = (user.email or "").strip().lower() or None
+            user.username_normalized = (user.username or "").strip().casefold() or None
+        CustomUser.objects.bulk_update(
+            batch, ["email_normalized", "username_normalized"]
+        )
+        last_pk = batch[-1].pk
+
+    # earlier versions compared usernames/emails exactly, so "Alice"/"alice"
+    # may both exist. Which account survives is not ours to decide: stop
+    # here, before 0011 fails halfway, and name the accounts to merge or
+    # rename. The backfill above is safe to run again.
+    collisions = find_collisions(CustomUser)
+    if collisions:
+        lines = [
+            f"  {field.replace('_normalized', '')} {value!r}: user ids "
+            + ", ".join(str(pk) for pk in pks)
+            for (field, value), pks in sorted(collisions.items())
+        ]
+        raise RuntimeError(
+            "Accounts differ only by letter case; rename or merge them, then "
+            "run migrate again:\n" + "\n".join(lines)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('newsmind', '0009_customuser_normalized_lookup_fields'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
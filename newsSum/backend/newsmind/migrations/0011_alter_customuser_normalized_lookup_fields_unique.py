@@ -0,0 +1,23 @@
+# Generated by Django 5.2.8 on 2026-10-19 11:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('newsmind', '0010_backfill_normalized_lookup_fields'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='customuser',
+            name='email_normalized',
+            field=models.CharField(editable=False, max_length=254, null=True, unique=True),
+        ),
+        migrations.AlterField(
+            model_name='customuser',
+            name='username_normalized',
+            field=models.CharField(editable=False, max_length=150, null=True, unique=True),
+        ),
+    ]
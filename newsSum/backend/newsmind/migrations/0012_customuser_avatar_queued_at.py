@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-19 15:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('newsmind', '0011_alter_customuser_normalized_lookup_fields_unique'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customuser',
+            name='avatar_queued_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
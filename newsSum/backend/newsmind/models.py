@@ -6,6 +6,16 @@ from django.conf import settings
 User = settings.AUTH_USER_MODEL
 
 
+def normalize_email_key(value: str) -> str:
+    """Lookup key for case-insensitive email matching."""
+    return (value or "").strip().lower()
+
+
+def normalize_username_key(value: str) -> str:
+    """Lookup key for case-insensitive username matching."""
+    return (value or "").strip().casefold()
+
+
 class CustomUser(AbstractUser):
     # make email unique to enforce uniqueness at DB level
     email = models.EmailField(unique=True)
@@ -13,6 +23,33 @@ class CustomUser(AbstractUser):
 
     # avatar moved here (store image path)
     avatar = models.ImageField(upload_to="avatars/", null=True, blank=True)
+    # pre-sized, metadata-stripped copies of the avatar: {"64": "avatars/<hash>_64.webp", ...}
+    avatar_variants = models.JSONField(default=dict, blank=True)
+    # when the variants were last queued; profile reads retry after a while
+    avatar_queued_at = models.DateTimeField(null=True, blank=True)
+
+    # lowercased copies of email/username, kept in sync by save(), so logins
+    # and signup checks are exact matches on a unique index instead of
+    # case-insensitive comparisons (bulk_create/.update() must set them too)
+    email_normalized = models.CharField(
+        max_length=254, unique=True, null=True, editable=False
+    )
+    username_normalized = models.CharField(
+        max_length=150, unique=True, null=True, editable=False
+    )
+
+    def save(self, *args, **kwargs):
+        self.email_normalized = normalize_email_key(self.email) or None
+        self.username_normalized = normalize_username_key(self.username) or None
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            update_fields = set(update_fields)
+            if "email" in update_fields:
+                update_fields.add("email_normalized")
+            if "username" in update_fields:
+                update_fields.add("username_normalized")
+            kwargs["update_fields"] = update_fields
+        super().save(*args, **kwargs)
 
     def __str__(self):
         return self.username
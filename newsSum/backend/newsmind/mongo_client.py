@@ -1,9 +1,14 @@
 from pymongo import MongoClient
 import os
 
+from .query_stats import register_mongo_listener
+
 MONGO_URI = os.getenv("MONGO_URI")
 if not MONGO_URI:
     raise Exception("MONGO_URI not set in environment")
 
+# listeners only attach to clients created after registration
+register_mongo_listener()
+
 _client = MongoClient(MONGO_URI)
 db = _client["newssum_mongo"]  # name of Mongo DB (you can change)
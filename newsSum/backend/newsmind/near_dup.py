@@ -0,0 +1,170 @@
+"""
+Near-duplicate article detection for the news feed.
+
+Syndicated stories reach us from several outlets with slightly different
+headlines and URLs, so exact URL/title matching misses them. Each article is
+reduced to a MinHash signature over word shingles of its title and opening
+text, candidate pairs are found with LSH banding, confirmed against the
+estimated Jaccard similarity and grouped with union-find.
+
+Signatures use one-permutation hashing (each shingle is hashed once and
+falls into one of NUM_PERM bins) so the whole pass stays linear in the
+number of shingles.
+"""
+
+import hashlib
+import re
+
+NUM_PERM = 64
+SHINGLE_SIZE = 3
+# only the opening of the body is used; syndicated copies diverge later on
+BODY_WORDS = 120
+DEFAULT_THRESHOLD = 0.7
+
+_EMPTY = (1 << 64) - 1
+_word_re = re.compile(r"\w+", re.UNICODE)
+
+
+def _hash64(value: str) -> int:
+    return int.from_bytes(
+        hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "big"
+    )
+
+
+def article_shingles(article: dict) -> set:
+    """Word n-gram shingles over the title and the first BODY_WORDS of text."""
+    title = article.get("title") or ""
+    body = article.get("content") or article.get("description") or ""
+    words = _word_re.findall(title.lower())
+    words += _word_re.findall(body.lower())[:BODY_WORDS]
+    if len(words) < SHINGLE_SIZE:
+        return {" ".join(words)} if words else set()
+    return {
+        " ".join(words[i : i + SHINGLE_SIZE])
+        for i in range(len(words) - SHINGLE_SIZE + 1)
+    }
+
+
+def minhash_signature(shingles: set, num_perm: int = NUM_PERM) -> tuple:
+    """
+    One-permutation MinHash: keep the smallest hash per bin, then fill empty
+    bins from the next non-empty bin (rotation densification).
+    """
+    bins = [_EMPTY] * num_perm
+    for sh in shingles:
+        h = _hash64(sh)
+        idx = h % num_perm
+        if h < bins[idx]:
+            bins[idx] = h
+    if all(b == _EMPTY for b in bins):
+        return tuple(bins)
+    for i in range(num_perm):
+        if bins[i] == _EMPTY:
+            j = (i + 1) % num_perm
+            offset = 1
+            while bins[j] == _EMPTY:
+                j = (j + 1) % num_perm
+                offset += 1
+            # mix in the offset so densified bins don't trivially collide
+            bins[i] = (bins[j] + offset * 0x9E3779B97F4A7C15) & _EMPTY
+    return tuple(bins)
+
+
+def estimate_similarity(sig_a: tuple, sig_b: tuple) -> float:
+    if not sig_a:
+        return 0.0
+    same = sum(1 for a, b in zip(sig_a, sig_b) if a == b)
+    return same / len(sig_a)
+
+
+def lsh_params(threshold: float, num_perm: int = NUM_PERM) -> tuple:
+    """
+    Pick (bands, rows) with bands * rows == num_perm whose S-curve midpoint
+    (1/bands) ** (1/rows) is closest to `threshold`.
+    """
+    best = (num_perm, 1)
+    best_err = None
+    for rows in range(1, num_perm + 1):
+        if num_perm % rows:
+            continue
+        bands = num_perm // rows
+        err = abs((1.0 / bands) ** (1.0 / rows) - threshold)
+        if best_err is None or err < best_err:
+            best, best_err = (bands, rows), err
+    return best
+
+
+class _UnionFind:
+    def __init__(self, n):
+        self.parent = list(range(n))
+
+    def find(self, x):
+        while self.parent[x] != x:
+            self.parent[x] = self.parent[self.parent[x]]
+            x = self.parent[x]
+        return x
+
+    def union(self, a, b):
+        ra, rb = self.find(a), self.find(b)
+        if ra == rb:
+            return
+        # keep the earliest article as root so feed order is preserved
+        if ra < rb:
+            self.parent[rb] = ra
+        else:
+            self.parent[ra] = rb
+
+
+def find_clusters(articles: list, threshold: float = DEFAULT_THRESHOLD) -> list:
+    """
+    Return clusters of near-duplicate articles as lists of indexes into
+    `articles`, each sorted ascending and ordered by first member.
+    """
+    n = len(articles)
+    if n == 0:
+        return []
+    signatures = [minhash_signature(article_shingles(a)) for a in articles]
+    bands, rows = lsh_params(threshold)
+    uf = _UnionFind(n)
+
+    for band in range(bands):
+        start = band * rows
+        buckets = {}
+        for idx, sig in enumerate(signatures):
+            if sig[0] == _EMPTY:
+                continue  # no text to compare on
+            bucket = buckets.setdefault(sig[start : start + rows], [])
+            for other in bucket:
+                if uf.find(other) == uf.find(idx):
+                    continue
+                if estimate_similarity(signatures[other], sig) >= threshold:
+                    uf.union(other, idx)
+            bucket.append(idx)
+
+    groups = {}
+    for idx in range(n):
+        groups.setdefault(uf.find(idx), []).append(idx)
+    return [groups[root] for root in sorted(groups)]
+
+
+def collapse_near_duplicates(
+    articles: list, threshold: float = DEFAULT_THRESHOLD
+) -> list:
+    """
+    Keep one representative per near-duplicate cluster (the first one in feed
+    order). The others are attached to it under `alternates`.
+    """
+    result = []
+    for cluster in find_clusters(articles, threshold):
+        rep = dict(articles[cluster[0]])
+        rep["alternates"] = [
+            {
+                "id": articles[i].get("id"),
+                "title": articles[i].get("title"),
+                "url": articles[i].get("url"),
+                "source": articles[i].get("source"),
+            }
+            for i in cluster[1:]
+        ]
+        result.append(rep)
+    return result
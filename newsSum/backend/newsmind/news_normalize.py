@@ -0,0 +1,130 @@
+"""
+Normalization helpers for WorldNewsAPI payloads.
+
+Kept free of Django imports so the news proxy, the ingestion command and the
+benchmarks can share them.
+"""
+
+from urllib.parse import urlparse
+
+# fields a client can request with ?fields=; `raw` is the provider item and
+# duplicates `content`, so it is only sent when asked for explicitly
+ARTICLE_FIELDS = (
+    "id",
+    "title",
+    "description",
+    "content",
+    "url",
+    "image",
+    "publishedAt",
+    "source",
+    "alternates",
+    "raw",
+)
+DEFAULT_FIELDS = tuple(f for f in ARTICLE_FIELDS if f != "raw")
+
+
+def normalize_top_news(data: dict) -> list:
+    """
+    Flatten the provider response into our article shape.
+    data expected structure: {"top_news":[ {"news":[ {...}, {...} ]}, ... ], "language":"en","country":"us"}
+    """
+    top_news = data.get("top_news") or []
+    normalized = []
+
+    for group in top_news:
+        news_list = group.get("news", []) or []
+        for item in news_list:
+            # fields in provider: id, title, text, summary, url, image, publish_date, author, authors, language, source_country, sentiment
+            art_id = item.get("id") or item.get("url") or item.get("title")[:80]
+            title = item.get("title")
+            # prefer `text` for full content; fallback to `summary`
+            content = item.get("text") or item.get("summary") or ""
+            description = (
+                item.get("summary") or (content[:300] + "...") if content else ""
+            )
+            image = item.get("image")
+            publishedAt = None
+            if item.get("publish_date"):
+                # provider returns 'YYYY-MM-DD HH:MM:SS' — keep as ISO-ish
+                publishedAt = item.get("publish_date")
+            source_name = None
+            # try parse source from url host if provided
+            url = item.get("url")
+            if url:
+                try:
+                    parsed = urlparse(url)
+                    source_name = parsed.hostname
+                except Exception:
+                    source_name = None
+            # also fallback to author or source_country
+            if not source_name:
+                if item.get("author"):
+                    source_name = item.get("author")
+                else:
+                    source_name = item.get("source_country")
+
+            normalized.append(
+                {
+                    "id": art_id,
+                    "title": title,
+                    "description": description,
+                    "content": content,
+                    "url": url,
+                    "image": image,
+                    "publishedAt": publishedAt,
+                    "source": source_name,
+                    "raw": item,
+                }
+            )
+
+    return normalized
+
+
+def dedupe_articles(normalized: list) -> list:
+    """Drop repeated articles by URL, then by (case-insensitive) title."""
+    seen_urls = set()
+    deduped = []
+    for art in normalized:
+        url = art.get("url")
+        if url:
+            if url in seen_urls:
+                continue
+            seen_urls.add(url)
+            deduped.append(art)
+        else:
+            deduped.append(art)
+
+    seen_titles = set()
+    final_articles = []
+    for art in deduped:
+        title = (art.get("title") or "").strip().lower()
+        if title in seen_titles:
+            continue
+        seen_titles.add(title)
+        final_articles.append(art)
+
+    return final_articles
+
+
+def parse_fields(value: str) -> tuple:
+    """
+    Parse a `fields` query value ("id,title,url") into a tuple of known field
+    names. Empty means DEFAULT_FIELDS, "all" means every field including raw.
+    Raises ValueError on unknown names.
+    """
+    value = (value or "").strip()
+    if not value:
+        return DEFAULT_FIELDS
+    if value == "all":
+        return ARTICLE_FIELDS
+    fields = tuple(dict.fromkeys(f.strip() for f in value.split(",") if f.strip()))
+    unknown = [f for f in fields if f not in ARTICLE_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return fields
+
+
+def select_fields(articles: list, fields: tuple) -> list:
+    """Project each article onto `fields` (missing keys are skipped)."""
+    return [{f: art[f] for f in fields if f in art} for art in articles]
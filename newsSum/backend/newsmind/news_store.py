@@ -0,0 +1,230 @@
+"""
+Local store of ingested news articles (Mongo `articles` collection).
+
+`manage.py ingest_news` fills it from WorldNewsAPI; the news endpoint reads
+pages from it with keyset pagination so feed latency doesn't depend on the
+upstream provider, and remembers what it fetched live, so summarize requests
+can name an article by id or URL instead of uploading it (find_articles).
+
+An article can be in several markets' feeds; every market it was seen in is
+kept in its `markets` array ("us:en"), which feed queries match on.
+"""
+
+import base64
+from datetime import datetime
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import ASCENDING, DESCENDING, UpdateOne
+
+from .mongo_client import db
+
+ARTICLES_COLLECTION = "articles"
+
+# provider format, also used for articles that come without a publish date
+PUBLISHED_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def articles_collection():
+    return db[ARTICLES_COLLECTION]
+
+
+_indexes_ready = False
+
+
+def market_key(country: str, language: str) -> str:
+    return f"{country}:{language}"
+
+
+def ensure_indexes():
+    global _indexes_ready
+    col = articles_collection()
+    # articles stored before `markets` existed: their one market
+    col.update_many(
+        {"markets": {"$exists": False}},
+        [{"$set": {"markets": [{"$concat": ["$source_country", ":", "$language"]}]}}],
+    )
+    # the single-market indexes they were queried with
+    existing = col.index_information()
+    for name in ("published_market", "market_feed"):
+        if name in existing and "markets" not in dict(existing[name]["key"]):
+            col.drop_index(name)
+
+    col.create_index([("url", ASCENDING)], unique=True, name="url_unique")
+    # summarize by provider article id
+    col.create_index([("id", ASCENDING)], name="provider_id")
+    # date-range scans across all markets
+    col.create_index(
+        [("publishedAt", DESCENDING), ("markets", ASCENDING)],
+        name="published_markets",
+    )
+    # feed pages: equality on market first, then the keyset sort order
+    col.create_index(
+        [("markets", ASCENDING), ("publishedAt", DESCENDING), ("_id", DESCENDING)],
+        name="markets_feed",
+    )
+    _indexes_ready = True
+
+
+def ensure_indexes_once():
+    """ensure_indexes() the first time a process writes to the store."""
+    if not _indexes_ready:
+        ensure_indexes()
+
+
+def upsert_articles(articles: list, country: str, language: str) -> dict:
+    """
+    Upsert normalized articles keyed on URL, adding (country, language) to
+    each one's markets. Articles without a URL are skipped (nothing stable
+    to key them on). Returns write counts.
+    """
+    market = market_key(country, language)
+    now = datetime.utcnow()
+    ops = []
+    for art in articles:
+        url = art.get("url")
+        if not url:
+            continue
+        doc = dict(art)
+        doc.pop("alternates", None)
+        doc["publishedAt"] = doc.get("publishedAt") or now.strftime(PUBLISHED_FORMAT)
+        doc["updated_at"] = now
+        ops.append(
+            UpdateOne(
+                {"url": url},
+                {
+                    "$set": doc,
+                    "$addToSet": {"markets": market},
+                    # the market it was first seen in, for display
+                    "$setOnInsert": {
+                        "ingested_at": now,
+                        "source_country": country,
+                        "language": language,
+                    },
+                },
+                upsert=True,
+            )
+        )
+    if not ops:
+        return {"upserted": 0, "modified": 0, "skipped": len(articles)}
+    result = articles_collection().bulk_write(ops, ordered=False)
+    return {
+        "upserted": result.upserted_count,
+        "modified": result.modified_count,
+        "skipped": len(articles) - len(ops),
+    }
+
+
+# --- Lookup by reference ---
+def _id_variants(value) -> list:
+    # provider ids are numbers, but come back from clients as either type
+    variants = [value]
+    if isinstance(value, int):
+        variants.append(str(value))
+    elif isinstance(value, str) and value.isdigit():
+        variants.append(int(value))
+    return variants
+
+
+def find_articles(refs: list) -> list:
+    """
+    Full stored articles (including `raw`) for `refs`, a list of
+    {"article_id": ...} / {"url": ...} dicts, in one query. Returns a list
+    aligned with `refs`, with None where nothing is stored.
+    """
+    urls = [ref["url"] for ref in refs if ref.get("url")]
+    ids = [
+        v
+        for ref in refs
+        if ref.get("article_id") is not None
+        for v in _id_variants(ref["article_id"])
+    ]
+    clauses = []
+    if urls:
+        clauses.append({"url": {"$in": urls}})
+    if ids:
+        clauses.append({"id": {"$in": ids}})
+    if not clauses:
+        return [None] * len(refs)
+
+    projection = {"_id": 0, "ingested_at": 0, "updated_at": 0}
+    by_url, by_id = {}, {}
+    for doc in articles_collection().find({"$or": clauses}, projection):
+        by_url[doc.get("url")] = doc
+        by_id[str(doc.get("id"))] = doc
+
+    found = []
+    for ref in refs:
+        doc = by_url.get(ref.get("url")) if ref.get("url") else None
+        if doc is None and ref.get("article_id") is not None:
+            doc = by_id.get(str(ref["article_id"]))
+        found.append(doc)
+    return found
+
+
+# --- Keyset pagination ---
+def encode_cursor(published_at: str, oid: ObjectId) -> str:
+    raw = f"{published_at}|{oid}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> tuple:
+    """Raises ValueError on a malformed cursor."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+        published_at, _, oid = raw.rpartition("|")
+        return published_at, ObjectId(oid)
+    except (UnicodeError, ValueError, InvalidId) as e:
+        raise ValueError("Invalid cursor.") from e
+
+
+def query_articles(
+    markets: list,
+    limit: int,
+    cursor: str = None,
+    date: str = None,
+    include_raw: bool = False,
+) -> tuple:
+    """
+    Return (articles, next_cursor) for the newest articles in `markets`
+    (list of (country, language) pairs), optionally restricted to one
+    publish date. Raises ValueError for a bad cursor.
+    """
+    filters = []
+    if markets:
+        keys = [market_key(country, language) for country, language in markets]
+        filters.append({"markets": {"$in": keys}})
+    if date:
+        filters.append({"publishedAt": {"$gte": date, "$lt": date + "~"}})
+    if cursor:
+        published_at, oid = decode_cursor(cursor)
+        filters.append(
+            {
+                "$or": [
+                    {"publishedAt": {"$lt": published_at}},
+                    {"publishedAt": published_at, "_id": {"$lt": oid}},
+                ]
+            }
+        )
+
+    query = {"$and": filters} if filters else {}
+    projection = {"ingested_at": 0, "updated_at": 0}
+    if not include_raw:
+        projection["raw"] = 0
+
+    docs = list(
+        articles_collection()
+        .find(query, projection)
+        .sort([("publishedAt", DESCENDING), ("_id", DESCENDING)])
+        .limit(limit + 1)
+    )
+
+    next_cursor = None
+    if len(docs) > limit:
+        docs = docs[:limit]
+        last = docs[-1]
+        next_cursor = encode_cursor(last["publishedAt"], last["_id"])
+
+    for doc in docs:
+        doc.pop("_id", None)
+    return docs, next_cursor
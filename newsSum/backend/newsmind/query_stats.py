@@ -0,0 +1,130 @@
+"""
+Per-request accounting of MySQL queries and Mongo commands.
+
+SQL is captured with a connection execute_wrapper installed for the request;
+Mongo through a pymongo CommandListener registered before any client is
+created (see mongo_client.py). Both write into the RequestStats bound to the
+current context, so work done outside a tracked block costs nothing beyond a
+ContextVar lookup.
+"""
+
+import time
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from django.db import connections
+from pymongo import monitoring
+
+from .tracing import record_span
+
+_current = ContextVar("newsmind_query_stats", default=None)
+
+
+class RequestStats:
+    __slots__ = (
+        "parent",
+        "sql_count",
+        "sql_time",
+        "sql",
+        "mongo_count",
+        "mongo_time",
+        "mongo",
+    )
+
+    def __init__(self, parent=None):
+        # enclosing tracker (e.g. a test budget around a request) also counts
+        self.parent = parent
+        self.sql_count = 0
+        self.sql_time = 0.0
+        self.sql = []
+        self.mongo_count = 0
+        self.mongo_time = 0.0
+        self.mongo = []
+
+    def as_header(self) -> str:
+        return (
+            f"sql={self.sql_count};sql_ms={self.sql_time * 1000:.1f};"
+            f"mongo={self.mongo_count};mongo_ms={self.mongo_time * 1000:.1f}"
+        )
+
+    def add_sql(self, sql, seconds):
+        stats = self
+        while stats is not None:
+            stats.sql_count += 1
+            stats.sql_time += seconds
+            stats.sql.append(sql)
+            stats = stats.parent
+
+    def add_mongo(self, command, seconds):
+        stats = self
+        while stats is not None:
+            stats.mongo_count += 1
+            stats.mongo_time += seconds
+            stats.mongo.append(command)
+            stats = stats.parent
+
+
+def current_stats():
+    return _current.get()
+
+
+def _sql_wrapper(execute, sql, params, many, context):
+    stats = _current.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.add_sql(sql, time.perf_counter() - start)
+
+
+class MongoCommandListener(monitoring.CommandListener):
+    def started(self, event):
+        pass
+
+    def _record(self, event, status):
+        seconds = event.duration_micros / 1e6
+        stats = _current.get()
+        if stats is not None:
+            stats.add_mongo(event.command_name, seconds)
+        record_span(
+            f"mongo.{event.command_name}",
+            seconds,
+            status=status,
+            database=event.database_name,
+        )
+
+    def succeeded(self, event):
+        self._record(event, "ok")
+
+    def failed(self, event):
+        self._record(event, "error")
+
+
+_listener_registered = False
+
+
+def register_mongo_listener():
+    """Register the command listener once; must run before MongoClient()."""
+    global _listener_registered
+    if not _listener_registered:
+        monitoring.register(MongoCommandListener())
+        _listener_registered = True
+
+
+@contextmanager
+def track_queries():
+    """Collect SQL and Mongo statistics for the enclosed block."""
+    parent = _current.get()
+    stats = RequestStats(parent)
+    token = _current.set(stats)
+    try:
+        with ExitStack() as stack:
+            # the outermost tracker owns the wrapper; nested ones share it
+            if parent is None:
+                for conn in connections.all():
+                    stack.enter_context(conn.execute_wrapper(_sql_wrapper))
+            yield stats
+    finally:
+        _current.reset(token)
@@ -0,0 +1,191 @@
+"""
+"You already summarized similar stories": related items from a user's history.
+
+Each worker keeps a VectorIndex (see vector_index.py) per recently active
+user, built from the user's summaries collection on first use and updated
+in place when SummarizeAPIView saves or UserSummaryDeleteAPIView deletes a
+summary. A per-user version counter in Mongo tells a worker when another
+worker changed the collection; its copy is then rebuilt on the next query.
+
+Needs numpy; without it `enabled()` is False and the hooks do nothing.
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from django.conf import settings
+from pymongo import ReturnDocument
+
+from . import metrics
+from .mongo_client import db
+from .tracing import span
+
+logger = logging.getLogger(__name__)
+
+STATE_COLLECTION = "related_index_state"
+PROJECTION = {"title": 1, "summary": 1, "article": 1}
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def _vectors():
+    """newsmind.vector_index, or None when numpy isn't installed."""
+    try:
+        from . import vector_index
+    except ImportError:
+        return None
+    return vector_index
+
+
+def enabled() -> bool:
+    return _setting("RELATED_INDEX_ENABLED", True) and _vectors() is not None
+
+
+def document_text(doc: dict) -> str:
+    """Text a saved summary is indexed under: title, summary and article body."""
+    article = doc.get("article") or {}
+    parts = [
+        doc.get("title") or article.get("title") or "",
+        doc.get("summary") or "",
+        article.get("description") or "",
+        article.get("content") or "",
+    ]
+    return "\n".join(p for p in parts if p)
+
+
+# --- Version counter ---
+def _version(user_id) -> int:
+    state = db[STATE_COLLECTION].find_one({"_id": user_id}, {"version": 1})
+    return state["version"] if state else 0
+
+
+def _bump(user_id) -> int:
+    state = db[STATE_COLLECTION].find_one_and_update(
+        {"_id": user_id},
+        {"$inc": {"version": 1}},
+        upsert=True,
+        return_document=ReturnDocument.AFTER,
+    )
+    return state["version"]
+
+
+# --- Per-user indexes ---
+_cache = OrderedDict()  # user_id -> [index, version]
+_lock = threading.Lock()
+
+
+def _new_index():
+    vi = _vectors()
+    return vi.VectorIndex(
+        dim=_setting("RELATED_INDEX_DIM", vi.DEFAULT_DIM),
+        ivf_min_items=_setting("RELATED_IVF_MIN_ITEMS", vi.DEFAULT_IVF_MIN_ITEMS),
+    )
+
+
+def _build(user, version):
+    vi = _vectors()
+    index = _new_index()
+    with span("related.build", user_id=user.id):
+        for doc in db[user.mongo_collection_name].find({}, PROJECTION):
+            index.add(str(doc["_id"]), vi.embed(document_text(doc), index.dim))
+    metrics.incr("related.rebuild")
+    return index
+
+
+def _remember(user_id, index, version):
+    with _lock:
+        _cache[user_id] = [index, version]
+        _cache.move_to_end(user_id)
+        while len(_cache) > _setting("RELATED_INDEX_MAX_USERS", 32):
+            _cache.popitem(last=False)
+
+
+def get_index(user):
+    """The user's index, rebuilt if another worker changed their summaries."""
+    version = _version(user.id)
+    with _lock:
+        entry = _cache.get(user.id)
+        if entry is not None and entry[1] == version:
+            _cache.move_to_end(user.id)
+            return entry[0]
+    index = _build(user, version)
+    _remember(user.id, index, version)
+    return index
+
+
+def _apply(user, change):
+    """Bump the version and apply `change(index)` if our copy was current."""
+    version = _bump(user.id)
+    with _lock:
+        entry = _cache.get(user.id)
+        if entry is None:
+            return
+        if entry[1] != version - 1:
+            # missed someone else's change: rebuild on the next query instead
+            del _cache[user.id]
+            return
+        entry[1] = version
+    change(entry[0])
+
+
+def on_summary_saved(user, saved_id: str, doc: dict):
+    if not enabled():
+        return
+    vi = _vectors()
+    _apply(
+        user,
+        lambda index: index.add(saved_id, vi.embed(document_text(doc), index.dim)),
+    )
+
+
+def on_summary_deleted(user, summary_id: str):
+    if not enabled():
+        return
+    _apply(user, lambda index: index.remove(summary_id))
+
+
+# --- Queries ---
+def find_related(user, text: str, k: int = 5, min_score: float = None, exclude=None):
+    """
+    Saved summaries most similar to `text`, best first, as dicts with
+    `_id`, `title`, `url`, `created_at` and `score`.
+    """
+    if min_score is None:
+        min_score = _setting("RELATED_MIN_SCORE", 0.2)
+    index = get_index(user)
+    with span("related.search", user_id=user.id, items=len(index)):
+        hits = index.search(_vectors().embed(text, index.dim), k=k, exclude=exclude)
+    hits = [(item_id, score) for item_id, score in hits if score >= min_score]
+    if not hits:
+        return []
+
+    try:
+        oids = [ObjectId(item_id) for item_id, _ in hits]
+    except InvalidId:
+        return []
+    docs = {
+        str(d["_id"]): d
+        for d in db[user.mongo_collection_name].find(
+            {"_id": {"$in": oids}}, {"title": 1, "url": 1, "created_at": 1}
+        )
+    }
+    results = []
+    for item_id, score in hits:
+        doc = docs.get(item_id)
+        if doc is None:
+            continue  # deleted since the index last saw it
+        results.append(
+            {
+                "_id": item_id,
+                "title": doc.get("title"),
+                "url": doc.get("url"),
+                "created_at": doc.get("created_at"),
+                "score": round(score, 4),
+            }
+        )
+    return results
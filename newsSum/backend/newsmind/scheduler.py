@@ -0,0 +1,309 @@
+"""
+Per-user fair sharing of the Hugging Face inference capacity.
+
+Two layers sit in front of every inference call:
+
+* quota accounting: calls and input/output tokens per user, counted in Mongo
+  per fixed window so every worker process sees the same numbers. A call
+  that would exceed the user's window budget raises QuotaExceeded.
+* weighted fair queuing: each process gets a share of the slots (below).
+  When callers wait, the slot goes to the lowest virtual finish tag
+  (tokens / weight), so one user sending huge articles cannot starve the
+  others.
+
+With the remote backend HF_MAX_CONCURRENCY is the limit for the whole
+deployment, so each of the HF_WORKER_PROCESSES processes gets
+HF_MAX_CONCURRENCY // HF_WORKER_PROCESSES slots (at least one). That keeps
+the total in-flight calls near the limit and leaves each process fewer
+slots than request threads, so the fair queue actually decides who goes
+next. Queuing is still per process, though: users are only ordered against
+the others waiting in the same worker, and the quotas above are what bound
+a user across workers. A local backend is a separate model per process,
+so there every process gets all HF_MAX_CONCURRENCY slots.
+"""
+
+import heapq
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from pymongo import ASCENDING, ReturnDocument
+
+from .mongo_client import db
+
+USAGE_COLLECTION = "hf_usage"
+
+# key used for calls made outside a user request (management commands)
+SYSTEM_USER = "__system__"
+
+
+class QuotaExceeded(Exception):
+    def __init__(self, message, retry_after):
+        super().__init__(message)
+        self.retry_after = max(1, int(retry_after))
+
+
+class SchedulerTimeout(Exception):
+    def __init__(self, message, retry_after):
+        super().__init__(message)
+        self.retry_after = max(1, int(retry_after))
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+# --- Quota accounting ---
+def _window_start(now: float) -> int:
+    size = _setting("HF_USAGE_WINDOW_SECONDS", 3600)
+    return int(now // size * size)
+
+
+_indexes_ready = False
+
+
+def _usage_collection():
+    global _indexes_ready
+    col = db[USAGE_COLLECTION]
+    if not _indexes_ready:
+        # unique key keeps concurrent upserts from creating duplicate windows
+        col.create_index([("user_id", ASCENDING), ("window", ASCENDING)], unique=True)
+        _indexes_ready = True
+    return col
+
+
+def reserve(user_id, input_tokens: int):
+    """
+    Count one call of `input_tokens` against the user's current window,
+    raising QuotaExceeded (and undoing the count) if that goes over budget.
+    Returns the window, for refund().
+    """
+    if user_id is None:
+        return None
+    now = time.time()
+    window = _window_start(now)
+    col = _usage_collection()
+    doc = col.find_one_and_update(
+        {"user_id": user_id, "window": window},
+        {"$inc": {"calls": 1, "input_tokens": input_tokens, "output_tokens": 0}},
+        upsert=True,
+        return_document=ReturnDocument.AFTER,
+    )
+
+    max_calls = _setting("HF_USER_CALLS_PER_WINDOW", 0)
+    max_tokens = _setting("HF_USER_TOKENS_PER_WINDOW", 0)
+    over_calls = max_calls and doc["calls"] > max_calls
+    over_tokens = max_tokens and doc["input_tokens"] > max_tokens
+    if over_calls or over_tokens:
+        col.update_one(
+            {"_id": doc["_id"]},
+            {"$inc": {"calls": -1, "input_tokens": -input_tokens}},
+        )
+        retry_after = window + _setting("HF_USAGE_WINDOW_SECONDS", 3600) - now
+        what = "call" if over_calls else "token"
+        raise QuotaExceeded(f"Summarization {what} budget exhausted.", retry_after)
+    return window
+
+
+def refund(user_id, window, input_tokens: int):
+    """Give back a reserve()d call that never ran (queue timeout, failure)."""
+    if user_id is None or window is None:
+        return
+    _usage_collection().update_one(
+        {"user_id": user_id, "window": window},
+        {"$inc": {"calls": -1, "input_tokens": -input_tokens}},
+    )
+
+
+def check_budget(user_id):
+    """Raise QuotaExceeded if the user has already used up the current window."""
+    if user_id is None:
+        return
+    now = time.time()
+    window = _window_start(now)
+    doc = _usage_collection().find_one({"user_id": user_id, "window": window}) or {}
+    max_calls = _setting("HF_USER_CALLS_PER_WINDOW", 0)
+    max_tokens = _setting("HF_USER_TOKENS_PER_WINDOW", 0)
+    if (max_calls and doc.get("calls", 0) >= max_calls) or (
+        max_tokens and doc.get("input_tokens", 0) >= max_tokens
+    ):
+        retry_after = window + _setting("HF_USAGE_WINDOW_SECONDS", 3600) - now
+        raise QuotaExceeded("Summarization budget exhausted.", retry_after)
+
+
+def record_output(user_id, output_tokens: int):
+    if user_id is None:
+        return
+    _usage_collection().update_one(
+        {"user_id": user_id, "window": _window_start(time.time())},
+        {"$inc": {"output_tokens": output_tokens}},
+        upsert=True,
+    )
+
+
+def usage_report(user_id) -> dict:
+    """Current-window usage against the limits, plus all-time totals."""
+    now = time.time()
+    size = _setting("HF_USAGE_WINDOW_SECONDS", 3600)
+    window = _window_start(now)
+    col = _usage_collection()
+
+    current = col.find_one({"user_id": user_id, "window": window}) or {}
+    totals = list(
+        col.aggregate(
+            [
+                {"$match": {"user_id": user_id}},
+                {
+                    "$group": {
+                        "_id": None,
+                        "calls": {"$sum": "$calls"},
+                        "input_tokens": {"$sum": "$input_tokens"},
+                        "output_tokens": {"$sum": "$output_tokens"},
+                    }
+                },
+            ]
+        )
+    )
+    total = totals[0] if totals else {}
+
+    def as_iso(ts):
+        return datetime.fromtimestamp(ts, tz=dt_timezone.utc).isoformat()
+
+    return {
+        "window": {
+            "start": as_iso(window),
+            "end": as_iso(window + size),
+            "calls": current.get("calls", 0),
+            "input_tokens": current.get("input_tokens", 0),
+            "output_tokens": current.get("output_tokens", 0),
+            "limits": {
+                "calls": _setting("HF_USER_CALLS_PER_WINDOW", 0) or None,
+                "input_tokens": _setting("HF_USER_TOKENS_PER_WINDOW", 0) or None,
+            },
+        },
+        "total": {
+            "calls": total.get("calls", 0),
+            "input_tokens": total.get("input_tokens", 0),
+            "output_tokens": total.get("output_tokens", 0),
+        },
+    }
+
+
+# --- Weighted fair queuing ---
+class FairScheduler:
+    def __init__(self, slots: int):
+        self.slots = max(1, slots)
+        self._busy = 0
+        self._virtual_time = 0.0
+        self._last_finish = {}
+        self._waiters = []  # heap of (finish_tag, seq, event, start_tag)
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+
+    def _tag(self, key, cost, weight):
+        start = max(self._virtual_time, self._last_finish.get(key, 0.0))
+        finish = start + max(cost, 1) / max(weight, 1e-6)
+        self._last_finish[key] = finish
+        return start, finish
+
+    def _untag(self, key, start, finish):
+        # a request that never ran must not push its user further back
+        last = self._last_finish.get(key)
+        if last is not None:
+            self._last_finish[key] = max(start, last - (finish - start))
+
+    def _advance(self, start):
+        # virtual time follows the start tag of the request being served
+        self._virtual_time = max(self._virtual_time, start)
+
+    def acquire(self, key, cost: float, weight: float = 1.0, timeout: float = None):
+        with self._lock:
+            start, finish = self._tag(key, cost, weight)
+            if self._busy < self.slots and not self._waiters:
+                self._busy += 1
+                self._advance(start)
+                return
+            event = threading.Event()
+            entry = (finish, next(self._seq), event, start)
+            heapq.heappush(self._waiters, entry)
+
+        if not event.wait(timeout):
+            with self._lock:
+                if not event.is_set():
+                    self._waiters.remove(entry)
+                    heapq.heapify(self._waiters)
+                    self._untag(key, start, finish)
+                    raise SchedulerTimeout(
+                        "Summarization capacity busy, try again shortly.",
+                        retry_after=timeout or 1,
+                    )
+        # the releasing thread handed its slot over to us
+
+    def release(self):
+        with self._lock:
+            # forget users that have gone idle so the map doesn't grow forever
+            if not self._waiters:
+                self._last_finish = {
+                    k: v for k, v in self._last_finish.items()
+                    if v > self._virtual_time
+                }
+            if self._waiters:
+                _, _, event, start = heapq.heappop(self._waiters)
+                self._advance(start)
+                event.set()
+            else:
+                self._busy -= 1
+
+    @contextmanager
+    def slot(self, key, cost: float, weight: float = 1.0):
+        self.acquire(key, cost, weight, timeout=_setting("HF_QUEUE_TIMEOUT", 60))
+        try:
+            yield
+        finally:
+            self.release()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "slots": self.slots,
+                "busy": self._busy,
+                "waiting": len(self._waiters),
+            }
+
+
+def process_slots() -> int:
+    """This process's share of HF_MAX_CONCURRENCY (see the module docstring)."""
+    total = _setting("HF_MAX_CONCURRENCY", 4)
+    if _setting("INFERENCE_BACKEND", "remote") != "remote":
+        return total
+    return max(1, total // max(1, _setting("HF_WORKER_PROCESSES", 1)))
+
+
+scheduler = FairScheduler(process_slots())
+
+
+def user_weight(user) -> float:
+    if user is not None and getattr(user, "is_staff", False):
+        return _setting("HF_STAFF_WEIGHT", 1.0)
+    return 1.0
+
+
+@contextmanager
+def inference_slot(user, input_tokens: int):
+    """
+    Account one inference call for `user` (None for system jobs) and hold a
+    fair-share slot for its duration. Raises QuotaExceeded / SchedulerTimeout.
+    The call is refunded if it times out in the queue or fails.
+    """
+    user_id = user.id if user is not None else None
+    window = reserve(user_id, input_tokens)
+    key = user_id if user_id is not None else SYSTEM_USER
+    try:
+        with scheduler.slot(key, cost=input_tokens, weight=user_weight(user)):
+            yield
+    except Exception:
+        refund(user_id, window, input_tokens)
+        raise
@@ -2,6 +2,9 @@ from rest_framework import serializers
 from django.contrib.auth import get_user_model
 from django.core.validators import validate_email
 from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.files.storage import default_storage
+
+from .models import normalize_email_key, normalize_username_key
 
 User = get_user_model()
 
@@ -13,7 +16,9 @@ class SignupSerializer(serializers.Serializer):
     password2 = serializers.CharField(write_only=True, min_length=8)
 
     def validate_username(self, value):
-        if User.objects.filter(username__iexact=value).exists():
+        if User.objects.filter(
+            username_normalized=normalize_username_key(value)
+        ).exists():
             raise serializers.ValidationError("Username already taken.")
         return value
 
@@ -22,7 +27,7 @@ class SignupSerializer(serializers.Serializer):
             validate_email(value)
         except DjangoValidationError:
             raise serializers.ValidationError("Enter a valid email address.")
-        if User.objects.filter(email__iexact=value).exists():
+        if User.objects.filter(email_normalized=normalize_email_key(value)).exists():
             raise serializers.ValidationError("Email already registered.")
         return value.lower()
 
@@ -46,6 +51,8 @@ class UserProfileSerializer(serializers.ModelSerializer):
     avatar = serializers.ImageField(allow_null=True, required=False)
     # computed read-only full name (frontend can use this)
     name = serializers.SerializerMethodField(read_only=True)
+    # {"64": url, "128": url, "256": url}; empty until the upload is processed
+    avatar_variants = serializers.SerializerMethodField(read_only=True)
 
     class Meta:
         model = User
@@ -57,6 +64,7 @@ class UserProfileSerializer(serializers.ModelSerializer):
             "last_name",
             "name",
             "avatar",
+            "avatar_variants",
             "date_joined",
         )
         read_only_fields = ("id", "date_joined")
@@ -71,15 +79,31 @@ class UserProfileSerializer(serializers.ModelSerializer):
         ]
         return " ".join(parts).strip()
 
+    def get_avatar_variants(self, obj):
+        request = self.context.get("request")
+        urls = {}
+        for size, name in (obj.avatar_variants or {}).items():
+            url = default_storage.url(name)
+            urls[size] = request.build_absolute_uri(url) if request else url
+        return urls
+
     def validate_username(self, value):
         request_user = self.context["request"].user
-        if User.objects.filter(username=value).exclude(pk=request_user.pk).exists():
+        if (
+            User.objects.filter(username_normalized=normalize_username_key(value))
+            .exclude(pk=request_user.pk)
+            .exists()
+        ):
             raise serializers.ValidationError("This username is already taken.")
         return value
 
     def validate_email(self, value):
         request_user = self.context["request"].user
-        if User.objects.filter(email=value).exclude(pk=request_user.pk).exists():
+        if (
+            User.objects.filter(email_normalized=normalize_email_key(value))
+            .exclude(pk=request_user.pk)
+            .exists()
+        ):
             raise serializers.ValidationError(
                 "This email is already used by another account."
             )
@@ -1,7 +1,11 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
+from pymongo.errors import CollectionInvalid
 from .models import CustomUser
 from .mongo_client import db
+from .user_cache import user_cache
+
+USER_COLLECTION_PREFIX = "summaries_user_"
 
 
 @receiver(post_save, sender=CustomUser)
@@ -12,10 +16,13 @@ def create_mongo_collection_for_user(sender, instance, created, **kwargs):
     and save the collection name into instance.mongo_collection_name (if not set).
     """
     if created:
-        collection_name = f"summaries_user_{instance.id}"
-        # create collection (MongoDB will create on first insert, but create explicitly to be sure)
-        if collection_name not in db.list_collection_names():
+        collection_name = f"{USER_COLLECTION_PREFIX}{instance.id}"
+        # create directly and treat "already exists" as success, instead of
+        # listing every collection in the database first
+        try:
             db.create_collection(collection_name)
+        except CollectionInvalid:
+            pass
         # update the user record if not already set
         if instance.mongo_collection_name != collection_name:
             instance.mongo_collection_name = collection_name
@@ -23,3 +30,10 @@ def create_mongo_collection_for_user(sender, instance, created, **kwargs):
             CustomUser.objects.filter(pk=instance.pk).update(
                 mongo_collection_name=collection_name
             )
+
+
+@receiver(post_save, sender=CustomUser)
+@receiver(post_delete, sender=CustomUser)
+def invalidate_cached_user(sender, instance, **kwargs):
+    """Drop the user from the JWT user-resolution cache on any change."""
+    user_cache.invalidate(instance.pk)
@@ -0,0 +1,140 @@
+"""
+Server-sent events for long-running jobs.
+
+`event_stream(job, asgi)` runs `job(emit)` on a shared thread pool and turns
+every `emit(event, data)` into an SSE frame. On the ASGI path the frames are
+produced by an async generator, so a slow client holds an event-loop task
+instead of a worker thread. Under WSGI it falls back to a plain generator,
+which does keep the worker busy for the whole stream.
+
+When the client goes away the next `emit()` raises StreamClosed, so the job
+stops at its next progress point instead of running to completion.
+
+The job runs in a copy of the context event_stream() was called in, so its
+spans join the request's trace under the current span; they are exported
+when the job ends, since the request's trace has usually ended by then.
+"""
+
+import asyncio
+import contextvars
+import json
+import logging
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections
+
+from .tracing import flush_current_trace
+
+logger = logging.getLogger(__name__)
+
+HEARTBEAT_SECONDS = 15
+_DONE = object()
+
+
+class StreamClosed(Exception):
+    """The client disconnected; raised from emit() to unwind the job."""
+
+
+def format_event(event: str, data) -> bytes:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n".encode()
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=getattr(settings, "SSE_MAX_JOBS", 8),
+                    thread_name_prefix="sse-job",
+                )
+    return _executor
+
+
+def _run(job, emit, finish):
+    close_old_connections()
+    try:
+        job(emit)
+    except StreamClosed:
+        pass
+    except Exception as e:
+        logger.exception("Streaming job failed")
+        try:
+            emit("error", {"detail": "Unexpected error", "error": str(e)})
+        except StreamClosed:
+            pass
+    finally:
+        close_old_connections()
+        flush_current_trace()
+        finish()
+
+
+async def _async_stream(job, context):
+    loop = asyncio.get_running_loop()
+    events = asyncio.Queue()
+    closed = threading.Event()
+
+    def put(item):
+        try:
+            loop.call_soon_threadsafe(events.put_nowait, item)
+        except RuntimeError:
+            closed.set()  # event loop already gone
+
+    def emit(event, data):
+        if closed.is_set():
+            raise StreamClosed()
+        put((event, data))
+
+    loop.run_in_executor(
+        get_executor(), context.run, _run, job, emit, lambda: put(_DONE)
+    )
+    try:
+        while True:
+            try:
+                item = await asyncio.wait_for(events.get(), HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                yield b": keep-alive\n\n"
+                continue
+            if item is _DONE:
+                break
+            yield format_event(*item)
+    finally:
+        closed.set()
+
+
+def _sync_stream(job, context):
+    events = queue.Queue()
+    closed = threading.Event()
+
+    def emit(event, data):
+        if closed.is_set():
+            raise StreamClosed()
+        events.put((event, data))
+
+    get_executor().submit(context.run, _run, job, emit, lambda: events.put(_DONE))
+    try:
+        while True:
+            try:
+                item = events.get(timeout=HEARTBEAT_SECONDS)
+            except queue.Empty:
+                yield b": keep-alive\n\n"
+                continue
+            if item is _DONE:
+                break
+            yield format_event(*item)
+    finally:
+        closed.set()
+
+
+def event_stream(job, asgi: bool):
+    # taken now, in the view: the generators only start after the response
+    # has left the middleware, outside the request's trace
+    context = contextvars.copy_context()
+    return _async_stream(job, context) if asgi else _sync_stream(job, context)
@@ -0,0 +1,109 @@
+"""
+Incremental sync of a user's saved-summaries list.
+
+Clients keep a local copy of the list and ask for the changes since their
+last sync token instead of refetching everything. The token is an ObjectId
+high-water mark: summaries inserted after it come from the user's
+collection (ObjectIds sort by creation time), deletions from tombstones
+written by UserSummaryDeleteAPIView.
+
+ObjectIds are generated by the workers, so two of them can hand out ids a
+little out of order. The token handed back therefore trails the server
+clock by SYNC_SKEW_SECONDS, and the last few seconds of changes may be sent
+twice; clients apply them by id. Tombstones expire after
+SYNC_TOMBSTONE_TTL_SECONDS, and older tokens get a "resync" answer.
+"""
+
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from django.conf import settings
+from pymongo import ASCENDING
+
+from .mongo_client import db
+
+TOMBSTONES_COLLECTION = "summary_tombstones"
+
+
+class TokenExpired(Exception):
+    """The token predates the tombstone retention window; refetch the list."""
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+_indexes_ready = False
+
+
+def _tombstones():
+    global _indexes_ready
+    col = db[TOMBSTONES_COLLECTION]
+    if not _indexes_ready:
+        col.create_index([("user_id", ASCENDING), ("_id", ASCENDING)])
+        col.create_index(
+            [("deleted_at", ASCENDING)],
+            expireAfterSeconds=_setting("SYNC_TOMBSTONE_TTL_SECONDS", 30 * 86400),
+        )
+        _indexes_ready = True
+    return col
+
+
+def record_deletion(user_id, summary_id: str):
+    """Write the tombstone for a summary about to be deleted; returns its id."""
+    result = _tombstones().insert_one(
+        {
+            "user_id": user_id,
+            "summary_id": summary_id,
+            "deleted_at": datetime.now(dt_timezone.utc),
+        }
+    )
+    return result.inserted_id
+
+
+def discard_tombstone(tombstone_id):
+    """Drop a tombstone whose deletion didn't happen after all."""
+    _tombstones().delete_one({"_id": tombstone_id})
+
+
+def parse_token(token: str) -> ObjectId:
+    """Raises ValueError for a malformed token, TokenExpired for a stale one."""
+    try:
+        since = ObjectId(token)
+    except (InvalidId, TypeError) as e:
+        raise ValueError("Invalid sync token.") from e
+    retention = timedelta(seconds=_setting("SYNC_TOMBSTONE_TTL_SECONDS", 30 * 86400))
+    if since.generation_time < datetime.now(dt_timezone.utc) - retention:
+        raise TokenExpired("Sync token expired; fetch the full list.")
+    return since
+
+
+def next_token() -> str:
+    skew = timedelta(seconds=_setting("SYNC_SKEW_SECONDS", 5))
+    return str(ObjectId.from_datetime(datetime.now(dt_timezone.utc) - skew))
+
+
+def changes_since(collection, user_id, since, projection: dict) -> dict:
+    """
+    Summaries inserted into `collection` and ids deleted after `since` (an
+    ObjectId from parse_token, or None for a full sync), plus the next token.
+    """
+    # taken first: anything changing while we read is sent again next time
+    token = next_token()
+    query = {"_id": {"$gt": since}} if since is not None else {}
+    inserted = list(collection.find(query, projection).sort("_id", ASCENDING))
+    for doc in inserted:
+        doc["_id"] = str(doc["_id"])
+
+    deleted = []
+    if since is not None:
+        tombstones = _tombstones().find(
+            {"user_id": user_id, "_id": {"$gt": since}}, {"summary_id": 1}
+        )
+        deleted = [t["summary_id"] for t in tombstones]
+        # inserted and deleted within the window: only the deletion matters
+        gone = set(deleted)
+        inserted = [doc for doc in inserted if doc["_id"] not in gone]
+
+    return {"inserted": inserted, "deleted": deleted, "sync_token": token}
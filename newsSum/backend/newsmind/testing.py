@@ -0,0 +1,99 @@
+"""
+Test helpers for per-endpoint query budgets.
+
+    class LoginBudgetTests(QueryBudgetMixin, APITestCase):
+        def test_login(self):
+            with self.assertQueryBudget(sql=1, mongo=0):
+                self.client.post("/api/auth/login/", {...}, format="json")
+
+CountingDatabase wraps an in-memory database (e.g. mongomock's, which sends
+no pymongo monitoring events) so its calls still count against the budget.
+"""
+
+from contextlib import contextmanager
+
+from .query_stats import current_stats, track_queries
+
+# collection methods that send one command to the server
+MONGO_COMMAND_METHODS = frozenset(
+    {
+        "aggregate",
+        "bulk_write",
+        "count_documents",
+        "create_index",
+        "delete_many",
+        "delete_one",
+        "distinct",
+        "find",
+        "find_one",
+        "find_one_and_delete",
+        "find_one_and_replace",
+        "find_one_and_update",
+        "insert_many",
+        "insert_one",
+        "replace_one",
+        "update_many",
+        "update_one",
+    }
+)
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+@contextmanager
+def assert_query_budget(sql: int = None, mongo: int = None):
+    """
+    Fail if the enclosed block runs more than `sql` SQL queries or `mongo`
+    Mongo commands (None = not checked). The offending statements are listed
+    in the failure message.
+    """
+    with track_queries() as stats:
+        yield stats
+
+    problems = []
+    if sql is not None and stats.sql_count > sql:
+        listing = "\n".join(f"  {i}. {q}" for i, q in enumerate(stats.sql, 1))
+        problems.append(f"{stats.sql_count} SQL queries (budget {sql}):\n{listing}")
+    if mongo is not None and stats.mongo_count > mongo:
+        listing = ", ".join(stats.mongo)
+        problems.append(
+            f"{stats.mongo_count} Mongo commands (budget {mongo}): {listing}"
+        )
+    if problems:
+        raise QueryBudgetExceeded("Query budget exceeded:\n" + "\n".join(problems))
+
+
+class QueryBudgetMixin:
+    def assertQueryBudget(self, sql=None, mongo=None):
+        return assert_query_budget(sql=sql, mongo=mongo)
+
+
+class CountingCollection:
+    def __init__(self, collection):
+        self._collection = collection
+
+    def __getattr__(self, name):
+        attr = getattr(self._collection, name)
+        if name not in MONGO_COMMAND_METHODS:
+            return attr
+
+        def command(*args, **kwargs):
+            stats = current_stats()
+            if stats is not None:
+                stats.add_mongo(name, 0.0)
+            return attr(*args, **kwargs)
+
+        return command
+
+
+class CountingDatabase:
+    def __init__(self, database):
+        self._database = database
+
+    def __getitem__(self, name):
+        return CountingCollection(self._database[name])
+
+    def __getattr__(self, name):
+        return getattr(self._database, name)
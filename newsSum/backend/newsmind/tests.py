@@ -1,3 +1,506 @@
-from django.test import TestCase
+import os
+import threading
+import unittest
+from datetime import datetime, timedelta, timezone as dt_timezone
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.http import JsonResponse
+from django.test import (
+    RequestFactory,
+    SimpleTestCase,
+    TransactionTestCase,
+    override_settings,
+)
+from rest_framework.response import Response
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from . import idempotency, tracing
+from .avatars import needs_retry
+from .batcher import MicroBatcher, _Pending
+from .boilerplate import LineFrequencyTable, strip_noise
+from .inference import InferenceError, LocalSeq2SeqBackend, RemoteHFBackend
+from .middleware import CompressionMiddleware
+from .scheduler import FairScheduler, SchedulerTimeout, process_slots
+from .sse import event_stream
+from .testing import CountingDatabase, QueryBudgetMixin
+from .user_cache import user_cache
+from .views_summarize import derive_short_summary, summarize_recursive
+
+try:
+    import mongomock
+except ImportError:
+    mongomock = None
+
+User = get_user_model()
+
+
+class EndpointQueryBudgetTests(QueryBudgetMixin, APITestCase):
+    """
+    Query budgets per endpoint. Raising a budget here should be a deliberate
+    decision made in review, not a side effect.
+    """
+
+    def setUp(self):
+        # the signup signal creates the user's Mongo collection; keep it local
+        patcher = mock.patch("newsmind.signals.db")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        user_cache.clear()
+
+        self.user = User.objects.create_user(
+            username="reader", email="reader@example.com", password="s3cret-pass"
+        )
+
+    def auth(self):
+        token = RefreshToken.for_user(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def test_signup(self):
+        payload = {
+            "username": "newbie",
+            "email": "newbie@example.com",
+            "password": "s3cret-pass",
+            "password2": "s3cret-pass",
+        }
+        # username/email checks, INSERT, password UPDATE, signal UPDATE
+        with self.assertQueryBudget(sql=5, mongo=0):
+            res = self.client.post("/api/auth/signup/", payload, format="json")
+        self.assertEqual(res.status_code, 201)
+
+    def test_login(self):
+        payload = {"email": "reader@example.com", "password": "s3cret-pass"}
+        with self.assertQueryBudget(sql=1, mongo=0):
+            res = self.client.post("/api/auth/login/", payload, format="json")
+        self.assertEqual(res.status_code, 200)
+
+    def test_profile_uses_cached_user(self):
+        self.auth()
+        with self.assertQueryBudget(sql=1, mongo=0):
+            res = self.client.get("/api/auth/profile/")
+        self.assertEqual(res.status_code, 200)
+
+        # second request resolves the token's user from the cache
+        with self.assertQueryBudget(sql=0, mongo=0):
+            res = self.client.get("/api/auth/profile/")
+        self.assertEqual(res.status_code, 200)
+
+
+@unittest.skipUnless(mongomock, "pip install mongomock to check Mongo budgets")
+class MongoQueryBudgetTests(QueryBudgetMixin, APITestCase):
+    """
+    Mongo budgets for the list endpoints, against mongomock: a lookup added
+    per summary or per article fails here instead of in production.
+    """
+
+    def setUp(self):
+        self.mongo = CountingDatabase(mongomock.MongoClient()["newssum_mongo"])
+        client = mock.MagicMock()
+        client.__getitem__.return_value = self.mongo
+        for target, value in (
+            ("newsmind.signals.db", mock.MagicMock()),
+            ("newsmind.views_summarize.MongoClient", mock.Mock(return_value=client)),
+            ("newsmind.summary_sync.db", self.mongo),
+            ("newsmind.summary_sync._indexes_ready", True),
+            ("newsmind.news_store.db", self.mongo),
+        ):
+            patcher = mock.patch(target, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        user_cache.clear()
+        cache.clear()
+
+        user = User.objects.create_user(
+            username="reader", email="reader@example.com", password="s3cret-pass"
+        )
+        self.summaries = self.mongo[user.mongo_collection_name]
+        self.summary_ids = self.summaries.insert_many(
+            [
+                {"title": f"Story {i}", "summary": f"Summary {i}.", "created_at": i}
+                for i in range(5)
+            ]
+        ).inserted_ids
+        self.mongo["articles"].insert_many(
+            [
+                {
+                    "source_country": "us",
+                    "language": "en",
+                    "markets": ["us:en"],
+                    "publishedAt": f"2025-01-0{i + 1} 08:00:00",
+                    "url": f"https://example.com/{i}",
+                    "title": title,
+                    "content": title,
+                }
+                for i, title in enumerate((ARTICLE, OTHER_ARTICLE, "Markets", "Rain"))
+            ]
+        )
+        token = RefreshToken.for_user(user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def test_summary_list(self):
+        with self.assertQueryBudget(sql=1, mongo=1):
+            res = self.client.get("/api/summaries/")
+        self.assertEqual(len(res.data["summaries"]), 5)
+
+    @override_settings(RELATED_INDEX_ENABLED=False)
+    def test_summary_delete(self):
+        # tombstone, then the delete itself
+        with self.assertQueryBudget(sql=1, mongo=2):
+            res = self.client.delete(f"/api/summaries/{self.summary_ids[0]}/")
+        self.assertEqual(res.status_code, 204)
+        self.assertEqual(self.summaries.count_documents({}), 4)
+
+    @override_settings(NEWS_FEED_SOURCE="store")
+    def test_news_feed(self):
+        with self.assertQueryBudget(sql=1, mongo=1):
+            res = self.client.get("/api/auth/news/", {"limit": 3})
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(len(res.data["articles"]), 3)
+
+
+ARTICLE = (
+    "The city council approved a new budget on Monday after weeks of debate. "
+    "The plan raises spending on public transport and road repairs, while "
+    "cutting administrative costs. Council members said the changes would "
+    "take effect at the start of the next fiscal year."
+)
+OTHER_ARTICLE = (
+    "A powerful storm moved across the coast overnight, knocking out power to "
+    "thousands of homes. Emergency crews worked through the morning to clear "
+    "fallen trees, and officials urged residents to stay off the roads."
+)
+
+
+class InferenceBackendContract:
+    """
+    Behaviour every inference backend shares. Subclasses provide
+    make_backend() and broken_backend() (one whose model call fails).
+    """
+
+    def test_single_summary(self):
+        summary = self.make_backend().summarize(ARTICLE)
+        self.assertIsInstance(summary, str)
+        self.assertTrue(summary.strip())
+
+    def test_batch_keeps_order_and_blank_inputs(self):
+        backend = self.make_backend()
+        out = backend.summarize_batch([ARTICLE, "", OTHER_ARTICLE, "   "])
+        self.assertEqual(len(out), 4)
+        self.assertEqual(out[1], "")
+        self.assertEqual(out[3], "")
+        # each summary belongs to its own input
+        self.assertTrue(set(out[0].lower().split()) & {"council", "budget"})
+        self.assertTrue(set(out[2].lower().split()) & {"storm", "power"})
+
+    def test_empty_batch(self):
+        self.assertEqual(self.make_backend().summarize_batch([]), [])
+
+    def test_failure_raises_inference_error(self):
+        with self.assertRaises(InferenceError):
+            self.broken_backend().summarize(ARTICLE)
+        # the views report RuntimeError as a 502
+        self.assertTrue(issubclass(InferenceError, RuntimeError))
+
+
+class FakeHFClient:
+    def summarization(self, text, model=None):
+        return [{"summary_text": text.split(". ")[0] + "."}]
+
+
+class RemoteHFBackendTests(InferenceBackendContract, SimpleTestCase):
+    def make_backend(self):
+        backend = RemoteHFBackend("test-key", "test/model", call_delay=0)
+        backend._client = FakeHFClient()
+        return backend
+
+    def broken_backend(self):
+        backend = self.make_backend()
+        backend._client = mock.Mock()
+        backend._client.summarization.side_effect = ConnectionError("down")
+        return backend
+
+    def test_missing_api_key(self):
+        with self.assertRaises(InferenceError):
+            RemoteHFBackend("", "test/model").summarize(ARTICLE)
+
+
+LOCAL_MODEL_PATH = os.getenv("INFERENCE_TEST_MODEL_PATH", "")
+
+
+@unittest.skipUnless(LOCAL_MODEL_PATH, "set INFERENCE_TEST_MODEL_PATH to a local model")
+class LocalSeq2SeqBackendTests(InferenceBackendContract, SimpleTestCase):
+    engine = os.getenv("INFERENCE_TEST_ENGINE", "torch")
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.backend = LocalSeq2SeqBackend(
+            LOCAL_MODEL_PATH, engine=cls.engine, num_beams=1, max_new_tokens=40
+        )
+        cls.backend.warm_up()
+
+    def make_backend(self):
+        return self.backend
+
+    def broken_backend(self):
+        backend = LocalSeq2SeqBackend(LOCAL_MODEL_PATH, engine=self.engine)
+        backend._tokenizer = self.backend._tokenizer
+        backend._model = mock.Mock()
+        backend._model.generate.side_effect = ValueError("bad weights")
+        return backend
+
+
+class BoilerplateTests(SimpleTestCase):
+    def test_learned_lines_are_stripped_per_host(self):
+        table = LineFrequencyTable(min_host_docs=3)
+        for i in range(4):
+            table.learn(
+                "example.com",
+                f"Sign up for the Example Daily.\nStory {i} text.\n"
+                f"Updated 2024-05-0{i + 1} by Example Staff",
+            )
+        text = (
+            f"Sign up for the Example Daily.\n{ARTICLE}\n"
+            "Updated 2025-01-02 by Example Staff"
+        )
+        cleaned, removed = strip_noise(text, table.boilerplate("example.com"))
+        self.assertEqual(cleaned, ARTICLE)
+        self.assertEqual(removed, 2)
+        self.assertEqual(table.boilerplate("other.com"), frozenset())
+
+    def test_noise_rules(self):
+        text = (
+            f"{OTHER_ARTICLE} Read more: storm updates.\n"
+            "Photo: Getty Images\nWe use cookies to improve your experience."
+        )
+        self.assertEqual(strip_noise(text), (OTHER_ARTICLE, 3))
+
+    def test_noise_rules_keep_article_sentences(self):
+        for sentence in (
+            "Images released by Reuters show the flooded station.",
+            "Share this week's prices with your neighbours.",
+            "Photos: the best moments of the final, from our photographers.",
+            "Copyright holders sued the startup on Tuesday.",
+        ):
+            self.assertEqual(strip_noise(sentence), (sentence, 0))
+        self.assertEqual(strip_noise("Share on Facebook, X and WhatsApp"), ("", 1))
+        self.assertEqual(strip_noise("(Photo: Jane Doe/Reuters)"), ("", 1))
+        footer = "© 2025 Example Media. All rights reserved."
+        self.assertEqual(strip_noise(footer), ("", 2))
+
+
+class NormalizedLookupMigrationTests(TransactionTestCase):
+    """0010 must stop on case-variant accounts before 0011's unique indexes."""
+
+    before = [("newsmind", "0009_customuser_normalized_lookup_fields")]
+    backfill = [("newsmind", "0010_backfill_normalized_lookup_fields")]
+
+    def setUp(self):
+        MigrationExecutor(connection).migrate(self.before)
+        self.addCleanup(self.migrate_to_latest)
+
+    def migrate_to_latest(self):
+        executor = MigrationExecutor(connection)
+        apps = executor.loader.project_state(self.before).apps
+        apps.get_model("newsmind", "CustomUser").objects.all().delete()
+        executor.loader.build_graph()
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+    def test_case_variant_accounts_stop_the_backfill(self):
+        apps = MigrationExecutor(connection).loader.project_state(self.before).apps
+        OldUser = apps.get_model("newsmind", "CustomUser")
+        alice = OldUser.objects.create(username="Alice", email="a@example.com")
+        other = OldUser.objects.create(username="alice", email="A@example.com ")
+
+        with self.assertRaises(RuntimeError) as ctx:
+            MigrationExecutor(connection).migrate(self.backfill)
+        message = str(ctx.exception)
+        ids = f"user ids {alice.pk}, {other.pk}"
+        self.assertIn(f"username 'alice': {ids}", message)
+        self.assertIn(f"email 'a@example.com': {ids}", message)
+
+
+class FairSchedulerTests(SimpleTestCase):
+    def test_timeout_rolls_back_the_finish_tag(self):
+        sched = FairScheduler(1)
+        sched.acquire("a", cost=100)
+        with self.assertRaises(SchedulerTimeout):
+            sched.acquire("b", cost=100, timeout=0.01)
+        # "b" isn't pushed back for work that never ran, and serving "a"
+        # advanced virtual time only to its start tag
+        self.assertEqual(sched._last_finish["b"], 0.0)
+        self.assertEqual(sched._virtual_time, 0.0)
+        sched.release()
+
+    @override_settings(
+        INFERENCE_BACKEND="remote", HF_MAX_CONCURRENCY=4, HF_WORKER_PROCESSES=4
+    )
+    def test_remote_slots_are_shared_across_workers(self):
+        self.assertEqual(process_slots(), 1)
+        with self.settings(INFERENCE_BACKEND="local"):
+            self.assertEqual(process_slots(), 4)
+
+
+class MicroBatcherTests(SimpleTestCase):
+    def test_batches_group_similar_lengths(self):
+        batcher = MicroBatcher(lambda texts: texts, max_batch_size=2, max_wait_ms=0)
+        for text in ("a" * 10, "b" * 500, "c" * 12, "d" * 480):
+            batcher._queue.append(_Pending(text))
+        # FIFO would pair a with b and pad a to 500 characters
+        batches = [batcher._next_batch(), batcher._next_batch()]
+        self.assertEqual(
+            [[item.text[0] for item in batch] for batch in batches],
+            [["a", "c"], ["b", "d"]],
+        )
+
+
+class SummaryLengthTests(SimpleTestCase):
+    @override_settings(SUMMARY_SHORT_MAX_NEW_TOKENS=24)
+    @mock.patch("newsmind.views_summarize.run_summarization_once")
+    def test_short_reruns_the_final_step_with_a_tighter_budget(self, run):
+        derive_short_summary([["one", "two"], ["final"]], ARTICLE)
+        run.assert_called_once_with("one\n\ntwo", user=None, max_new_tokens=24)
+        # articles that fit in one call: the article itself
+        derive_short_summary([["final"]], ARTICLE)
+        run.assert_called_with(ARTICLE, user=None, max_new_tokens=24)
+
+    @mock.patch("newsmind.views_summarize.run_summarization_once", return_value="s")
+    @mock.patch(
+        "newsmind.views_summarize.chunk_text_by_sentences_and_tokens", return_value=[]
+    )
+    def test_trimmed_fallback_reports_progress(self, chunk, run):
+        events = []
+        summarize_recursive(
+            ARTICLE, max_tokens=4, progress=lambda event, data: events.append(event)
+        )
+        self.assertEqual(events, ["level", "chunk"])
+
+
+@unittest.skipUnless(mongomock, "pip install mongomock to test idempotency keys")
+class IdempotencyTests(SimpleTestCase):
+    def setUp(self):
+        self.col = mongomock.MongoClient()["newssum_mongo"]["idempotency_keys"]
+        patcher = mock.patch("newsmind.idempotency._collection", return_value=self.col)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.calls = 0
+
+    def compute(self):
+        self.calls += 1
+        return Response({"summary": "s", "saved_id": str(self.calls)}, status=201)
+
+    def run_once(self, payload=None):
+        return idempotency.run_once(1, "key-1", payload or {"a": 1}, self.compute)
+
+    def pending_record(self, owner="other-worker"):
+        now = datetime.now(dt_timezone.utc)
+        self.col.insert_one(
+            {
+                "_id": "1:key-1",
+                "fingerprint": idempotency.fingerprint({"a": 1}),
+                "state": "pending",
+                "owner": owner,
+                "created_at": now,
+                "updated_at": now,
+            }
+        )
+
+    def test_repeat_is_replayed(self):
+        first = self.run_once()
+        second = self.run_once()
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(second.status_code, 201)
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(second["Idempotent-Replayed"], "true")
+
+    def test_key_reused_with_another_body(self):
+        self.run_once()
+        self.assertEqual(self.run_once({"a": 2}).status_code, 422)
+        self.assertEqual(self.calls, 1)
+
+    def test_retry_attaches_to_the_running_request(self):
+        self.pending_record()
+
+        def finish():
+            self.col.update_one(
+                {"_id": "1:key-1"},
+                {"$set": {"state": "done", "status_code": 201, "body": {"x": 1}}},
+            )
+
+        threading.Timer(0.2, finish).start()
+        response = self.run_once()
+        self.assertEqual(self.calls, 0)
+        self.assertEqual(response.data, {"x": 1})
+
+    def test_record_released_between_insert_and_read(self):
+        # the first attempt fails and deletes its record just after our insert
+        # ran into it: the key must be claimed again, not run without a record
+        self.pending_record()
+        find_one = self.col.find_one
+        released = []
+
+        def find_after_release(*args, **kwargs):
+            if not released:
+                released.append(self.col.delete_one({"_id": "1:key-1"}))
+            return find_one(*args, **kwargs)
+
+        with mock.patch.object(self.col, "find_one", side_effect=find_after_release):
+            response = self.run_once()
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(self.col.find_one({"_id": "1:key-1"})["state"], "done")
+
+
+class AvatarRetryTests(SimpleTestCase):
+    @override_settings(AVATAR_RETRY_SECONDS=3600)
+    def test_missing_variants_are_retried_at_most_once_an_hour(self):
+        user = mock.Mock(avatar="avatars/1/a.webp", avatar_variants={})
+        user.avatar_queued_at = None
+        self.assertTrue(needs_retry(user))
+        user.avatar_queued_at = datetime.now(dt_timezone.utc)
+        self.assertFalse(needs_retry(user))
+        user.avatar_queued_at -= timedelta(hours=2)
+        self.assertTrue(needs_retry(user))
+        user.avatar_variants = {"64": "avatars/1/a_64.webp"}
+        self.assertFalse(needs_retry(user))
+
+
+class CompressionMiddlewareTests(SimpleTestCase):
+    def compress(self, path):
+        body = {"articles": [ARTICLE] * 5, "access": "header.payload.signature"}
+        middleware = CompressionMiddleware(lambda request: JsonResponse(body))
+        request = RequestFactory().get(path, HTTP_ACCEPT_ENCODING="gzip")
+        return middleware(request)
+
+    def test_news_feed_is_compressed(self):
+        self.assertEqual(self.compress("/api/auth/news/")["Content-Encoding"], "gzip")
+
+    def test_token_responses_are_not_compressed(self):
+        for path in ("/api/auth/login/", "/api/auth/token/refresh/"):
+            self.assertFalse(self.compress(path).has_header("Content-Encoding"))
+
+
+class StreamTracingTests(SimpleTestCase):
+    @override_settings(TRACING_ENABLED=True)
+    @mock.patch("newsmind.tracing.get_exporter")
+    def test_stream_job_spans_are_children_of_the_request(self, get_exporter):
+        def job(emit):
+            with tracing.span("summarize.stream"):
+                emit("level", {"chunks": 1})
+
+        # as TracingMiddleware does: the view builds the stream inside the
+        # request span, the body is consumed after the trace has ended
+        handle = tracing.start_trace(sampled=True)
+        with tracing.span("http.request") as root:
+            stream = event_stream(job, asgi=False)
+        tracing.end_trace(handle)
+        self.assertEqual(len(list(stream)), 1)
+
+        exported = [s for c in get_exporter().export.call_args_list for s in c[0][0]]
+        child = next(s for s in exported if s["name"] == "summarize.stream")
+        self.assertEqual(child["trace_id"], root["trace_id"])
+        self.assertEqual(child["parent_id"], root["span_id"])
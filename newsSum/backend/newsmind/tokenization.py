@@ -0,0 +1,232 @@
+"""
+Token counting for the summarizer, shared across pre-forked workers.
+
+Two ways to run it, picked by TOKENIZER_MODE:
+
+* "local" (default): each process uses an in-memory fast tokenizer. Call
+  `preload()` in the gunicorn master (see gunicorn.conf.py) and workers
+  inherit the loaded tokenizer copy-on-write instead of each paying a cold
+  load of tens of MB on their first summarize request.
+* "sidecar": one `manage.py tokenizer_sidecar` process owns the tokenizer
+  and workers ask it for counts over a Unix socket at TOKENIZER_SOCKET.
+
+`count_tokens()` returns None when no tokenizer is reachable; callers fall
+back to their character heuristic.
+
+This module must stay importable before django.setup() (the gunicorn master
+imports it from its config file), so settings are only read inside functions.
+"""
+
+import gc
+import json
+import logging
+import os
+import socket
+import socketserver
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+HF_MODEL = os.getenv("HF_MODEL", "google/pegasus-xsum")
+FALLBACK_MODEL = "sshleifer/distilbart-cnn-12-6"
+DEFAULT_SOCKET = "/tmp/newsmind-tokenizer.sock"
+
+SAMPLE_TEXTS = (
+    "Markets rallied on Tuesday after the central bank held rates steady.",
+    "The storm made landfall overnight, cutting power to 200,000 homes.",
+    "Officials said the new rail line would open to passengers next spring, "
+    "two years later than first planned and well over its original budget.",
+    "Ünïcödé, emoji 🚀 and punctuation — all tokenized the same way?",
+)
+
+
+def _setting(name, default):
+    from django.conf import settings
+
+    return getattr(settings, name, default)
+
+
+# --- Loading ---
+def load_tokenizer(model: str = HF_MODEL):
+    """Load a fast tokenizer for `model` (or the fallback); None if neither loads."""
+    try:
+        from transformers import AutoTokenizer
+    except Exception:
+        return None
+    for name in (model, FALLBACK_MODEL):
+        try:
+            return AutoTokenizer.from_pretrained(name, use_fast=True)
+        except Exception:
+            logger.debug("Could not load tokenizer %s", name, exc_info=True)
+    return None
+
+
+_tokenizer = None
+_tokenizer_loaded = False
+_load_lock = threading.Lock()
+# held around encode() if the thread-safety check failed for this tokenizer
+_encode_lock = None
+
+
+def get_tokenizer():
+    global _tokenizer, _tokenizer_loaded
+    if _tokenizer_loaded:
+        return _tokenizer
+    with _load_lock:
+        if not _tokenizer_loaded:
+            _tokenizer = load_tokenizer()
+            # remember failures too, so a missing model isn't retried on every call
+            _tokenizer_loaded = True
+    return _tokenizer
+
+
+def check_thread_safety(tokenizer, threads: int = 8, rounds: int = 50) -> bool:
+    """
+    Encode the sample texts from `threads` threads at once and compare with a
+    serial run. Fast (Rust) tokenizers release the GIL while encoding, so this
+    is a real concurrency check, not just a smoke test.
+    """
+    texts = list(SAMPLE_TEXTS) * rounds
+    expected = [tokenizer.encode(t, add_special_tokens=False) for t in texts]
+    try:
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            got = list(
+                pool.map(lambda t: tokenizer.encode(t, add_special_tokens=False), texts)
+            )
+    except Exception:
+        logger.warning("Tokenizer raised under concurrent use", exc_info=True)
+        return False
+    return got == expected
+
+
+def preload() -> bool:
+    """
+    Load the tokenizer in the current (master) process before workers fork.
+    Returns True if a tokenizer was loaded.
+    """
+    global _encode_lock
+    # the Rust tokenizer's own thread pool doesn't survive fork(); keep it off
+    # so children don't deadlock or print the "process just got forked" warning
+    os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
+    tokenizer = get_tokenizer()
+    if tokenizer is None:
+        return False
+    if not check_thread_safety(tokenizer):
+        logger.warning("Tokenizer is not thread safe here; serializing encode()")
+        _encode_lock = threading.Lock()
+    # move everything loaded so far out of the GC's reach: collections in the
+    # workers would otherwise write to these objects and un-share their pages
+    gc.collect()
+    gc.freeze()
+    return True
+
+
+def _count_local(text: str):
+    tokenizer = get_tokenizer()
+    if tokenizer is None:
+        return None
+    if _encode_lock is not None:
+        with _encode_lock:
+            return len(tokenizer.encode(text, add_special_tokens=False))
+    return len(tokenizer.encode(text, add_special_tokens=False))
+
+
+# --- Sidecar ---
+# Protocol: one JSON object per line each way.
+#   -> {"texts": ["...", ...]}
+#   <- {"counts": [12, ...]}            or {"error": "..."}
+class _SidecarHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            try:
+                texts = json.loads(line)["texts"]
+                reply = {"counts": [_count_local(t) for t in texts]}
+            except Exception as e:
+                reply = {"error": str(e)}
+            self.wfile.write(json.dumps(reply).encode() + b"\n")
+            self.wfile.flush()
+
+
+class SidecarServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def serve(path: str = DEFAULT_SOCKET):
+    """Run the tokenizer sidecar on a Unix socket until interrupted."""
+    if not preload():
+        raise RuntimeError("No tokenizer could be loaded for the sidecar.")
+    if os.path.exists(path):
+        os.unlink(path)
+    with SidecarServer(path, _SidecarHandler) as server:
+        os.chmod(path, 0o660)
+        try:
+            server.serve_forever()
+        finally:
+            os.unlink(path)
+
+
+class SidecarClient:
+    """One connection per thread to the sidecar, reconnecting once on failure."""
+
+    def __init__(self, path: str, timeout: float = 5.0):
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            sock.connect(self.path)
+            conn = self._local.conn = (sock, sock.makefile("rb"))
+        return conn
+
+    def _close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn[1].close()
+            conn[0].close()
+            self._local.conn = None
+
+    def count(self, texts):
+        payload = json.dumps({"texts": list(texts)}).encode() + b"\n"
+        for attempt in (1, 2):
+            try:
+                sock, reader = self._conn()
+                sock.sendall(payload)
+                line = reader.readline()
+                if not line:
+                    raise ConnectionError("tokenizer sidecar closed the connection")
+                break
+            except OSError:
+                self._close()
+                if attempt == 2:
+                    raise
+        reply = json.loads(line)
+        if "error" in reply:
+            raise RuntimeError(reply["error"])
+        return reply["counts"]
+
+
+_client = None
+
+
+def get_sidecar_client():
+    global _client
+    if _client is None:
+        _client = SidecarClient(_setting("TOKENIZER_SOCKET", DEFAULT_SOCKET))
+    return _client
+
+
+# --- Counting ---
+def count_tokens(text: str):
+    """Token count for `text`, or None if no tokenizer is available."""
+    try:
+        if _setting("TOKENIZER_MODE", "local") == "sidecar":
+            return get_sidecar_client().count([text])[0]
+        return _count_local(text)
+    except Exception:
+        logger.debug("Token counting failed", exc_info=True)
+        return None
@@ -0,0 +1,296 @@
+"""
+Lightweight request tracing.
+
+A trace starts per request in TracingMiddleware (continuing an incoming W3C
+`traceparent` or `X-Trace-Id` header). Code wraps interesting work in
+`with span("name", key=value):`; finished spans are buffered per trace and
+handed to the exporter when the request ends:
+
+* TRACING_EXPORT_PATH   append one JSON object per span to a local file
+* TRACING_COLLECTOR_URL POST batches as OTLP/HTTP JSON (e.g. to an
+                        OpenTelemetry collector's /v1/traces) from a
+                        background thread
+
+Only TRACING_SAMPLE_RATE of new traces are recorded. When tracing is off or
+the trace isn't sampled, `span()` costs one ContextVar lookup.
+"""
+
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+_trace = ContextVar("newsmind_trace", default=None)
+_span = ContextVar("newsmind_span", default=None)
+
+
+def _new_id(nbytes: int) -> str:
+    return os.urandom(nbytes).hex()
+
+
+class Trace:
+    __slots__ = ("trace_id", "spans")
+
+    def __init__(self, trace_id):
+        self.trace_id = trace_id
+        self.spans = []
+
+
+# --- Exporters ---
+def _otlp_value(value):
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes: dict) -> list:
+    return [{"key": k, "value": _otlp_value(v)} for k, v in attributes.items()]
+
+
+def to_otlp(spans, service_name: str) -> dict:
+    """Map our span records to an OTLP/HTTP JSON ExportTraceServiceRequest."""
+    otlp_spans = []
+    for s in spans:
+        start_ns = int(s["start"] * 1e9)
+        end_ns = start_ns + int(s.get("duration_ms", 0) * 1e6)
+        # STATUS_CODE_OK / STATUS_CODE_ERROR
+        status = {"code": 1}
+        if s.get("status") == "error":
+            status = {"code": 2, "message": s.get("error", "")}
+        otlp = {
+            "traceId": s["trace_id"],
+            "spanId": s["span_id"],
+            "name": s["name"],
+            # SERVER for the request root span, INTERNAL for the rest
+            "kind": 2 if s["name"] == "http.request" else 1,
+            "startTimeUnixNano": str(start_ns),
+            "endTimeUnixNano": str(end_ns),
+            "attributes": _otlp_attributes(s.get("attributes") or {}),
+            "status": status,
+        }
+        if s.get("parent_id"):
+            otlp["parentSpanId"] = s["parent_id"]
+        otlp_spans.append(otlp)
+    return {
+        "resourceSpans": [
+            {
+                "resource": {
+                    "attributes": _otlp_attributes({"service.name": service_name})
+                },
+                "scopeSpans": [{"scope": {"name": __name__}, "spans": otlp_spans}],
+            }
+        ]
+    }
+
+
+class JSONLExporter:
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, spans):
+        lines = "".join(json.dumps(s, default=str) + "\n" for s in spans)
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as fh:
+                fh.write(lines)
+
+
+class CollectorExporter:
+    """Ships OTLP/HTTP JSON batches to a collector without blocking the request."""
+
+    def __init__(self, url, service_name="newsmind", timeout=2.0):
+        self.url = url
+        self.service_name = service_name
+        self.timeout = timeout
+        self._queue = queue.Queue(maxsize=1000)
+        threading.Thread(
+            target=self._run, name="trace-exporter", daemon=True
+        ).start()
+
+    def export(self, spans):
+        try:
+            self._queue.put_nowait(spans)
+        except queue.Full:
+            pass  # drop rather than slow requests down
+
+    def _run(self):
+        import requests
+
+        session = requests.Session()
+        while True:
+            spans = self._queue.get()
+            try:
+                response = session.post(
+                    self.url,
+                    json=to_otlp(spans, self.service_name),
+                    timeout=self.timeout,
+                )
+                response.raise_for_status()
+            except Exception:
+                logger.debug("Trace export to %s failed", self.url, exc_info=True)
+
+
+_exporter = None
+_exporter_lock = threading.Lock()
+
+
+def get_exporter():
+    global _exporter
+    if _exporter is None:
+        with _exporter_lock:
+            if _exporter is None:
+                url = getattr(settings, "TRACING_COLLECTOR_URL", "")
+                if url:
+                    _exporter = CollectorExporter(
+                        url, getattr(settings, "TRACING_SERVICE_NAME", "newsmind")
+                    )
+                else:
+                    _exporter = JSONLExporter(
+                        getattr(settings, "TRACING_EXPORT_PATH", "traces.jsonl")
+                    )
+    return _exporter
+
+
+# --- Trace lifecycle ---
+_HEX = frozenset("0123456789abcdef")
+
+
+def _valid_id(value: str, length: int) -> bool:
+    """Lowercase hex of `length` characters, not all zeros (W3C rules)."""
+    return len(value) == length and set(value) <= _HEX and value != "0" * length
+
+
+def parse_trace_id(value: str):
+    """Return an incoming X-Trace-Id if it is a valid trace id, else None."""
+    value = (value or "").strip()
+    return value if _valid_id(value, 32) else None
+
+
+def parse_traceparent(value: str):
+    """Return (trace_id, parent_span_id, sampled) from a W3C traceparent, or None."""
+    parts = (value or "").strip().split("-")
+    if (
+        len(parts) != 4
+        or not _valid_id(parts[1], 32)
+        or not _valid_id(parts[2], 16)
+        or len(parts[3]) != 2
+        or not set(parts[3]) <= _HEX
+    ):
+        return None
+    return parts[1], parts[2], bool(int(parts[3], 16) & 1)
+
+
+def start_trace(trace_id=None, parent_id=None, sampled=None):
+    """
+    Begin a trace in the current context. Returns (trace, tokens) for
+    end_trace, or None when tracing is disabled or the trace isn't sampled.
+    """
+    if not getattr(settings, "TRACING_ENABLED", False):
+        return None
+    if sampled is None:
+        sampled = random.random() < getattr(settings, "TRACING_SAMPLE_RATE", 1.0)
+    if not sampled:
+        return None
+    trace = Trace(trace_id or _new_id(16))
+    return trace, (_trace.set(trace), _span.set(parent_id))
+
+
+_flush_lock = threading.Lock()
+
+
+def _flush(trace):
+    with _flush_lock:
+        spans, trace.spans = trace.spans, []
+    if spans:
+        try:
+            get_exporter().export(spans)
+        except Exception:
+            logger.exception("Trace export failed")
+
+
+def end_trace(handle):
+    if handle is None:
+        return
+    trace, (trace_token, span_token) = handle
+    _trace.reset(trace_token)
+    _span.reset(span_token)
+    _flush(trace)
+
+
+def flush_current_trace():
+    """
+    Export spans the current trace gained after end_trace(), e.g. from a
+    streaming job that outlives the request (see sse.py).
+    """
+    trace = _trace.get()
+    if trace is not None:
+        _flush(trace)
+
+
+def current_trace_id():
+    trace = _trace.get()
+    return trace.trace_id if trace is not None else None
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """Record `name` as a child of the current span (no-op when not tracing)."""
+    trace = _trace.get()
+    if trace is None:
+        yield None
+        return
+
+    span_id = _new_id(8)
+    record = {
+        "trace_id": trace.trace_id,
+        "span_id": span_id,
+        "parent_id": _span.get(),
+        "name": name,
+        "start": time.time(),
+        "attributes": attributes,
+        "status": "ok",
+    }
+    token = _span.set(span_id)
+    started = time.perf_counter()
+    try:
+        yield record
+    except BaseException as e:
+        record["status"] = "error"
+        record["error"] = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        record["duration_ms"] = round((time.perf_counter() - started) * 1000, 3)
+        _span.reset(token)
+        trace.spans.append(record)
+
+
+def record_span(name: str, duration_s: float, status: str = "ok", **attributes):
+    """Record an already finished operation (e.g. from a driver callback)."""
+    trace = _trace.get()
+    if trace is None:
+        return
+    trace.spans.append(
+        {
+            "trace_id": trace.trace_id,
+            "span_id": _new_id(8),
+            "parent_id": _span.get(),
+            "name": name,
+            "start": time.time() - duration_s,
+            "duration_ms": round(duration_s * 1000, 3),
+            "attributes": attributes,
+            "status": status,
+        }
+    )
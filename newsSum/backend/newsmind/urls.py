@@ -3,9 +3,16 @@ from .views import (
     SignupAPIView,
     LoginAPIView,
     ProfileDetail,
+    MetricsAPIView,
 )
 from .views_news import WorldNewsProxyAPIView
-from .views_summarize import SummarizeAPIView
+from .views_summarize import (
+    RelatedSummariesAPIView,
+    SummarizeAPIView,
+    SummarizeBatchAPIView,
+    SummarizeStreamAPIView,
+    SummarizeUsageAPIView,
+)
 
 urlpatterns = [
     path("signup/", SignupAPIView.as_view(), name="signup"),
@@ -13,4 +20,21 @@ urlpatterns = [
     path("profile/", ProfileDetail.as_view(), name="profile-detail"),
     path("news/", WorldNewsProxyAPIView.as_view(), name="news-proxy"),
     path("summarize/", SummarizeAPIView.as_view(), name="summarize"),
+    path(
+        "summarize/batch/",
+        SummarizeBatchAPIView.as_view(),
+        name="summarize-batch",
+    ),
+    path(
+        "summarize/stream/",
+        SummarizeStreamAPIView.as_view(),
+        name="summarize-stream",
+    ),
+    path(
+        "summarize/related/",
+        RelatedSummariesAPIView.as_view(),
+        name="summarize-related",
+    ),
+    path("usage/", SummarizeUsageAPIView.as_view(), name="summarize-usage"),
+    path("metrics/", MetricsAPIView.as_view(), name="metrics"),
 ]
@@ -0,0 +1,80 @@
+"""
+Bounded TTL cache of authenticated users, keyed on user id.
+
+JWTs are valid for 30 days and the user row rarely changes, so the
+per-request user lookup is served from here. Entries are dropped by the
+post_save/post_delete receivers in signals.py; the TTL bounds staleness in
+the other worker processes (and after queryset .update() calls, which don't
+send signals).
+"""
+
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+from . import metrics
+
+DEFAULT_TTL = 60
+DEFAULT_MAX_SIZE = 1024
+
+
+class UserCache:
+    def __init__(self, ttl: float, max_size: int):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    # token claims carry the id as a string, signals as the int pk
+    def get(self, user_id):
+        user_id = str(user_id)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(user_id)
+            if entry is not None and entry[0] > now:
+                self._data.move_to_end(user_id)
+                metrics.incr("user_cache.hit")
+                # hand out a copy so views mutating request.user don't leak
+                # changes into other requests
+                return copy.copy(entry[1])
+            if entry is not None:
+                del self._data[user_id]
+                metrics.incr("user_cache.expired")
+        metrics.incr("user_cache.miss")
+        return None
+
+    def set(self, user_id, user):
+        if self.ttl <= 0 or self.max_size <= 0:
+            return
+        user_id = str(user_id)
+        with self._lock:
+            self._data[user_id] = (time.monotonic() + self.ttl, copy.copy(user))
+            self._data.move_to_end(user_id)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                metrics.incr("user_cache.evicted")
+
+    def invalidate(self, user_id):
+        with self._lock:
+            if self._data.pop(str(user_id), None) is not None:
+                metrics.incr("user_cache.invalidated")
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+user_cache = UserCache(
+    ttl=getattr(settings, "USER_CACHE_TTL", DEFAULT_TTL),
+    max_size=getattr(settings, "USER_CACHE_MAX_SIZE", DEFAULT_MAX_SIZE),
+)
+
+
+def hit_rate() -> float:
+    return metrics.ratio("user_cache.hit", ("user_cache.hit", "user_cache.miss"))
@@ -0,0 +1,210 @@
+"""
+Hashed TF-IDF vectors and an in-memory cosine top-k index.
+
+Text is split into word unigrams and bigrams, hashed (crc32) into `dim`
+buckets and stored as sublinear term frequencies in one float32 matrix.
+IDF weights come from the index's own document frequencies and are applied
+at query time, so adding or removing a row never requires re-embedding the
+others.
+
+Above `ivf_min_items` rows the index partitions itself with spherical
+k-means (IVF) and a query only scores the rows in the `nprobe` partitions
+closest to it. Below that every row is scored, which is a single
+matrix-vector product.
+
+No Django imports here, so benchmarks can use it directly.
+"""
+
+import re
+import threading
+import zlib
+
+import numpy as np
+
+DEFAULT_DIM = 512
+DEFAULT_IVF_MIN_ITEMS = 20000
+DEFAULT_NPROBE = 8
+
+_token_re = re.compile(r"[a-z0-9]+")
+
+STOPWORDS = frozenset(
+    """
+    a an and are as at be been but by for from has have he her his i in is it
+    its of on or our she that the their them they this to was we were which
+    who will with would you your said says after over than into about more
+    """.split()
+)
+
+
+def features(text: str):
+    words = [
+        w for w in _token_re.findall((text or "").lower())
+        if len(w) > 1 and w not in STOPWORDS
+    ]
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+def embed(text: str, dim: int = DEFAULT_DIM) -> np.ndarray:
+    """Sublinear term-frequency vector of `text` in `dim` hashed buckets."""
+    buckets = [zlib.crc32(f.encode()) % dim for f in features(text)]
+    counts = np.bincount(np.asarray(buckets, dtype=np.int64), minlength=dim)
+    return np.log1p(counts[:dim]).astype(np.float32)
+
+
+class VectorIndex:
+    def __init__(
+        self,
+        dim: int = DEFAULT_DIM,
+        ivf_min_items: int = DEFAULT_IVF_MIN_ITEMS,
+        nprobe: int = DEFAULT_NPROBE,
+    ):
+        self.dim = dim
+        self.ivf_min_items = ivf_min_items
+        self.nprobe = nprobe
+        self.ids = []
+        self._rows = {}
+        self._tf = np.zeros((16, dim), dtype=np.float32)
+        self._df = np.zeros(dim, dtype=np.float64)
+        self._norms = None  # cached weighted row norms, dropped on any change
+        self._centroids = None
+        self._assign = np.zeros(16, dtype=np.int32)
+        self._built_for = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, item_id):
+        return item_id in self._rows
+
+    # --- Updates ---
+    def add(self, item_id, vector: np.ndarray):
+        with self._lock:
+            if item_id in self._rows:
+                self._remove(item_id)
+            n = len(self.ids)
+            if n == len(self._tf):
+                self._tf = np.resize(self._tf, (2 * n, self.dim))
+                self._assign = np.resize(self._assign, 2 * n)
+            self._tf[n] = vector
+            self._df += vector > 0
+            self.ids.append(item_id)
+            self._rows[item_id] = n
+            if self._centroids is not None:
+                self._assign[n] = self._nearest_partition(vector)
+            self._norms = None
+
+    def remove(self, item_id) -> bool:
+        with self._lock:
+            if item_id not in self._rows:
+                return False
+            self._remove(item_id)
+            return True
+
+    def _remove(self, item_id):
+        # swap the last row into the hole so the matrix stays dense
+        row = self._rows.pop(item_id)
+        last = len(self.ids) - 1
+        self._df -= self._tf[row] > 0
+        if row != last:
+            moved = self.ids[last]
+            self._tf[row] = self._tf[last]
+            self._assign[row] = self._assign[last]
+            self.ids[row] = moved
+            self._rows[moved] = row
+        self.ids.pop()
+        self._norms = None
+
+    # --- Scoring ---
+    def _idf(self):
+        n = len(self.ids)
+        return (np.log((1 + n) / (1 + self._df)) + 1).astype(np.float32)
+
+    def _row_norms(self, rows, weights_sq, block: int = 4096):
+        # in blocks: squaring the whole matrix at once allocates a copy of it
+        tf = self._tf[rows]
+        out = np.empty(len(tf), dtype=np.float32)
+        for start in range(0, len(tf), block):
+            chunk = tf[start : start + block]
+            out[start : start + block] = np.square(chunk) @ weights_sq
+        return np.sqrt(out, out=out)
+
+    def search(self, vector: np.ndarray, k: int = 5, exclude=None):
+        """Return up to `k` (item_id, cosine) pairs, best first."""
+        with self._lock:
+            n = len(self.ids)
+            if n == 0:
+                return []
+            idf = self._idf()
+            query = vector * idf
+            query_norm = float(np.linalg.norm(query))
+            if query_norm == 0:
+                return []
+            weights_sq = idf * idf
+
+            if n >= self.ivf_min_items:
+                if self._centroids is None or n > 2 * self._built_for:
+                    self._build_partitions(idf)
+                rows = self._probe(query / query_norm)
+                norms = self._row_norms(rows, weights_sq)
+            else:
+                rows = slice(0, n)
+                if self._norms is None:
+                    self._norms = self._row_norms(rows, weights_sq)
+                norms = self._norms
+
+            scores = (self._tf[rows] @ (query * idf)) / (
+                np.maximum(norms, 1e-12) * query_norm
+            )
+            row_ids = np.arange(n)[rows]
+
+            want = min(k + (1 if exclude is not None else 0), len(scores))
+            if want <= 0:
+                return []
+            top = np.argpartition(-scores, want - 1)[:want]
+            top = top[np.argsort(-scores[top])]
+            results = []
+            for i in top:
+                item_id = self.ids[row_ids[i]]
+                if item_id != exclude:
+                    results.append((item_id, float(scores[i])))
+            return results[:k]
+
+    # --- IVF partitions ---
+    def _weighted_unit_rows(self, rows, idf):
+        x = self._tf[rows] * idf
+        x /= np.maximum(np.linalg.norm(x, axis=1, keepdims=True), 1e-12)
+        return x
+
+    def _build_partitions(self, idf, iterations: int = 8, sample: int = 20000):
+        n = len(self.ids)
+        nlist = int(min(1024, n, max(8, np.sqrt(n))))
+        rng = np.random.default_rng(0)
+        train_rows = rng.choice(n, size=min(n, sample), replace=False)
+        train = self._weighted_unit_rows(train_rows, idf)
+        centroids = train[rng.choice(len(train), size=nlist, replace=False)]
+        for _ in range(iterations):
+            assign = np.argmax(train @ centroids.T, axis=1)
+            for c in range(nlist):
+                members = train[assign == c]
+                if len(members):
+                    centroids[c] = members.sum(axis=0)
+            centroids /= np.maximum(
+                np.linalg.norm(centroids, axis=1, keepdims=True), 1e-12
+            )
+        self._centroids = centroids
+        for start in range(0, n, 8192):
+            rows = np.arange(start, min(n, start + 8192))
+            x = self._weighted_unit_rows(rows, idf)
+            self._assign[rows] = np.argmax(x @ centroids.T, axis=1)
+        self._built_for = n
+
+    def _nearest_partition(self, vector):
+        return int(np.argmax(self._centroids @ (vector * self._idf())))
+
+    def _probe(self, unit_query):
+        nprobe = min(self.nprobe, len(self._centroids))
+        closest = np.argpartition(-(self._centroids @ unit_query), nprobe - 1)
+        return np.flatnonzero(
+            np.isin(self._assign[: len(self.ids)], closest[:nprobe])
+        )
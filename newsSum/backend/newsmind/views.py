@@ -6,6 +6,16 @@ from django.contrib.auth import get_user_model
 from django.contrib.auth import authenticate
 from rest_framework_simplejwt.tokens import RefreshToken
 from django.shortcuts import get_object_or_404
+from . import metrics
+from .models import normalize_email_key
+from .user_cache import user_cache, hit_rate
+from .avatars import (
+    delete_files,
+    remove_avatar,
+    needs_retry,
+    schedule_avatar_processing,
+    store_stripped_avatar,
+)
 
 User = get_user_model()
 
@@ -31,7 +41,7 @@ class LoginAPIView(APIView):
             )
 
         try:
-            user = User.objects.get(email__iexact=email)
+            user = User.objects.get(email_normalized=normalize_email_key(email))
         except User.DoesNotExist:
             return Response(
                 {"detail": "Invalid credentials."}, status=status.HTTP_401_UNAUTHORIZED
@@ -101,32 +111,77 @@ class ProfileDetail(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request):
-        serializer = UserProfileSerializer(request.user, context={"request": request})
+        user = request.user
+        if needs_retry(user):
+            # variant job lost (worker restart) or failed: try again, at most
+            # once per AVATAR_RETRY_SECONDS
+            schedule_avatar_processing(user)
+        serializer = UserProfileSerializer(user, context={"request": request})
         return Response(serializer.data)
 
     def patch(self, request):
         user = request.user
 
         # Support explicit avatar removal flag (frontend: remove_avatar=true)
-        remove_avatar = request.data.get("remove_avatar")
-        if remove_avatar in ["1", "true", "True", True]:
-            if user.avatar:
-                user.avatar.delete(save=True)
+        remove_avatar_flag = request.data.get("remove_avatar")
+        if remove_avatar_flag in ["1", "true", "True", True]:
+            if user.avatar or user.avatar_variants:
+                remove_avatar(user)
 
         serializer = UserProfileSerializer(
             user, data=request.data, partial=True, context={"request": request}
         )
         if serializer.is_valid():
-            serializer.save()
+            new_upload = "avatar" in request.FILES
+            stale = []
+            if new_upload:
+                # strip metadata now: the raw upload is never written to
+                # storage, so it can't be served with its EXIF/GPS data
+                try:
+                    full_name, image = store_stripped_avatar(
+                        serializer.validated_data.pop("avatar"), user.pk
+                    )
+                except Exception:
+                    return Response(
+                        {"avatar": ["Could not process this image."]},
+                        status=status.HTTP_400_BAD_REQUEST,
+                    )
+                # the old variants would otherwise keep showing the old image
+                stale = [user.avatar.name if user.avatar else None]
+                stale += list((user.avatar_variants or {}).values())
+                stale = [name for name in stale if name != full_name]
+                user.avatar.name = full_name
+                user.avatar_variants = {}
+            user = serializer.save()
+            if new_upload:
+                delete_files(stale)
+                # variants from the decoded upload, off the request thread
+                schedule_avatar_processing(user, image)
             return Response(serializer.data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
     def delete(self, request):
         user = request.user
         # if want to remove media file before deletion
-        if user.avatar:
-            user.avatar.delete(save=False)
+        if user.avatar or user.avatar_variants:
+            remove_avatar(user, save=False)
         user.delete()
         return Response(
             {"detail": "Account deleted."}, status=status.HTTP_204_NO_CONTENT
         )
+
+
+class MetricsAPIView(APIView):
+    """
+    GET: this worker process's in-memory metrics (admin only).
+    """
+
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        data = metrics.snapshot()
+        data["user_cache"] = {
+            "size": len(user_cache),
+            "hit_rate": round(hit_rate(), 4),
+        }
+        return Response(data)
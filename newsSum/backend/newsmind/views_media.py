@@ -0,0 +1,28 @@
+import re
+
+from django.conf import settings
+from django.views.static import serve
+
+# names written by the avatar pipeline: <16 hex chars>[_<size>].webp
+_hashed_name_re = re.compile(r"(^|/)[0-9a-f]{16}(_\d+)?\.\w+$")
+
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+DEFAULT_CACHE = "public, max-age=300"
+
+
+def serve_media(request, path):
+    """
+    Serve MEDIA_ROOT files in development (routed only when DEBUG is on;
+    django.views.static.serve is not meant for production). Content-hashed
+    files never change under the same name, so browsers and CDNs may keep
+    them for a year without revalidating.
+
+    In production nginx serves /media/ with the same headers; see
+    nginx.conf next to gunicorn.conf.py.
+    """
+    response = serve(request, path, document_root=settings.MEDIA_ROOT)
+    if _hashed_name_re.search(path):
+        response["Cache-Control"] = IMMUTABLE_CACHE
+    else:
+        response["Cache-Control"] = DEFAULT_CACHE
+    return response
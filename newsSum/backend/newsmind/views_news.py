@@ -1,4 +1,10 @@
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from django.conf import settings
 from django.utils import timezone
 from rest_framework.views import APIView
@@ -6,16 +12,210 @@ from rest_framework.response import Response
 from rest_framework import status, permissions
 from django.utils.decorators import method_decorator
 from django.views.decorators.cache import cache_page
-from urllib.parse import urlparse
+
+from pymongo.errors import PyMongoError
+
+from .near_dup import collapse_near_duplicates, DEFAULT_THRESHOLD
+from .news_normalize import (
+    normalize_top_news,
+    dedupe_articles,
+    parse_fields,
+    select_fields,
+)
+from .news_store import ensure_indexes_once, query_articles, upsert_articles
+from .tracing import span
 
 CACHE_SECONDS = 60 * 5  # 5 minutes cache
 
+WORLDNEWS_ENDPOINT = "https://api.worldnewsapi.com/top-news"
+
+# connection pool / retry policy for the WorldNewsAPI session
+HTTP_POOL_SIZE = 10
+HTTP_RETRIES = 3
+HTTP_BACKOFF = 0.5
+HTTP_TIMEOUT = 10
+
+# upper bound on markets fetched in one multi-market request
+MAX_MARKETS = 8
+
+# page sizes when serving from the local article store
+STORE_PAGE_SIZE = 50
+STORE_MAX_PAGE_SIZE = 100
+
+
+# one background writer per process for live articles (see remember())
+_remember_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="news-remember")
+
+
+# --- Helpers: pooled HTTP session ---
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_http_session() -> requests.Session:
+    """
+    Return the process-wide keep-alive session used for WorldNewsAPI calls.
+    Idempotent GETs are retried with exponential backoff on connection errors
+    and on 429/5xx responses (honouring Retry-After).
+    """
+    global _session
+    if _session is not None:
+        return _session
+    with _session_lock:
+        if _session is None:
+            retry = Retry(
+                total=HTTP_RETRIES,
+                backoff_factor=HTTP_BACKOFF,
+                status_forcelist=(429, 500, 502, 503, 504),
+                allowed_methods=frozenset(["GET"]),
+                respect_retry_after_header=True,
+            )
+            adapter = HTTPAdapter(
+                pool_connections=HTTP_POOL_SIZE,
+                pool_maxsize=HTTP_POOL_SIZE,
+                max_retries=retry,
+            )
+            session = requests.Session()
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+    return _session
+
+
+def fetch_top_news(api_key: str, country: str, language: str, date: str) -> dict:
+    """
+    Fetch top news for one country/language pair.
+    Raises requests.RequestException on failure.
+    """
+    params = {
+        "source-country": country,
+        "language": language,
+        "date": date,
+    }
+    headers = {"x-api-key": api_key}
+    with span("worldnews.fetch", country=country, language=language, date=date) as rec:
+        resp = get_http_session().get(
+            getattr(settings, "WORLDNEWS_API_URL", WORLDNEWS_ENDPOINT),
+            params=params,
+            headers=headers,
+            timeout=HTTP_TIMEOUT,
+        )
+        if rec is not None:
+            rec["attributes"]["status_code"] = resp.status_code
+        resp.raise_for_status()
+        return resp.json()
+
+
+def parse_markets(value: str) -> list:
+    """
+    Parse a `markets` query value like "us:en,gb:en,in" into
+    [("us", "en"), ("gb", "en"), ("in", "en")]; language defaults to "en".
+    Duplicate pairs are dropped, order is preserved.
+    """
+    markets = []
+    for part in (value or "").split(","):
+        part = part.strip().lower()
+        if not part:
+            continue
+        country, _, language = part.partition(":")
+        pair = (country.strip(), language.strip() or "en")
+        if pair[0] and pair not in markets:
+            markets.append(pair)
+    return markets
+
+
+def store_articles(articles, country, language):
+    try:
+        ensure_indexes_once()
+        upsert_articles(articles, country, language)
+    except PyMongoError:
+        # clients can still send the full article
+        pass
+
 
 @method_decorator(cache_page(CACHE_SECONDS), name="dispatch")
 class WorldNewsProxyAPIView(APIView):
+    """
+    GET: top news, normalized and deduplicated.
+    Served from the local `articles` store (see `manage.py ingest_news`) when
+    NEWS_FEED_SOURCE is "store"; falls back to a live WorldNewsAPI call when
+    the store has nothing for the request, or always when it is "proxy".
+    Query params:
+      source-country / language  single market (default us / en)
+      markets=us:en,gb:en        several markets merged into one feed
+      date=YYYY-MM-DD            restrict to one publish date
+      fields=id,title,url        per-article fields (default: all but `raw`;
+                                 `all` includes the provider payload)
+      limit / cursor             page size and keyset cursor (store only)
+    """
+
     permission_classes = [permissions.IsAuthenticated]  # keep authentication if desired
 
     def get(self, request):
+        try:
+            fields = parse_fields(request.GET.get("fields", ""))
+        except ValueError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        markets = parse_markets(request.GET.get("markets", ""))
+        if not markets:
+            # allow country/language override but default to us/en
+            country = request.GET.get("source-country", "us")
+            language = request.GET.get("language", "en")
+            markets = [(country, language)]
+        if len(markets) > MAX_MARKETS:
+            return Response(
+                {"detail": f"At most {MAX_MARKETS} markets per request."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        if getattr(settings, "NEWS_FEED_SOURCE", "store") == "store":
+            response = self.get_from_store(request, markets, fields)
+            if response is not None:
+                return response
+        return self.get_from_provider(request, markets, fields)
+
+    def get_from_store(self, request, markets, fields):
+        """
+        Serve one page from the local store, or None when the store has no
+        articles for this (first-page) request so the caller can go live.
+        """
+        try:
+            limit = int(request.GET.get("limit", STORE_PAGE_SIZE))
+        except ValueError:
+            return Response(
+                {"detail": "limit must be an integer."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        limit = max(1, min(limit, STORE_MAX_PAGE_SIZE))
+        cursor = request.GET.get("cursor")
+
+        try:
+            articles, next_cursor = query_articles(
+                markets,
+                limit,
+                cursor=cursor,
+                date=request.GET.get("date"),
+                include_raw="raw" in fields,
+            )
+        except ValueError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except PyMongoError:
+            # store unavailable: the live provider can still answer
+            return None
+        if not articles and not cursor:
+            return None
+
+        articles = self.collapse(articles)
+        return Response(
+            {
+                "total": len(articles),
+                "articles": select_fields(articles, fields),
+                "next_cursor": next_cursor,
+            }
+        )
+
+    def get_from_provider(self, request, markets, fields):
         api_key = getattr(settings, "WORLDNEWS_API_KEY", "")
         if not api_key:
             return Response(
@@ -30,106 +230,72 @@ class WorldNewsProxyAPIView(APIView):
         # You can optionally allow client to override date via query param (for debugging)
         date_param = request.GET.get("date", today)
 
-        # allow country/language override but default to us/en
-        country = request.GET.get("source-country", "us")
-        language = request.GET.get("language", "en")
-
-        endpoint = "https://api.worldnewsapi.com/top-news"
-        params = {
-            "source-country": country,
-            "language": language,
-            "date": date_param,
-        }
-
-        headers = {"x-api-key": api_key}
+        def fetch(market):
+            country, language = market
+            return fetch_top_news(api_key, country, language, date_param)
 
-        try:
-            resp = requests.get(endpoint, params=params, headers=headers, timeout=10)
-            resp.raise_for_status()
-        except requests.RequestException as e:
-            return Response(
-                {"detail": "Failed contacting WorldNewsAPI", "error": str(e)},
-                status=status.HTTP_502_BAD_GATEWAY,
-            )
-
-        data = resp.json()
-
-        # data expected structure: {"top_news":[ {"news":[ {...}, {...} ]}, ... ], "language":"en","country":"us"}
-        top_news = data.get("top_news") or []
         normalized = []
-
-        # flatten and normalize
-        for group in top_news:
-            news_list = group.get("news", []) or []
-            for item in news_list:
-                # fields in provider: id, title, text, summary, url, image, publish_date, author, authors, language, source_country, sentiment
-                art_id = item.get("id") or item.get("url") or item.get("title")[:80]
-                title = item.get("title")
-                # prefer `text` for full content; fallback to `summary`
-                content = item.get("text") or item.get("summary") or ""
-                description = (
-                    item.get("summary") or (content[:300] + "...") if content else ""
+        errors = []
+        if len(markets) == 1:
+            try:
+                articles = normalize_top_news(fetch(markets[0]))
+            except requests.RequestException as e:
+                return Response(
+                    {"detail": "Failed contacting WorldNewsAPI", "error": str(e)},
+                    status=status.HTTP_502_BAD_GATEWAY,
                 )
-                image = item.get("image")
-                publishedAt = None
-                if item.get("publish_date"):
-                    # provider returns 'YYYY-MM-DD HH:MM:SS' — keep as ISO-ish
-                    publishedAt = item.get("publish_date")
-                source_name = None
-                # try parse source from url host if provided
-                url = item.get("url")
-                if url:
+            self.remember(articles, *markets[0])
+            normalized.extend(articles)
+        else:
+            # fan out over the shared session; results are merged in request order
+            with ThreadPoolExecutor(max_workers=len(markets)) as pool:
+                # copy the context so each fetch's span joins this request's trace
+                futures = [
+                    (m, pool.submit(contextvars.copy_context().run, fetch, m))
+                    for m in markets
+                ]
+                for (country, language), future in futures:
                     try:
-                        parsed = urlparse(url)
-                        source_name = parsed.hostname
-                    except Exception:
-                        source_name = None
-                # also fallback to author or source_country
-                if not source_name:
-                    if item.get("author"):
-                        source_name = item.get("author")
-                    else:
-                        source_name = item.get("source_country")
-
-                normalized.append(
-                    {
-                        "id": art_id,
-                        "title": title,
-                        "description": description,
-                        "content": content,
-                        "url": url,
-                        "image": image,
-                        "publishedAt": publishedAt,
-                        "source": source_name,
-                        "raw": item,
-                    }
+                        articles = normalize_top_news(future.result())
+                    except requests.RequestException as e:
+                        errors.append(
+                            {
+                                "source-country": country,
+                                "language": language,
+                                "error": str(e),
+                            }
+                        )
+                        continue
+                    self.remember(articles, country, language)
+                    normalized.extend(articles)
+            if len(errors) == len(markets):
+                return Response(
+                    {"detail": "Failed contacting WorldNewsAPI", "errors": errors},
+                    status=status.HTTP_502_BAD_GATEWAY,
                 )
 
-        # deduplicate by URL and Title
-        seen_urls = set()
-        deduped = []
-        for art in normalized:
-            url = art.get("url")
-            if url:
-                if url in seen_urls:
-                    continue
-                seen_urls.add(url)
-                deduped.append(art)
-            else:
-                deduped.append(art)
-
-        seen_titles = set()
-        final_articles = []
-        for art in deduped:
-            title = (art.get("title") or "").strip().lower()
-            if title in seen_titles:
-                continue
-            seen_titles.add(title)
-            final_articles.append(art)
+        final_articles = self.collapse(dedupe_articles(normalized))
 
-        return Response(
-            {
-                "total": len(final_articles),
-                "articles": final_articles,
-            }
-        )
+        payload = {
+            "total": len(final_articles),
+            "articles": select_fields(final_articles, fields),
+        }
+        if errors:
+            payload["errors"] = errors
+        return Response(payload)
+
+    def remember(self, articles, country, language):
+        """
+        Keep live articles in the store, so /summarize/ can resolve them by
+        id or URL instead of the client uploading them again. The write runs
+        on a background thread; the response doesn't wait for Mongo.
+        """
+        articles = [dict(article) for article in dedupe_articles(articles)]
+        _remember_pool.submit(store_articles, articles, country, language)
+
+    def collapse(self, articles):
+        # collapse syndicated copies; each representative lists its alternates
+        threshold = getattr(settings, "NEWS_NEAR_DUP_THRESHOLD", DEFAULT_THRESHOLD)
+        if threshold > 0:
+            return collapse_near_duplicates(articles, threshold)
+        return articles
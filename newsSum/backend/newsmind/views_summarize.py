@@ -1,12 +1,17 @@
 # backend/newsmind/views_summarize.py
 
+import contextvars
+import hashlib
+import logging
 import os
 import time
 import re
 import math
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import List
 
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from rest_framework.views import APIView
 from rest_framework.response import Response
@@ -14,48 +19,48 @@ from rest_framework import permissions, status
 from rest_framework.parsers import JSONParser
 
 from pymongo import MongoClient
-from huggingface_hub import InferenceClient
+from pymongo.errors import PyMongoError
 
 from bson import ObjectId
 from bson.errors import InvalidId
 
-from django.http import HttpResponse
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, StreamingHttpResponse
 from io import BytesIO
 
-from reportlab.lib.pagesizes import A4
-from reportlab.pdfgen import canvas
-from reportlab.lib.units import inch
-from reportlab.lib.utils import ImageReader
-
-
-# Try to import tokenizer for accurate token counting; if not available, we'll fallback.
-try:
-    from transformers import AutoTokenizer
-
-    TRANSFORMERS_AVAILABLE = True
-except Exception:
-    TRANSFORMERS_AVAILABLE = False
+from . import idempotency, metrics, related, summary_sync
+from .boilerplate import boilerplate_for, source_host, strip_noise
+from .sse import event_stream
+from .batcher import get_batcher
+from .inference import get_backend
+from .news_store import find_articles
+from .tracing import span
+from .tokenization import count_tokens
+from .scheduler import (
+    QuotaExceeded,
+    SchedulerTimeout,
+    check_budget,
+    inference_slot,
+    record_output,
+    usage_report,
+)
+
+
+# reportlab is imported on first use (huggingface_hub, transformers and torch
+# via .inference / .tokenization): this module is loaded by backend/urls.py,
+# so anything imported here is paid by every worker boot and every manage.py
+# command.
 
 User = get_user_model()
+logger = logging.getLogger(__name__)
 
 # ---- CONFIG ----
-HF_API_KEY = os.getenv("HF_API_KEY", "")
-HF_MODEL = os.getenv("HF_MODEL", "google/pegasus-xsum")
-
 MONGO_URI = os.getenv("MONGO_URI", "")
 MONGO_DBNAME = os.getenv("MONGO_DBNAME", "newssum_mongo")
 
 # token threshold for single-shot summarization (you requested 510)
 MAX_TOKENS = int(os.getenv("SUMMARY_MAX_TOKENS", "510"))
 
-# sleep between HF calls (seconds)
-HF_CALL_SLEEP = float(os.getenv("HF_CALL_SLEEP", "0.35"))
-
-# Create HF client
-HF_CLIENT = None
-if HF_API_KEY:
-    HF_CLIENT = InferenceClient(provider="hf-inference", api_key=HF_API_KEY)
-
 
 # --- Helpers: Mongo ---
 def connect_mongo():
@@ -66,7 +71,7 @@ def connect_mongo():
     return client, db
 
 
-# --- Helpers: Text prep (unchanged) ---
+# --- Helpers: Text prep ---
 def prepare_input_text(article: dict) -> str:
     """
     Build a clean input string for Pegasus.
@@ -79,33 +84,56 @@ def prepare_input_text(article: dict) -> str:
     raw_text = (article.get("raw") or {}).get("text", "") or ""
 
     body = content.strip() or raw_text.strip() or desc.strip()
+    if getattr(settings, "BOILERPLATE_STRIPPING", True):
+        body = strip_boilerplate(article, body)
     input_text = f"{title.strip()}\n\n{body.strip()}"
     return input_text.strip()
 
 
-# --- Helpers: Token counting ---
-_tokenizer = None
+# rough size of one summary in tokens, for estimating calls per article
+SUMMARY_TOKENS_ESTIMATE = 64
 
 
-def _get_tokenizer():
-    global _tokenizer
-    if _tokenizer is not None:
-        return _tokenizer
-    if TRANSFORMERS_AVAILABLE:
-        try:
-            # use the model name if possible; fallback to generic 'facebook/bart-large-cnn' tokenizer if model not found locally
-            _tokenizer = AutoTokenizer.from_pretrained(HF_MODEL, use_fast=True)
-            return _tokenizer
-        except Exception:
-            try:
-                _tokenizer = AutoTokenizer.from_pretrained(
-                    "sshleifer/distilbart-cnn-12-6", use_fast=True
-                )
-                return _tokenizer
-            except Exception:
-                _tokenizer = None
-                return None
-    return None
+def estimate_inference_calls(tokens: int, max_tokens: int = MAX_TOKENS) -> int:
+    """How many model calls summarize_recursive needs for `tokens` of input."""
+    calls = 0
+    while tokens > max_tokens:
+        chunks = math.ceil(tokens / max_tokens)
+        calls += chunks
+        tokens = chunks * SUMMARY_TOKENS_ESTIMATE
+    return calls + 1
+
+
+def strip_boilerplate(article: dict, body: str) -> str:
+    """
+    Drop the source's learned boilerplate lines and rule-based noise from
+    `body` (see boilerplate.py), recording what it saved per article.
+    """
+    cleaned, removed = strip_noise(body, boilerplate_for(source_host(article)))
+    metrics.observe("boilerplate.lines_removed", removed)
+    if not removed or not cleaned.strip():
+        # nothing removed, or nothing left: summarize the original
+        metrics.observe("boilerplate.tokens_saved", 0)
+        metrics.observe("boilerplate.calls_avoided", 0)
+        return body
+    # one tokenizer pass: the cleaned text is scaled from the body's count
+    # rather than tokenized again just for the metrics
+    before = estimate_token_count(body)
+    after = math.ceil(before * len(cleaned) / len(body))
+    metrics.observe("boilerplate.tokens_saved", before - after)
+    metrics.observe(
+        "boilerplate.calls_avoided",
+        estimate_inference_calls(before) - estimate_inference_calls(after),
+    )
+    return cleaned
+
+
+# --- Helpers: Token counting ---
+def warm_up():
+    """Load the tokenizer and inference backend now instead of on first use."""
+    get_backend().warm_up()
+    # loads the local tokenizer, or checks the sidecar is reachable
+    return count_tokens("warm up") is not None
 
 
 def estimate_token_count(text: str) -> int:
@@ -116,16 +144,10 @@ def estimate_token_count(text: str) -> int:
     """
     if not text:
         return 0
-    tok = _get_tokenizer()
-    if tok:
-        try:
-            # encode without adding special tokens to estimate raw tokens
-            # fast tokenizers support encode/encode_plus -> we use encode
-            ids = tok.encode(text, add_special_tokens=False)
-            return len(ids)
-        except Exception:
-            # if tokenizer fails for any reason, fallback
-            pass
+    # local tokenizer or the tokenizer sidecar, depending on TOKENIZER_MODE
+    count = count_tokens(text)
+    if count is not None:
+        return count
     # fallback heuristic: average token length 4 chars
     return math.ceil(len(text) / 4)
 
@@ -191,74 +213,324 @@ def chunk_text_by_sentences_and_tokens(
     return chunks
 
 
-# --- HF summarization wrapper (single-shot) ---
-def run_summarization_once(text: str) -> str:
+# --- Summarization wrapper (single-shot) ---
+def run_summarization_once(text: str, user=None, max_new_tokens=None) -> str:
     """
-    Call the HF InferenceClient for one-shot summarization of `text`.
-    Returns the summary string or raises RuntimeError on failure.
+    Summarize `text` in one call to the configured inference backend
+    (see inference.py). The call is counted against `user`'s quota and waits
+    for a fair-share slot (see scheduler.py); pass user=None for system jobs.
+    `max_new_tokens` overrides the backend's generation budget for this call.
+    Returns the summary string or raises RuntimeError on failure
+    (QuotaExceeded / SchedulerTimeout when the user or service is saturated).
     """
-    if HF_CLIENT is None:
-        raise RuntimeError(
-            "Hugging Face Inference client not configured (HF_API_KEY missing)."
-        )
-
-    try:
-        result = HF_CLIENT.summarization(text, model=HF_MODEL)
-    except Exception as e:
-        raise RuntimeError(f"Hugging Face inference error: {e}")
-
-    # normalize result
-    if isinstance(result, list) and len(result) > 0:
-        first = result[0]
-        if isinstance(first, dict):
-            if "summary_text" in first:
-                return first["summary_text"]
-            if "generated_text" in first:
-                return first["generated_text"]
-            # fallback: stringify value fields
-            return str(first)
-        return str(first)
-
-    if isinstance(result, dict):
-        return result.get("summary_text") or result.get("generated_text") or str(result)
-
-    return str(result)
+    backend = get_backend()
+    input_tokens = estimate_token_count(text)
+    with span(
+        "inference.summarize",
+        backend=backend.name,
+        model=backend.model,
+        input_tokens=input_tokens,
+    ):
+        with inference_slot(user, input_tokens):
+            # batches share one generation budget: overrides go on their own
+            batcher = get_batcher(backend) if max_new_tokens is None else None
+            if batcher is not None:
+                summary = batcher.submit(text)
+            else:
+                summary = backend.summarize(text, max_new_tokens=max_new_tokens)
+
+    if user is not None:
+        record_output(user.id, estimate_token_count(summary))
+    return summary
 
 
 # --- Recursive summarization strategy ---
-def summarize_recursive(text: str, max_tokens: int = MAX_TOKENS) -> str:
+def summarize_recursive(
+    text: str,
+    max_tokens: int = MAX_TOKENS,
+    user=None,
+    level: int = 0,
+    progress=None,
+) -> str:
     """
     If text token count <= max_tokens -> one-shot summarize.
     Else -> chunk into sentence-safe pieces each <= max_tokens, summarize each chunk,
             combine chunk-summaries and call summarize_recursive on the combined summary.
     This reduces arbitrarily long text hierarchically.
+    `level` is the recursion depth (0 for the original text).
+    `progress(event, data)`, if given, is called with a "level" event (planned
+    chunk count) when each level starts and a "chunk" event per chunk summary.
     """
     if not text or not text.strip():
         return ""
 
+    with span("summarize.level", level=level, chars=len(text)):
+        return _summarize_level(text, max_tokens, user, level, progress)
+
+
+def _report(progress, event: str, **data):
+    if progress is not None:
+        progress(event, data)
+
+
+def _summarize_level(text: str, max_tokens: int, user, level: int, progress) -> str:
     token_count = estimate_token_count(text)
     # one-shot
     if token_count <= max_tokens:
-        return run_summarization_once(text)
+        _report(progress, "level", level=level, tokens=token_count, chunks=1)
+        summary = run_summarization_once(text, user=user)
+        _report(progress, "chunk", level=level, index=0, total=1, summary=summary)
+        return summary
 
     # else chunk
     chunks = chunk_text_by_sentences_and_tokens(text, max_tokens=max_tokens)
     if not chunks:
         # extreme fallback: trim text to a safe char length
         trimmed = text[: max_tokens * 4]
-        return run_summarization_once(trimmed)
-
+        _report(progress, "level", level=level, tokens=token_count, chunks=1)
+        summary = run_summarization_once(trimmed, user=user)
+        _report(progress, "chunk", level=level, index=0, total=1, summary=summary)
+        return summary
+
+    _report(progress, "level", level=level, tokens=token_count, chunks=len(chunks))
+    backend = get_backend()
+    batcher = get_batcher(backend)
+    total = len(chunks)
     chunk_summaries = []
-    for ch in chunks:
-        # summarize each chunk (safe single-shot)
-        s = run_summarization_once(ch)
-        chunk_summaries.append(s)
-        # polite sleep
-        time.sleep(HF_CALL_SLEEP)
+    if batcher is not None:
+        # submit all chunks at once so the micro-batcher can group them
+        workers = min(len(chunks), batcher.max_batch_size)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(
+                    contextvars.copy_context().run, run_summarization_once, ch, user
+                )
+                for ch in chunks
+            ]
+            for i, future in enumerate(futures):
+                s = future.result()
+                chunk_summaries.append(s)
+                _report(progress, "chunk", level=level, index=i, total=total, summary=s)
+    else:
+        for i, ch in enumerate(chunks):
+            # summarize each chunk (safe single-shot)
+            s = run_summarization_once(ch, user=user)
+            chunk_summaries.append(s)
+            _report(progress, "chunk", level=level, index=i, total=total, summary=s)
+            # polite sleep (remote providers only)
+            if backend.call_delay:
+                time.sleep(backend.call_delay)
 
     combined = "\n\n".join(chunk_summaries).strip()
     # recurse: combined summary likely much smaller
-    return summarize_recursive(combined, max_tokens=max_tokens)
+    return summarize_recursive(
+        combined, max_tokens=max_tokens, user=user, level=level + 1, progress=progress
+    )
+
+
+def quota_error_response(exc) -> Response:
+    """429 for an exhausted user budget, 503 when the shared queue is full."""
+    code = (
+        status.HTTP_429_TOO_MANY_REQUESTS
+        if isinstance(exc, QuotaExceeded)
+        else status.HTTP_503_SERVICE_UNAVAILABLE
+    )
+    response = Response(
+        {"detail": str(exc), "retry_after": exc.retry_after}, status=code
+    )
+    response["Retry-After"] = str(exc.retry_after)
+    return response
+
+
+# --- Article references ---
+# a body with only these keys names an article from the store (filled by
+# ingest_news and by the news proxy) instead of carrying it
+ARTICLE_REF_KEYS = {"article_id", "url"}
+
+
+def is_article_ref(data) -> bool:
+    return isinstance(data, dict) and bool(data) and set(data) <= ARTICLE_REF_KEYS
+
+
+def resolve_articles(items: list) -> list:
+    """`items` with article references replaced by the stored article, or None."""
+    refs = [i for i, item in enumerate(items) if is_article_ref(item)]
+    if not refs:
+        return list(items)
+    resolved = list(items)
+    for i, article in zip(refs, find_articles([items[i] for i in refs])):
+        resolved[i] = article
+    metrics.incr("summarize.article_refs", len(refs))
+    return resolved
+
+
+def resolve_article(data):
+    """(article, None) for a request body, or (None, error Response)."""
+    if not is_article_ref(data):
+        return data, None
+    try:
+        article = resolve_articles([data])[0]
+    except PyMongoError as e:
+        return None, Response(
+            {"detail": "Article store unavailable", "error": str(e)},
+            status=status.HTTP_503_SERVICE_UNAVAILABLE,
+        )
+    if article is None:
+        return None, Response(
+            {"detail": "Article not found; send the full article instead."},
+            status=status.HTTP_404_NOT_FOUND,
+        )
+    return article, None
+
+
+# --- Summary lengths ---
+SUMMARY_LENGTHS = ("short", "medium", "long")
+
+
+def summary_length(request):
+    """The ?length=short|medium|long option (default medium); None if invalid."""
+    length = request.query_params.get("length", "medium")
+    return length if length in SUMMARY_LENGTHS else None
+
+
+class ReductionTree:
+    """
+    `progress` callback for summarize_recursive that keeps every chunk
+    summary per level, so other lengths can be served without a re-run.
+    Events are passed on to `forward`, if given.
+    """
+
+    def __init__(self, forward=None):
+        self.forward = forward
+        self._levels = {}
+
+    def __call__(self, event, data):
+        if event == "chunk":
+            level = self._levels.setdefault(data["level"], [""] * data["total"])
+            level[data["index"]] = data["summary"]
+        if self.forward is not None:
+            self.forward(event, data)
+
+    def levels(self, final: str) -> list:
+        """Chunk summaries per level, the last level being [final]."""
+        levels = [self._levels[k] for k in sorted(self._levels)]
+        if not levels or levels[-1] != [final]:
+            levels.append([final])
+        return levels
+
+
+def stored_variant(doc: dict, length: str):
+    """
+    The `length` variant of a saved summary from its stored reduction tree,
+    or None when it has to be derived (short, not computed yet).
+
+    medium is the final summary; long is the level below it, i.e. the chunk
+    summaries the final one was made from (the same as medium for articles
+    that fit in one call, and for summaries saved before trees were kept).
+    short is the final call re-run with a tighter budget (derive_short_summary).
+    """
+    if length == "medium":
+        return doc.get("summary")
+    if length == "long":
+        levels = doc.get("levels") or []
+        if len(levels) > 1:
+            return "\n\n".join(levels[-2])
+        return doc.get("summary")
+    return (doc.get("variants") or {}).get(length)
+
+
+def derive_short_summary(levels: list, input_text: str, user=None) -> str:
+    """
+    One extra call: the final reduction step again, on the same input (the
+    chunk summaries below the final level, or the article itself when it fit
+    in one call), with SUMMARY_SHORT_MAX_NEW_TOKENS instead of the backend's
+    budget.
+    """
+    source = "\n\n".join(levels[-2]) if len(levels) > 1 else input_text
+    return run_summarization_once(
+        source,
+        user=user,
+        max_new_tokens=getattr(settings, "SUMMARY_SHORT_MAX_NEW_TOKENS", 40),
+    )
+
+
+def resolve_variant(collection, doc: dict, length: str, user=None) -> str:
+    """stored_variant(), deriving and storing the short one when missing."""
+    text = stored_variant(doc, length)
+    if text is None:
+        text = derive_short_summary(
+            doc.get("levels") or [],
+            prepare_input_text(doc.get("article") or {}),
+            user=user,
+        )
+        collection.update_one(
+            {"_id": doc["_id"]}, {"$set": {f"variants.{length}": text}}
+        )
+    return text
+
+
+# --- Helpers: Saving ---
+def summary_document(
+    user, article: dict, generated_summary: str, levels=None, variants=None
+) -> dict:
+    """
+    The document a summary is saved as. `levels` is the reduction tree
+    (ReductionTree.levels) and `variants` any other lengths already computed.
+    """
+    doc = {
+        "user_id": user.id,
+        "created_at": datetime.utcnow(),
+        "article": article,
+        "summary": generated_summary,
+        "title": article.get("title"),
+        "url": article.get("url"),
+        "image": article.get("image"),
+        "publishedAt": article.get("publishedAt"),
+        "source": article.get("source"),
+    }
+    if levels:
+        doc["levels"] = levels
+    if variants:
+        doc["variants"] = variants
+    return doc
+
+
+def save_summaries(user, docs: list):
+    """
+    Store summary documents in the user's collection with one insert;
+    returns (saved_ids, collection) with ids in the order of `docs`.
+    """
+    try:
+        client, db = connect_mongo()
+        coll_name = getattr(user, "mongo_collection_name", None)
+        if not coll_name:
+            coll_name = f"user_{user.id}_summaries"
+            user.mongo_collection_name = coll_name
+            user.save(update_fields=["mongo_collection_name"])
+
+        res = db[coll_name].insert_many(docs)
+        saved_ids = [str(oid) for oid in res.inserted_ids]
+    finally:
+        try:
+            client.close()
+        except Exception:
+            pass
+
+    for saved_id, doc in zip(saved_ids, docs):
+        try:
+            related.on_summary_saved(user, saved_id, doc)
+        except Exception:
+            logger.warning("Related index update failed", exc_info=True)
+    return saved_ids, coll_name
+
+
+def save_summary(
+    user, article: dict, generated_summary: str, levels=None, variants=None
+):
+    """Store a summary in the user's collection; returns (saved_id, collection)."""
+    doc = summary_document(user, article, generated_summary, levels, variants)
+    saved_ids, coll_name = save_summaries(user, [doc])
+    return saved_ids[0], coll_name
 
 
 # --- API View ---
@@ -269,11 +541,21 @@ class SummarizeAPIView(APIView):
     def post(self, request):
         user = request.user
         article = request.data
+        length = summary_length(request)
+        if length is None:
+            return Response(
+                {"detail": "length must be one of short, medium, long."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
 
         if not article:
             return Response(
                 {"detail": "Missing article data."}, status=status.HTTP_400_BAD_REQUEST
             )
+        # {"article_id": ...} or {"url": ...}: look the article up server-side
+        article, error = resolve_article(article)
+        if error is not None:
+            return error
 
         # prepare input (title + body)
         input_text = prepare_input_text(article)
@@ -283,8 +565,33 @@ class SummarizeAPIView(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
+        # retries after a network timeout replay the first response instead
+        # of summarizing and inserting again
+        key = request.headers.get(idempotency.HEADER)
+        if key is None:
+            return self._summarize_and_save(user, article, input_text, length)
+        return idempotency.run_once(
+            user.id,
+            key,
+            {"article": article, "length": length},
+            lambda: self._summarize_and_save(user, article, input_text, length),
+        )
+
+    def _summarize_and_save(self, user, article, input_text, length):
+        tree = ReductionTree()
+        variants = {}
         try:
-            generated_summary = summarize_recursive(input_text, max_tokens=MAX_TOKENS)
+            check_budget(user.id)
+            with span("summarize.view", user_id=user.id, chars=len(input_text)):
+                generated_summary = summarize_recursive(
+                    input_text, max_tokens=MAX_TOKENS, user=user, progress=tree
+                )
+                if length == "short":
+                    variants["short"] = derive_short_summary(
+                        tree.levels(generated_summary), input_text, user
+                    )
+        except (QuotaExceeded, SchedulerTimeout) as e:
+            return quota_error_response(e)
         except RuntimeError as e:
             return Response(
                 {"detail": "AI summarization failed", "error": str(e)},
@@ -296,43 +603,22 @@ class SummarizeAPIView(APIView):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
 
-        # Save to MongoDB (unchanged)
         try:
-            client, db = connect_mongo()
-            coll_name = getattr(user, "mongo_collection_name", None)
-            if not coll_name:
-                coll_name = f"user_{user.id}_summaries"
-                user.mongo_collection_name = coll_name
-                user.save(update_fields=["mongo_collection_name"])
-
-            col = db[coll_name]
-            doc = {
-                "user_id": user.id,
-                "created_at": datetime.utcnow(),
-                "article": article,
-                "summary": generated_summary,
-                "title": article.get("title"),
-                "url": article.get("url"),
-                "image": article.get("image"),
-                "publishedAt": article.get("publishedAt"),
-                "source": article.get("source"),
-            }
-            res = col.insert_one(doc)
-            saved_id = str(res.inserted_id)
+            levels = tree.levels(generated_summary)
+            saved_id, coll_name = save_summary(
+                user, article, generated_summary, levels=levels, variants=variants
+            )
         except Exception as e:
             return Response(
                 {"detail": "Failed to save summary", "error": str(e)},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
-        finally:
-            try:
-                client.close()
-            except Exception:
-                pass
 
+        doc = {"summary": generated_summary, "levels": levels, "variants": variants}
         return Response(
             {
-                "summary": generated_summary,
+                "summary": stored_variant(doc, length),
+                "length": length,
                 "saved_id": saved_id,
                 "saved_collection": coll_name,
             },
@@ -340,33 +626,408 @@ class SummarizeAPIView(APIView):
         )
 
 
+def _batch_error(exc) -> dict:
+    """Per-article error entry for a failed summarization, like /summarize/'s."""
+    if isinstance(exc, (QuotaExceeded, SchedulerTimeout)):
+        code = 429 if isinstance(exc, QuotaExceeded) else 503
+        return {"status": code, "detail": str(exc), "retry_after": exc.retry_after}
+    if isinstance(exc, RuntimeError):
+        return {"status": 502, "detail": "AI summarization failed", "error": str(exc)}
+    return {"status": 500, "detail": "Summarization error", "error": str(exc)}
+
+
+class SummarizeBatchAPIView(APIView):
+    """
+    POST {"articles": [...]} to summarize a feed page in one round trip
+    (at most SUMMARIZE_BATCH_MAX_ITEMS articles; ?length= as for /summarize/).
+    Items can be full articles or {"article_id"} / {"url"} references.
+
+    Articles with the same text are summarized once. The rest run
+    concurrently (SUMMARIZE_BATCH_CONCURRENCY) through the same quota and
+    fair-share scheduler as single requests, and all summaries are saved with
+    one insert_many. Answers 200 with one result per article, in order:
+    {index, status: 201, summary, length, saved_id, saved_collection
+    [, duplicate_of]} or {index, status, detail[, error, retry_after]}.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+    parser_classes = [JSONParser]
+
+    def post(self, request):
+        user = request.user
+        length = summary_length(request)
+        if length is None:
+            return Response(
+                {"detail": "length must be one of short, medium, long."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        articles = (
+            request.data.get("articles") if isinstance(request.data, dict) else None
+        )
+        if not isinstance(articles, list) or not articles:
+            return Response(
+                {"detail": "Expected a non-empty `articles` list."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        max_items = getattr(settings, "SUMMARIZE_BATCH_MAX_ITEMS", 20)
+        if len(articles) > max_items:
+            return Response(
+                {"detail": f"At most {max_items} articles per batch."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        try:
+            check_budget(user.id)
+        except QuotaExceeded as e:
+            return quota_error_response(e)
+        try:
+            articles = resolve_articles(articles)
+        except PyMongoError as e:
+            return Response(
+                {"detail": "Article store unavailable", "error": str(e)},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+            )
+
+        results = [{"index": i} for i in range(len(articles))]
+        groups = {}  # content hash -> indexes of the articles with that text
+        inputs = {}
+        for i, article in enumerate(articles):
+            if article is None:
+                results[i].update(
+                    status=404,
+                    detail="Article not found; send the full article instead.",
+                )
+                continue
+            text = prepare_input_text(article) if isinstance(article, dict) else ""
+            if not text:
+                results[i].update(
+                    status=400, detail="Article contains no text to summarize."
+                )
+                continue
+            digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+            groups.setdefault(digest, []).append(i)
+            inputs[digest] = text
+        metrics.incr("summarize.batch.articles", len(articles))
+        metrics.incr(
+            "summarize.batch.deduped", sum(len(g) - 1 for g in groups.values())
+        )
+
+        def run(digest):
+            tree = ReductionTree()
+            summary = summarize_recursive(
+                inputs[digest], max_tokens=MAX_TOKENS, user=user, progress=tree
+            )
+            variants = {}
+            if length == "short":
+                variants["short"] = derive_short_summary(
+                    tree.levels(summary), inputs[digest], user
+                )
+            article = articles[groups[digest][0]]
+            return summary_document(
+                user, article, summary, tree.levels(summary), variants
+            )
+
+        docs = {}
+        if inputs:
+            workers = min(
+                len(inputs), getattr(settings, "SUMMARIZE_BATCH_CONCURRENCY", 4)
+            )
+            with span("summarize.batch", user_id=user.id, articles=len(articles)):
+                with ThreadPoolExecutor(max_workers=workers) as pool:
+                    futures = {
+                        digest: pool.submit(contextvars.copy_context().run, run, digest)
+                        for digest in inputs
+                    }
+                    for digest, future in futures.items():
+                        try:
+                            docs[digest] = future.result()
+                        except Exception as e:
+                            for i in groups[digest]:
+                                results[i].update(_batch_error(e))
+
+        if docs:
+            try:
+                saved_ids, coll_name = save_summaries(user, list(docs.values()))
+            except Exception as e:
+                saved_ids = None
+                failure = {
+                    "status": 500,
+                    "detail": "Failed to save summary",
+                    "error": str(e),
+                }
+            for n, (digest, doc) in enumerate(docs.items()):
+                first = groups[digest][0]
+                for i in groups[digest]:
+                    if saved_ids is None:
+                        results[i].update(failure)
+                        continue
+                    results[i].update(
+                        status=201,
+                        summary=stored_variant(doc, length),
+                        length=length,
+                        saved_id=saved_ids[n],
+                        saved_collection=coll_name,
+                    )
+                    if i != first:
+                        results[i]["duplicate_of"] = first
+
+        return Response({"results": results}, status=status.HTTP_200_OK)
+
+
+class SummarizeStreamAPIView(APIView):
+    """
+    Same input as /summarize/, answered as server-sent events:
+
+        level    {level, tokens, chunks}   a recursion level starts
+        chunk    {level, index, total, summary}
+        summary  {summary}                 final summary
+        saved    {saved_id, saved_collection}
+        error    {detail, error, status[, retry_after]}
+
+    Serve it on the ASGI path (uvicorn) so a slow client does not pin a
+    worker; the summarization itself runs on the newsmind.sse thread pool.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+    parser_classes = [JSONParser]
+
+    def post(self, request):
+        user = request.user
+        article = request.data
+        if not isinstance(article, dict) or not article:
+            return Response(
+                {"detail": "Missing article data."}, status=status.HTTP_400_BAD_REQUEST
+            )
+        article, error = resolve_article(article)
+        if error is not None:
+            return error
+        input_text = prepare_input_text(article)
+        if not input_text:
+            return Response(
+                {"detail": "Article contains no text to summarize."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        try:
+            check_budget(user.id)
+        except QuotaExceeded as e:
+            return quota_error_response(e)
+
+        def job(emit):
+            tree = ReductionTree(forward=emit)
+            try:
+                with span("summarize.stream", user_id=user.id, chars=len(input_text)):
+                    summary = summarize_recursive(
+                        input_text, max_tokens=MAX_TOKENS, user=user, progress=tree
+                    )
+            except (QuotaExceeded, SchedulerTimeout) as e:
+                code = 429 if isinstance(e, QuotaExceeded) else 503
+                emit(
+                    "error",
+                    {"detail": str(e), "status": code, "retry_after": e.retry_after},
+                )
+                return
+            except RuntimeError as e:
+                detail = "AI summarization failed"
+                emit("error", {"detail": detail, "error": str(e), "status": 502})
+                return
+            emit("summary", {"summary": summary})
+            try:
+                saved_id, coll_name = save_summary(
+                    user, article, summary, levels=tree.levels(summary)
+                )
+            except Exception as e:
+                detail = "Failed to save summary"
+                emit("error", {"detail": detail, "error": str(e), "status": 500})
+                return
+            emit("saved", {"saved_id": saved_id, "saved_collection": coll_name})
+
+        asgi = isinstance(request._request, ASGIRequest)
+        response = StreamingHttpResponse(
+            event_stream(job, asgi=asgi), content_type="text/event-stream"
+        )
+        response["Cache-Control"] = "no-cache"
+        # stop nginx from buffering the stream
+        response["X-Accel-Buffering"] = "no"
+        return response
+
+
+class RelatedSummariesAPIView(APIView):
+    """
+    POST an article (same shape as /summarize/) to see which of the caller's
+    saved summaries cover similar stories, before spending a summarize call.
+    Query params: k (default 5, max 20), min_score (cosine, default
+    RELATED_MIN_SCORE).
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+    parser_classes = [JSONParser]
+
+    def post(self, request):
+        user = request.user
+        if not related.enabled():
+            return Response(
+                {"detail": "Related summaries are not available."},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+            )
+        if not isinstance(request.data, dict) or not request.data:
+            return Response(
+                {"detail": "Missing article data."}, status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            k = min(20, max(1, int(request.query_params.get("k", 5))))
+            min_score = request.query_params.get("min_score")
+            min_score = float(min_score) if min_score is not None else None
+        except ValueError:
+            return Response(
+                {"detail": "k and min_score must be numbers."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if not user.mongo_collection_name:
+            return Response({"related": []}, status=status.HTTP_200_OK)
+
+        try:
+            items = related.find_related(
+                user, prepare_input_text(request.data), k=k, min_score=min_score
+            )
+        except Exception as e:
+            return Response(
+                {"detail": "Failed to find related summaries", "error": str(e)},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+        return Response({"related": items}, status=status.HTTP_200_OK)
+
+
+class SummarizeUsageAPIView(APIView):
+    """
+    GET: the caller's summarization usage (calls, input/output tokens) in the
+    current quota window and in total.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        try:
+            report = usage_report(request.user.id)
+        except Exception as e:
+            return Response(
+                {"detail": "Failed to load usage", "error": str(e)},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+        return Response(report, status=status.HTTP_200_OK)
+
+
+# fields of a saved summary in list and sync responses
+SUMMARY_LIST_PROJECTION = {
+    "_id": 1,
+    "title": 1,
+    "summary": 1,
+    "created_at": 1,
+    "source_url": 1,
+}
+
+
 class UserSummaryListAPIView(APIView):
+    """
+    GET the caller's saved summaries, newest first. With ?length=short|long
+    each item carries that variant when it is stored; items whose short
+    variant hasn't been derived yet keep the medium one (see the item's
+    `length`), since listing never calls the model. The response carries a
+    `sync_token` for UserSummaryChangesAPIView, so clients can keep this list
+    up to date with deltas instead of refetching it.
+    """
+
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request):
         user = request.user
+        length = summary_length(request)
+        if length is None:
+            return Response(
+                {"detail": "length must be one of short, medium, long."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
 
+        # taken before reading, like changes_since: nothing saved meanwhile is lost
+        token = summary_sync.next_token()
         if not user.mongo_collection_name:
-            return Response({"summaries": []}, status=status.HTTP_200_OK)
+            return Response(
+                {"summaries": [], "sync_token": token}, status=status.HTTP_200_OK
+            )
 
         client = MongoClient(os.getenv("MONGO_URI"))
         db = client["newssum_mongo"]
         collection = db[user.mongo_collection_name]
 
-        summaries = list(
-            collection.find(
-                {},
-                {"_id": 1, "title": 1, "summary": 1, "created_at": 1, "source_url": 1},
-            ).sort("created_at", -1)
-        )
+        projection = dict(SUMMARY_LIST_PROJECTION)
+        if length != "medium":
+            projection.update({"levels": 1, "variants": 1})
+        summaries = list(collection.find({}, projection).sort("created_at", -1))
 
         # Convert ObjectId → string
         for s in summaries:
             s["_id"] = str(s["_id"])
+            if length != "medium":
+                variant = stored_variant(s, length)
+                s["length"] = length if variant is not None else "medium"
+                s["summary"] = variant if variant is not None else s.get("summary")
+                s.pop("levels", None)
+                s.pop("variants", None)
 
         client.close()
 
-        return Response({"summaries": summaries}, status=status.HTTP_200_OK)
+        return Response(
+            {"summaries": summaries, "sync_token": token}, status=status.HTTP_200_OK
+        )
+
+
+class UserSummaryChangesAPIView(APIView):
+    """
+    GET ?since=<sync_token>: summaries saved and ids deleted since the token,
+    plus the token for the next call (see summary_sync.py). Without `since`
+    it returns the whole list, for the first sync. 410 means the token is
+    too old to diff against: drop the local copy and sync from scratch.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        user = request.user
+        since = request.query_params.get("since")
+        try:
+            since = summary_sync.parse_token(since) if since else None
+        except summary_sync.TokenExpired as e:
+            return Response({"detail": str(e)}, status=status.HTTP_410_GONE)
+        except ValueError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        if not user.mongo_collection_name:
+            return Response(
+                {
+                    "inserted": [],
+                    "deleted": [],
+                    "sync_token": summary_sync.next_token(),
+                },
+                status=status.HTTP_200_OK,
+            )
+
+        try:
+            client, db = connect_mongo()
+            changes = summary_sync.changes_since(
+                db[user.mongo_collection_name],
+                user.id,
+                since,
+                SUMMARY_LIST_PROJECTION,
+            )
+        except Exception as e:
+            return Response(
+                {"detail": "Failed to load summary changes", "error": str(e)},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+        finally:
+            try:
+                client.close()
+            except Exception:
+                pass
+        return Response(changes, status=status.HTTP_200_OK)
 
 
 class UserSummaryDeleteAPIView(APIView):
@@ -394,9 +1055,12 @@ class UserSummaryDeleteAPIView(APIView):
             db = client[os.getenv("MONGO_DBNAME", "newssum_mongo")]
             collection = db[user.mongo_collection_name]
 
+            # tombstone first, so a sync can't miss a delete that happened
+            tombstone_id = summary_sync.record_deletion(user.id, str(summary_oid))
             result = collection.delete_one({"_id": summary_oid})
 
             if result.deleted_count == 0:
+                summary_sync.discard_tombstone(tombstone_id)
                 return Response(
                     {"detail": "Summary not found."},
                     status=status.HTTP_404_NOT_FOUND,
@@ -413,14 +1077,30 @@ class UserSummaryDeleteAPIView(APIView):
             except Exception:
                 pass
 
+        try:
+            related.on_summary_deleted(user, str(summary_oid))
+        except Exception:
+            logger.warning("Related index update failed", exc_info=True)
+
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
 class UserSummaryDownloadAPIView(APIView):
+    """
+    GET a saved summary as a PDF; ?length=short|medium|long picks the
+    variant (a missing short one costs one model call, then it is stored).
+    """
+
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request, summary_id):
         user = request.user
+        length = summary_length(request)
+        if length is None:
+            return Response(
+                {"detail": "length must be one of short, medium, long."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
 
         if not user.mongo_collection_name:
             return Response(
@@ -448,7 +1128,15 @@ class UserSummaryDownloadAPIView(APIView):
                     {"detail": "Summary not found."},
                     status=status.HTTP_404_NOT_FOUND,
                 )
+            summary_text = resolve_variant(collection, summary, length, user=user)
 
+        except (QuotaExceeded, SchedulerTimeout) as e:
+            return quota_error_response(e)
+        except RuntimeError as e:
+            return Response(
+                {"detail": "AI summarization failed", "error": str(e)},
+                status=status.HTTP_502_BAD_GATEWAY,
+            )
         except Exception as e:
             return Response(
                 {"detail": "Failed to fetch summary.", "error": str(e)},
@@ -463,6 +1151,10 @@ class UserSummaryDownloadAPIView(APIView):
         # -----------------------------
         # PDF GENERATION (IN MEMORY)
         # -----------------------------
+        from reportlab.lib.pagesizes import A4
+        from reportlab.pdfgen import canvas
+        from reportlab.lib.utils import ImageReader
+
         buffer = BytesIO()
         pdf = canvas.Canvas(buffer, pagesize=A4)
         width, height = A4
@@ -496,7 +1188,6 @@ class UserSummaryDownloadAPIView(APIView):
         text_obj = pdf.beginText(margin_x, y)
         text_obj.setLeading(16)
 
-        summary_text = summary.get("summary", "")
         for line in summary_text.split("\n"):
             text_obj.textLine(line)
 
@@ -1,5 +1,5 @@
 // src/pages/ArticlePage.jsx
-import React, { useEffect, useState } from "react";
+import React, { useEffect, useRef, useState } from "react";
 import { useLocation, useNavigate } from "react-router-dom";
 import { toast } from "react-toastify";
 import { motion } from "framer-motion";
@@ -10,7 +10,7 @@ import { runSummarizeFlow } from "../services/summarizeHandler";
 import { deleteUserSummary } from "../services/api";
 import { downloadUserSummary } from "../services/api";
 import triggerFileDownload from "../services/downloadHelper";
-import { getUserSummaries } from "../services/api";
+import syncSummaries from "../services/summarySync";
 
 export default function ArticlePage() {
   const location = useLocation();
@@ -20,6 +20,7 @@ export default function ArticlePage() {
   const [loading, setLoading] = useState(true);
   const [summarizing, setSummarizing] = useState(false);
   const [summaries, setSummaries] = useState([]);
+  const syncToken = useRef(null);
   const [savedSummaryArticle, setSavedSummaryArticle] = useState(null);
   const [modalOpen, setModalOpen] = useState(false);
   const [modalLoading, setModalLoading] = useState(false);
@@ -66,7 +67,7 @@ export default function ArticlePage() {
         setLoading: setModalLoading,
         setSummary: setModalSummary,
         toast,
-        onSaved: () => {},
+        onSaved: () => fetchSummaries(),
       });
     } catch (e) {
       console.log(e);
@@ -79,8 +80,7 @@ export default function ArticlePage() {
 
   const fetchSummaries = async () => {
       try {
-        const res = await getUserSummaries();
-        setSummaries(res.summaries || []);
+        await syncSummaries(syncToken, setSummaries);
       } catch (err) {
         console.error("Failed to fetch summaries", err);
       }
@@ -1,5 +1,5 @@
 // src/pages/Dashboard.jsx
-import React, { useEffect, useState } from "react";
+import React, { useEffect, useRef, useState } from "react";
 import Sidebar from "../components/Sidebar";
 import Header from "../components/Header";
 import { motion } from "framer-motion";
@@ -9,7 +9,7 @@ import ShimmerCard from "../components/ShimmerCard";
 import { useNavigate } from "react-router-dom";
 import SummaryModal from "../components/SummaryModal";
 import { runSummarizeFlow } from "../services/summarizeHandler";
-import { getUserSummaries } from "../services/api";
+import syncSummaries from "../services/summarySync";
 import { deleteUserSummary } from "../services/api";
 import { downloadUserSummary } from "../services/api";
 import triggerFileDownload from "../services/downloadHelper";
@@ -17,6 +17,7 @@ import triggerFileDownload from "../services/downloadHelper";
 const Dashboard = () => {
   const [user, setUser] = useState(null);
   const [summaries, setSummaries] = useState([]);
+  const syncToken = useRef(null);
   const [articles, setArticles] = useState([]);
   const [loading, setLoading] = useState(true);
 
@@ -63,8 +64,7 @@ const Dashboard = () => {
 
   const fetchSummaries = async () => {
     try {
-      const res = await getUserSummaries();
-      setSummaries(res.summaries || []);
+      await syncSummaries(syncToken, setSummaries);
     } catch (err) {
       console.error("Failed to fetch summaries", err);
     }
@@ -27,7 +27,13 @@ export const getNews = (params = {}) => {
 
 export const getUserSummaries = async () => {
   const res = await api.get("/../summaries/");
-  return res.data; // { summaries: [...] }
+  return res.data; // { summaries: [...], sync_token }
+};
+
+export const getSummaryChanges = async (since) => {
+  // 410 when `since` is too old: refetch the full list instead
+  const res = await api.get("/../summaries/changes/", { params: { since } });
+  return res.data; // { inserted: [...], deleted: [ids], sync_token }
 };
 
 export const deleteUserSummary = async (summaryId) => {
@@ -3,14 +3,56 @@ import api from "./api";
 
 /**
  * summarizeArticle
- * POSTs the full article object to backend /summarize/ endpoint.
+ * POSTs the article to backend /summarize/ endpoint.
+ * Articles from the news feed are known to the backend, so only their id/url
+ * is sent; the full article is uploaded when the backend doesn't have it (404).
  * Expects backend to be authenticated via your api axios instance (with Authorization header).
  *
  * @param {Object} article - full article object (title, content/text, url, image, etc.)
  * @returns {Promise<Object>} - { summary, saved_id, saved_collection } on success
  * @throws - will throw axios error on network / server failure
  */
+const MAX_RETRIES = 2;
+
+const newIdempotencyKey = () =>
+  window.crypto?.randomUUID?.() ||
+  `${Date.now().toString(36)}-${Math.random().toString(36).slice(2)}`;
+
+const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+
+// Network failures, "still running" (409) and "busy" (503) are retried with
+// the same Idempotency-Key, so the backend replays or waits for the first
+// attempt instead of summarizing and saving the article twice.
+async function postSummarize(payload, key) {
+  for (let attempt = 0; ; attempt++) {
+    try {
+      return await api.post("/summarize/", payload, {
+        headers: { "Idempotency-Key": key },
+      });
+    } catch (err) {
+      const status = err.response?.status;
+      const retryable = !err.response || status === 409 || status === 503;
+      if (!retryable || attempt >= MAX_RETRIES) throw err;
+      const retryAfter = Number(err.response?.headers?.["retry-after"]);
+      await sleep((retryAfter || 2 ** attempt) * 1000);
+    }
+  }
+}
+
 export async function summarizeArticle(article) {
+  // one key per summarize action; the 404 below isn't stored, so the
+  // fallback upload can reuse it
+  const key = newIdempotencyKey();
+  if (article.url || article.id) {
+    const ref = article.url ? { url: article.url } : { article_id: article.id };
+    try {
+      const res = await postSummarize(ref, key);
+      return res.data;
+    } catch (err) {
+      if (err.response?.status !== 404) throw err;
+    }
+  }
+
   // be explicit about payload shape (backend accepts full article)
   const payload = {
     ...article,
@@ -19,6 +61,6 @@ export async function summarizeArticle(article) {
     description: article.description || article.summary || "",
   };
 
-  const res = await api.post("/summarize/", payload);
+  const res = await postSummarize(payload, key);
   return res.data;
 }
@@ -0,0 +1,33 @@
+import { getSummaryChanges, getUserSummaries } from "./api";
+
+const byNewest = (a, b) =>
+  String(b.created_at || "").localeCompare(String(a.created_at || ""));
+
+// Apply a /summaries/changes/ response to a local list. The server may send
+// the last few seconds of changes twice, so inserts are applied by _id.
+export const applySummaryChanges = (list, { inserted = [], deleted = [] }) => {
+  const gone = new Set(deleted);
+  const fresh = new Map(inserted.map((s) => [s._id, s]));
+  const kept = list.filter((s) => !gone.has(s._id) && !fresh.has(s._id));
+  return [...kept, ...fresh.values()].sort(byNewest);
+};
+
+// Bring `setSummaries` up to date: deltas since tokenRef.current when there
+// is a token, the full list on the first call or when the token expired.
+const syncSummaries = async (tokenRef, setSummaries) => {
+  if (tokenRef.current) {
+    try {
+      const changes = await getSummaryChanges(tokenRef.current);
+      tokenRef.current = changes.sync_token;
+      setSummaries((prev) => applySummaryChanges(prev, changes));
+      return;
+    } catch (err) {
+      if (err.response?.status !== 410) throw err;
+    }
+  }
+  const res = await getUserSummaries();
+  tokenRef.current = res.sync_token || null;
+  setSummaries(res.summaries || []);
+};
+
+export default syncSummaries;